@@ -0,0 +1,176 @@
+import heapq
+import threading
+import time
+from collections import deque
+
+# ==========================================
+# ALERT ENGINE (SLA Breaches + Intent Jumps)
+# ==========================================
+# A high-intent lead (score >= SLA_SCORE_THRESHOLD) waiting on an agent
+# reply gets an SLA deadline pushed onto a min-heap. The ticker pops only
+# the deadlines that have passed, so a tick costs O(k log n) for k due
+# leads instead of scanning every lead.
+#
+# Lazy deletion: an agent reply just drops the lead from `_open`; its heap
+# entry stays behind and is discarded when it surfaces, because it no
+# longer matches the open wait it was pushed for.
+#
+# Fired alerts (SLA breaches and intent jumps) live in a bounded deque
+# that /api/alerts serves newest first.
+SLA_SECONDS = 30 * 60
+SLA_SCORE_THRESHOLD = 60
+MAX_FIRED = 1000
+TICK_SECONDS = 5
+
+
+def _format_time(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+
+class AlertEngine:
+    """Deadline heap for SLA breaches plus a ring of fired alerts."""
+
+    def __init__(self, sla_seconds=SLA_SECONDS, score_threshold=SLA_SCORE_THRESHOLD,
+                 max_fired=MAX_FIRED, tick_seconds=TICK_SECONDS):
+        self.sla_seconds = sla_seconds
+        self.score_threshold = score_threshold
+        self.tick_seconds = tick_seconds
+        self._lock = threading.Lock()
+        self._heap = []          # (deadline, email, waiting_since)
+        self._open = {}          # email -> waiting_since of the open wait
+        self._fired = deque(maxlen=max_fired)
+        self._ticker = None
+        self.breaches = 0
+        self.stale_pops = 0
+
+    # ── Deadlines ──
+    def watch(self, email, waiting_since, score, state):
+        """Starts the SLA clock for `email` unless a wait is already open."""
+        with self._lock:
+            if email in self._open:
+                return
+            self._open[email] = (waiting_since, score, state)
+            heapq.heappush(self._heap, (waiting_since + self.sla_seconds, email, waiting_since))
+        self.start()
+
+    def resolve(self, email):
+        """Agent replied (or lead dropped below threshold): O(1) lazy delete."""
+        with self._lock:
+            self._open.pop(email, None)
+
+    def tick(self, now=None):
+        """Fires every passed deadline. Returns the alerts fired."""
+        now = time.time() if now is None else now
+        fired = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                deadline, email, since = heapq.heappop(heap)
+                wait = self._open.get(email)
+                if wait is None or wait[0] != since:
+                    self.stale_pops += 1
+                    continue
+                del self._open[email]   # one breach per wait
+                _, score, state = wait
+                alert = {
+                    "type": "sla_breach",
+                    "email": email,
+                    "from_score": score,
+                    "to_score": score,
+                    "delta": 0,
+                    "state": state,
+                    "waiting_min": round((now - since) / 60, 1),
+                    "timestamp": deadline,
+                    "time": _format_time(deadline)
+                }
+                self._fired.append(alert)
+                fired.append(alert)
+            self.breaches += len(fired)
+        return fired
+
+    # ── Intent jumps ──
+    def record_intent_jump(self, email, jump, state):
+        alert = {
+            "type": "intent_jump",
+            "email": email,
+            "from_score": jump["from"],
+            "to_score": jump["to"],
+            "delta": jump["delta"],
+            "state": state,
+            "timestamp": jump["timestamp"],
+            "time": _format_time(jump["timestamp"])
+        }
+        with self._lock:
+            self._fired.append(alert)
+
+    # ── Store integration ──
+    def _sync(self, email, old, new):
+        if new is None:
+            self.resolve(email)
+            return
+        since = new.get('last_lead_reply_at')
+        if since and new.get('score', 0) >= self.score_threshold:
+            self.watch(email, since, new.get('score', 0), new.get('state', 'Noise'))
+        else:
+            self.resolve(email)
+        jump = new.get('intent_jump_alert')
+        if jump and (old is None or old.get('intent_jump_alert') != jump):
+            self.record_intent_jump(email, jump, new.get('state', 'Noise'))
+
+    def on_publish(self, email, old, new):
+        """LeadStore listener."""
+        if email is None:
+            self.clear()
+        else:
+            self._sync(email, old, new)
+
+    def rebuild(self, items):
+        """Re-arms deadlines for leads still waiting after a restart."""
+        for email, record in items:
+            since = record.get('last_lead_reply_at')
+            if since and record.get('score', 0) >= self.score_threshold:
+                self.watch(email, since, record.get('score', 0), record.get('state', 'Noise'))
+
+    # ── Reads ──
+    def alerts(self, limit=None):
+        with self._lock:
+            fired = list(self._fired)
+        fired.reverse()
+        return fired[:limit] if limit else fired
+
+    def open_count(self):
+        return len(self._open)
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+            self._open.clear()
+            self._fired.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "open": len(self._open),
+                "heap_size": len(self._heap),
+                "fired": len(self._fired),
+                "breaches": self.breaches,
+                "stale_pops": self.stale_pops
+            }
+
+    # ── Background ticker ──
+    def start(self):
+        if self._ticker is not None or not self.tick_seconds:
+            return
+        with self._lock:
+            if self._ticker is not None:
+                return
+            self._ticker = threading.Thread(target=self._run, name="alert-ticker", daemon=True)
+            self._ticker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.tick_seconds)
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Alert Ticker Error: {e}")
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ==========================================
+# BATCH TELEMETRY (/score-batch-csv uploads)
+# ==========================================
+# One JSON line per batch in BATCH_TELEMETRY_LOG with:
+#   rows, input_bytes, wall_ms, rows_per_sec, phases_ms
+#   (read, decode, parse, score, sort, write), peak_rss_mb,
+#   avg_score and action counts.
+# The last RECENT_BATCHES entries are kept in memory (seeded from the
+# log on startup) and summarized by GET /batch-telemetry.
+#
+# peak_rss_mb is the process high-water mark (ru_maxrss), so it only
+# moves when a batch pushes it up. BATCH_TRACEMALLOC=1 also records the
+# batch's own peak Python allocation; it slows scoring noticeably, so it
+# is off by default.
+BATCH_TELEMETRY_LOG = os.environ.get("BATCH_TELEMETRY_LOG", "batch_metrics.jsonl")
+BATCH_TRACEMALLOC = os.environ.get("BATCH_TRACEMALLOC", "0") == "1"
+RECENT_BATCHES = 500
+
+PHASES = ("read", "decode", "parse", "score", "sort", "write")
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+class BatchRun:
+    """Phase clock for one upload. lap(phase) closes the phase that just ran."""
+
+    def __init__(self, trace_memory=None):
+        self.started_at = datetime.now().isoformat()
+        self._start = self._last = time.perf_counter()
+        self.phases = {}
+        self.trace_memory = BATCH_TRACEMALLOC if trace_memory is None else trace_memory
+        self._owns_trace = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_trace = True
+            # Tracing may already be on: count only this batch's peak
+            tracemalloc.reset_peak()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def finish(self, rows, input_bytes, **extra):
+        wall_ms = (time.perf_counter() - self._start) * 1000
+        entry = {
+            "timestamp": self.started_at,
+            "rows": rows,
+            "input_bytes": input_bytes,
+            "wall_ms": round(wall_ms, 2),
+            "rows_per_sec": round(rows / (wall_ms / 1000), 1) if wall_ms > 0 else None,
+            "phases_ms": {p: round(self.phases.get(p, 0.0), 2) for p in PHASES},
+            "peak_rss_mb": peak_rss_mb()
+        }
+        if self.trace_memory and tracemalloc.is_tracing():
+            entry["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        self.close()
+        entry.update(extra)
+        return entry
+
+    def close(self):
+        """Stops tracemalloc if this run started it. Safe to call twice."""
+        if self._owns_trace:
+            self._owns_trace = False
+            tracemalloc.stop()
+
+
+class BatchTelemetry:
+    """JSON-lines sink plus an in-memory window of recent batches."""
+
+    def __init__(self, path=BATCH_TELEMETRY_LOG, keep=RECENT_BATCHES):
+        self.path = path
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=keep)
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        self._recent.append(json.loads(line))
+                    except ValueError:
+                        continue   # torn last line from a crash
+
+    def record(self, entry):
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._recent.append(entry)
+            if self.path:
+                with open(self.path, "a") as f:
+                    f.write(line + "\n")
+
+    def recent(self, limit=20):
+        with self._lock:
+            entries = list(self._recent)
+        return entries[-limit:][::-1] if limit else []
+
+    def summary(self):
+        """Throughput and per-phase means over the in-memory window."""
+        with self._lock:
+            entries = list(self._recent)
+        if not entries:
+            return {"batches": 0}
+        rates = sorted(e["rows_per_sec"] for e in entries if e.get("rows_per_sec"))
+        latest = entries[-1]
+        return {
+            "batches": len(entries),
+            "rows": sum(e.get("rows", 0) for e in entries),
+            "input_bytes": sum(e.get("input_bytes", 0) for e in entries),
+            "rows_per_sec": {
+                "min": rates[0] if rates else None,
+                "median": rates[len(rates) // 2] if rates else None,
+                "max": rates[-1] if rates else None,
+                "latest": latest.get("rows_per_sec")
+            },
+            "phases_ms_mean": {
+                p: round(sum(e.get("phases_ms", {}).get(p, 0) for e in entries) / len(entries), 2)
+                for p in PHASES
+            },
+            "peak_rss_mb": max((e.get("peak_rss_mb") or 0) for e in entries)
+        }
+
+
+TELEMETRY = BatchTelemetry()
@@ -0,0 +1,66 @@
+"""
+SLA alert engine benchmark.
+Opens N high-intent waits with deadlines spread over the next hour,
+resolves a share of them (agent replied), then times:
+  - an idle tick (nothing due): what the background ticker pays every 5 s
+  - a tick that fires a batch of due deadlines
+  - the old approach: scanning every lead for last_lead_reply_at
+
+Usage: python benchmarks/bench_alerts.py [num_open_leads]
+Default: 1,000,000 open leads.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from alert_engine import AlertEngine, SLA_SECONDS  # noqa: E402
+
+
+def main():
+    num_leads = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rng = random.Random(42)
+    now = 1700000000.0
+    engine = AlertEngine(tick_seconds=0)
+    records = {}
+
+    start = time.perf_counter()
+    for i in range(num_leads):
+        email = f"lead{i}@example.com"
+        since = now - SLA_SECONDS + rng.uniform(0, 3600)
+        engine.watch(email, since, 75, "Ready Now")
+        records[email] = since
+    watch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, num_leads, 4):
+        engine.resolve(f"lead{i}@example.com")
+        records.pop(f"lead{i}@example.com")
+    resolve_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.tick(now=now)
+    idle_ms = (time.perf_counter() - start) * 1000
+
+    window = 60.0
+    start = time.perf_counter()
+    fired = engine.tick(now=now + window)
+    due_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    breached = [e for e, since in records.items() if now + window - since >= SLA_SECONDS]
+    scan_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Open leads:            {num_leads:,}")
+    print(f"watch():               {watch_s / num_leads * 1e6:.2f} us/lead")
+    print(f"resolve():             {resolve_s / (num_leads // 4) * 1e6:.2f} us/lead")
+    print(f"idle tick:             {idle_ms:.3f} ms")
+    print(f"tick firing {len(fired):,}:   {due_ms:.1f} ms   ({engine.stats()['stale_pops']:,} stale pops)")
+    print(f"full scan ({len(breached):,} due): {scan_ms:.1f} ms per poll")
+
+
+if __name__ == "__main__":
+    main()
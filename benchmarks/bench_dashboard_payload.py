@@ -0,0 +1,110 @@
+"""
+Dashboard payload benchmark.
+Compares the full /api/dashboard card payload against the paginated
+lean listing (/api/leads/<band>) and the on-demand detail endpoint.
+
+Usage: python benchmarks/bench_dashboard_payload.py [num_leads]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import server  # noqa: E402
+
+BODIES = [
+    "What is the pricing? We are comparing vendors and need to launch this month.",
+    "Budget approved. Can your API integrate with our CRM? Our team is scaling fast.",
+    "Looks interesting, keep me posted.",
+    "We're drowning in manual work. How does onboarding work and what does it cost?",
+    "ok",
+    "Not interested, please remove me.",
+]
+
+
+def populate(num_leads, seed=7):
+    rng = random.Random(seed)
+    server.LEAD_DB.clear()
+    now = time.time()
+    for i in range(num_leads):
+        email = f"lead{i}@bench.test"
+        thread = []
+        for j in range(rng.randint(1, 6)):
+            thread.append({
+                "body": rng.choice(BODIES),
+                "timestamp": now - (6 - j) * 1800,
+                "sender": "lead" if j % 2 == 0 else "agent",
+            })
+        analysis = server.reply_engine.analyze_thread(thread)
+        server.LEAD_DB[email] = {
+            "email": email,
+            "thread": thread,
+            "score": analysis["score"],
+            "state": analysis["state"],
+            "signals": analysis["explanation"],
+            "full_explanation": analysis["full_explanation"],
+            "last_updated": now,
+            "cliff_flag": analysis.get("cliff_flag"),
+            "momentum": analysis.get("momentum", "Stable"),
+            "tiebreaker": analysis.get("tiebreaker", {}),
+            "profile": {"name": "Unknown", "email": email},
+            "score_history": [rng.randint(0, 100) for _ in range(len(thread))],
+            "intent_jump_alert": None,
+            "response_times": [],
+            "avg_response_time_min": None,
+            "outcome": None,
+            "last_lead_reply_at": None,
+            "disagreements": [],
+            "raw_signals": analysis["signals"],
+            "raw_metrics": analysis["metrics"],
+        }
+
+
+def timed(fn, repeats=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    num_leads = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    populate(num_leads)
+    client = server.app.test_client()
+
+    # Full payload: every card with every heavy field (what /api/dashboard ships)
+    def full_payload():
+        items = [server._lead_item(email, data) for email, data in server.LEAD_DB.items()]
+        return json.dumps(items)
+
+    full_time, full_body = timed(full_payload)
+
+    def first_pages():
+        total_bytes = 0
+        for band in server.BAND_NAMES:
+            res = client.get(f"/api/leads/{band}?limit=50")
+            total_bytes += len(res.data)
+        return total_bytes
+
+    page_time, page_bytes = timed(first_pages)
+
+    email = next(iter(server.LEAD_DB))
+    detail_time, detail_res = timed(lambda: client.get(f"/api/lead/{email}"))
+
+    print("=" * 60)
+    print(f"  DASHBOARD PAYLOAD BENCHMARK ({num_leads} leads)")
+    print("=" * 60)
+    print(f"  Full card payload:     {len(full_body) / 1024:10.1f} KB  {full_time * 1000:8.1f} ms")
+    print(f"  First page x4 bands:   {page_bytes / 1024:10.1f} KB  {page_time * 1000:8.1f} ms")
+    print(f"  Single lead detail:    {len(detail_res.data) / 1024:10.1f} KB  {detail_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Memory benchmark for lead records.
+Builds N realistic leads (a short thread plus the flattened analysis) as
+the old plain-dict records and as slotted LeadRecords, and reports the
+bytes retained per lead measured with tracemalloc.
+
+Usage: python benchmarks/bench_lead_memory.py [num_leads]
+Default: 1,000,000 leads (needs a few GB of RAM for the dict run).
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lead_record import LeadRecord, Message  # noqa: E402
+from reply_intelligence import ReplyIntelligence  # noqa: E402
+
+TEMPLATES = [
+    "What is the pricing? We are comparing vendors and need to launch this month.",
+    "Budget approved. Can your API integrate with our CRM?",
+    "Looks interesting, keep me posted.",
+    "ok",
+]
+
+
+def analyses():
+    engine = ReplyIntelligence()
+    return [engine.analyze_thread([{"body": body, "timestamp": 1700000000, "sender": "lead"}])
+            for body in TEMPLATES]
+
+
+def fill(record, i, analysis, message):
+    # Per-lead containers are fresh objects, as they are after a real reply
+    record['thread'] = [message(TEMPLATES[i % len(TEMPLATES)], 1700000000 + i, "lead"),
+                        message("Thanks, sending details.", 1700000600 + i, "agent")]
+    record['score'] = analysis['score']
+    record['state'] = analysis['state']
+    record['signals'] = list(analysis['explanation'])
+    record['full_explanation'] = list(analysis['full_explanation'])
+    record['momentum'] = analysis['momentum']
+    record['tiebreaker'] = dict(analysis.get('tiebreaker', {}))
+    record['raw_signals'] = dict(analysis['signals'])
+    record['raw_metrics'] = dict(analysis['metrics'])
+    record['score_history'].append(analysis['score'])
+    if isinstance(record, dict):
+        record['response_times'].append(600.0)
+    else:
+        record['response_count'] = 1
+        record['response_mean_sec'] = record['response_ewma_sec'] = 600.0
+    record['avg_response_time_min'] = 10.0
+    return record
+
+
+def dict_lead(email, i, analysis):
+    record = {
+        "email": email, "thread": [], "score": 0, "state": "Noise", "signals": [],
+        "full_explanation": [], "last_updated": 1700000000 + i, "cliff_flag": None,
+        "profile": {"name": "Unknown", "email": email}, "score_history": [],
+        "intent_jump_alert": None, "response_times": [], "avg_response_time_min": None,
+        "outcome": None, "last_lead_reply_at": None, "disagreements": []
+    }
+    return fill(record, i, analysis,
+                lambda body, ts, sender: {"body": body, "timestamp": ts, "sender": sender})
+
+
+def slotted_lead(email, i, analysis):
+    return fill(LeadRecord(email, 1700000000 + i), i, analysis, Message)
+
+
+def measure(factory, num_leads, results):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    db = {}
+    for i in range(num_leads):
+        email = f"lead{i}@example.com"
+        db[email] = factory(email, i, results[i % len(results)])
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del db
+    return used
+
+
+def main():
+    num_leads = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    results = analyses()
+    print(f"Leads: {num_leads:,}")
+    baseline = None
+    for name, factory in (("dict", dict_lead), ("LeadRecord", slotted_lead)):
+        used = measure(factory, num_leads, results)
+        per_lead = used / num_leads
+        line = f"{name:>10}: {per_lead:8.0f} bytes/lead   {used / 1e6:8.1f} MB total"
+        if baseline:
+            line += f"   ({100 * (1 - used / baseline):.0f}% smaller)"
+        baseline = baseline or used
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
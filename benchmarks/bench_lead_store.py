@@ -0,0 +1,142 @@
+"""
+Lead store contention benchmark.
+Runs the webhook scoring update from 1..N threads against a striped
+LeadStore and a single-lock LeadStore, then verifies no update was lost.
+
+Two scenarios:
+  cpu       every update is pure-Python scoring. Throughput is bound by
+            the GIL either way, so striping shows no throughput gain here;
+            the table is kept to prove that and to check correctness.
+  blocking  one thread keeps updating a hot lead while holding it for a
+            blocking pause (standing in for a journal fsync or any I/O
+            done under the lock); the other threads update other leads.
+            This is what striping fixes: with one lock every unrelated
+            update queues behind the pause, with stripes it doesn't.
+
+Reported per scenario: ops/sec, p50 / p99 latency of the updates (the
+hot-lead thread excluded in the blocking scenario) and lost updates.
+
+Usage: python benchmarks/bench_lead_store.py [ops_per_thread] [pause_ms]
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lead_store import LeadStore  # noqa: E402
+from reply_intelligence import ReplyIntelligence  # noqa: E402
+
+ENGINE = ReplyIntelligence()
+BODY = "What is the pricing? We're comparing vendors and our team needs the API soon."
+HOT_LEAD = "hot@bench.test"
+
+
+def score_update(record):
+    record['thread'].append({"body": BODY, "timestamp": time.time(), "sender": "lead"})
+    # Keep the analyzed window short so the benchmark measures the store
+    analysis = ENGINE.analyze_thread(record['thread'][-3:])
+    record['score'] = analysis['score']
+    record['score_history'].append(analysis['score'])
+
+
+def new_record():
+    return {"thread": [], "score": 0, "score_history": []}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run(store, num_threads, ops_per_thread, num_leads, pause=0.0):
+    """
+    Returns (ops/sec, p50 ms, p99 ms, lost updates). With `pause`, one
+    extra thread holds HOT_LEAD for `pause` seconds per update for as
+    long as the measured threads run.
+    """
+    latencies = [[] for _ in range(num_threads)]
+    done = threading.Event()
+    hot_updates = [0]
+
+    def worker(n):
+        samples = latencies[n]
+        for i in range(ops_per_thread):
+            email = f"lead{(n * 7 + i) % num_leads}@bench.test"
+            start = time.perf_counter()
+            store.update(email, score_update, create=new_record)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    def hot_worker():
+        def slow_update(record):
+            score_update(record)
+            time.sleep(pause)
+        while not done.is_set():
+            store.update(HOT_LEAD, slow_update, create=new_record)
+            hot_updates[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(num_threads)]
+    hot = threading.Thread(target=hot_worker) if pause else None
+    if hot is not None:
+        hot.start()
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    if hot is not None:
+        hot.join()
+
+    applied = sum(len(r['score_history']) for r in store.values())
+    lost = num_threads * ops_per_thread + hot_updates[0] - applied
+    samples = [ms for per_thread in latencies for ms in per_thread]
+    return ((num_threads * ops_per_thread) / elapsed, percentile(samples, 50),
+            percentile(samples, 99), lost)
+
+
+def report(title, scenarios):
+    print(f"\n  {title}")
+    print(f"  {'threads':>7} {'leads':>6} | {'ops/s':>7} {'p50 ms':>7} {'p99 ms':>7} "
+          f"| {'ops/s':>7} {'p50 ms':>7} {'p99 ms':>7} | {'lost':>4}")
+    print(f"  {'':>14} | {'striped':^23} | {'single lock':^23} |")
+    for num_threads, num_leads, striped, single in scenarios:
+        print(f"  {num_threads:>7} {num_leads:>6} | {striped[0]:>7.0f} {striped[1]:>7.2f} "
+              f"{striped[2]:>7.2f} | {single[0]:>7.0f} {single[1]:>7.2f} {single[2]:>7.2f} "
+              f"| {striped[3] + single[3]:>4}")
+
+
+def main():
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    pause = (float(sys.argv[2]) if len(sys.argv) > 2 else 2.0) / 1000
+    print("=" * 72)
+    print("  LEAD STORE CONTENTION BENCHMARK")
+    print("=" * 72)
+
+    rows = []
+    for num_leads in (1, 1000):
+        for num_threads in (1, 2, 4, 8):
+            rows.append((num_threads, num_leads,
+                         run(LeadStore(), num_threads, ops, num_leads),
+                         run(LeadStore(num_stripes=1), num_threads, ops, num_leads)))
+    report("cpu: pure scoring updates", rows)
+    print("  -> no throughput gain from striping: the scoring work holds the GIL,")
+    print("     so threads take turns whichever lock they use.")
+
+    rows = []
+    for num_threads in (1, 4, 8):
+        blocking_ops = max(50, ops // 10)
+        rows.append((num_threads, 1000,
+                     run(LeadStore(), num_threads, blocking_ops, 1000, pause),
+                     run(LeadStore(num_stripes=1), num_threads, blocking_ops, 1000, pause)))
+    report(f"blocking: a hot lead held for {pause * 1000:.1f} ms per update", rows)
+    print("  -> striping keeps unrelated leads off the hot lead's lock: their")
+    print("     latency stays at the cpu-scenario level instead of queueing behind it.")
+
+
+if __name__ == "__main__":
+    main()
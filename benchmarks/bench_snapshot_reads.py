@@ -0,0 +1,142 @@
+"""
+Webhook latency under concurrent dashboard scans.
+Measures /webhook/reply p50/p99 with 0 and with N reader threads
+continuously scanning the lead store through the band listings
+(each request iterates a full LEAD_DB snapshot). Scanning is Python
+work, so the tail there is mostly GIL hand-offs to the readers.
+
+The store section isolates the cost of taking snapshots: writers run
+LeadStore.update while readers poll snapshot() every millisecond, for
+growing store sizes, against a store whose snapshot copies every lead
+(what snapshot() used to do). With shard sharing, writer latency stays
+flat as the store grows; with a full copy the p99 grows with it.
+
+Usage: python benchmarks/bench_snapshot_reads.py [num_leads] [num_readers]
+"""
+
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_dashboard_payload import populate, server  # noqa: E402
+from lead_store import LeadStore  # noqa: E402
+
+
+class FullCopyStore(LeadStore):
+    """Baseline: every snapshot after a write copies all leads."""
+
+    def snapshot_with_version(self):
+        version = self._version
+        cached_version, view = self._snapshot
+        if cached_version != version:
+            view = MappingProxyType({k: v for shard in self._shards for k, v in shard.items()})
+            self._snapshot = (version, view)
+        return version, view
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def measure_webhooks(num_requests):
+    client = server.app.test_client()
+    latencies = []
+    now = time.time()
+    for i in range(num_requests):
+        payload = {
+            "email": f"lead{i % 500}@bench.test",
+            "body": f"Follow-up {i}: what's the timeline for the API rollout?",
+            "timestamp": now + i,
+            "sender": "lead",
+        }
+        start = time.perf_counter()
+        client.post("/webhook/reply", json=payload)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run(num_readers, num_requests):
+    stop = threading.Event()
+    scans = [0]
+
+    def reader():
+        client = server.app.test_client()
+        while not stop.is_set():
+            for band in server.BAND_NAMES:
+                client.get(f"/api/leads/{band}?limit=50")
+                scans[0] += 1
+
+    readers = [threading.Thread(target=reader, daemon=True) for _ in range(num_readers)]
+    for t in readers:
+        t.start()
+    latencies = measure_webhooks(num_requests)
+    stop.set()
+    for t in readers:
+        t.join()
+    return latencies, scans[0]
+
+
+def store_writer_latency(store_cls, num_leads, num_readers, num_writes=5000):
+    store = store_cls()
+    for i in range(num_leads):
+        store[f"lead{i}@bench.test"] = {"score": 0, "score_history": []}
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            store.snapshot().get("lead0@bench.test")
+            time.sleep(0.001)
+
+    def bump(record):
+        record['score'] += 1
+        record['score_history'].append(record['score'])
+
+    readers = [threading.Thread(target=reader, daemon=True) for _ in range(num_readers)]
+    for t in readers:
+        t.start()
+    latencies = []
+    for i in range(num_writes):
+        start = time.perf_counter()
+        store.update(f"lead{i % num_leads}@bench.test", bump)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if i % 50 == 0:
+            time.sleep(0.0005)   # let readers take fresh snapshots
+    stop.set()
+    for t in readers:
+        t.join()
+    return latencies
+
+
+def main():
+    num_leads = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    num_readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    print("=" * 64)
+    print(f"  STORE WRITER LATENCY, {num_readers} readers polling snapshot()")
+    print("=" * 64)
+    for size in (10000, 100000, 500000):
+        for label, store_cls in (("shared", LeadStore), ("full copy", FullCopyStore)):
+            latencies = store_writer_latency(store_cls, size, num_readers)
+            print(f"  leads={size:<7} {label:<10} p50={percentile(latencies, 50):7.3f} ms  "
+                  f"p99={percentile(latencies, 99):7.3f} ms  max={max(latencies):7.2f} ms")
+
+    populate(num_leads)
+
+    print("=" * 64)
+    print(f"  WEBHOOK LATENCY UNDER SCANS ({num_leads} leads)")
+    print("=" * 64)
+    for readers in (0, num_readers):
+        latencies, scans = run(readers, 1000)
+        print(f"  readers={readers:<3} p50={percentile(latencies, 50):7.2f} ms  "
+              f"p99={percentile(latencies, 99):7.2f} ms  max={max(latencies):7.2f} ms  "
+              f"scans={scans}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Long-thread benchmark: full thread vs compacted thread (last N verbatim
+plus a folded summary). Reports per-reply scoring latency and the
+retained size of the lead's thread state.
+
+Usage: python benchmarks/bench_thread_compaction.py [thread_len] [window]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from reply_intelligence import ReplyIntelligence  # noqa: E402
+
+BODIES = [
+    "Thanks for the update, we are still reviewing internally with the team.",
+    "What is the pricing for 50 seats? We're comparing vendors this quarter.",
+    "I am out of the office until Monday. This is an automatic reply.",
+    "Our CTO wants to see the API docs and the integration timeline.",
+    "Any news on the discount we discussed? Budget is tight.",
+]
+
+
+def build_thread(length, seed=5):
+    rng = random.Random(seed)
+    return [{
+        "body": rng.choice(BODIES),
+        "timestamp": 1700000000 + i * 900,
+        "sender": "lead" if i % 2 == 0 else "agent",
+    } for i in range(length)]
+
+
+def retained_bytes(factory):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = factory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    return obj, size
+
+
+def per_reply_ms(fn, repeats=20):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    window = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    engine = ReplyIntelligence()
+    # Warm the regex cache so it isn't counted as retained thread state
+    engine.analyze_thread(build_thread(10), engine.summarize_messages(build_thread(10)))
+
+    full, full_bytes = retained_bytes(lambda: build_thread(length))
+
+    def compacted_state():
+        thread = build_thread(length)
+        summary = engine.summarize_messages(thread[:-window])
+        return thread[-window:], summary
+
+    (tail, summary), compact_bytes = retained_bytes(compacted_state)
+
+    full_ms = per_reply_ms(lambda: engine.analyze_thread(full))
+    compact_ms = per_reply_ms(lambda: engine.analyze_thread(tail, summary))
+
+    result_full = engine.analyze_thread(full)
+    result_compact = engine.analyze_thread(tail, summary)
+
+    print("=" * 64)
+    print(f"  THREAD COMPACTION ({length} messages, window {window})")
+    print("=" * 64)
+    print(f"  {'':12} {'retained':>12} {'per reply':>12} {'score':>6}")
+    print(f"  {'full':12} {full_bytes / 1024:10.1f}KB {full_ms:10.2f}ms {result_full['score']:>6}")
+    print(f"  {'compacted':12} {compact_bytes / 1024:10.1f}KB {compact_ms:10.2f}ms {result_compact['score']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Synthetic lead corpus generator for capacity planning.
+Streams millions of seeded, reproducible leads with realistic shape:
+
+  - thread length      Zipf over 1..--max-messages lead replies
+                       (most leads reply once, a long tail keeps going)
+  - reply length       short / typical / long mix; long replies carry
+                       quoted history ("> ...") like real mail clients
+  - tier mix           ready_now / evaluating / curious / noise
+                       (--tier-mix), with warming and cooling threads
+  - auto-replies       templated out-of-office / unmonitored mailbox
+  - interleaving       agent follow-ups between lead replies (--agent-rate)
+  - timestamps         leads start at a fixed --leads-per-day rate from
+                       --start (default: --leads spread over --days);
+                       reply gaps are log-normal (minutes for agents,
+                       hours for leads)
+
+Outputs:
+  <out>.csv     one row per lead for /score-batch-csv
+                (id, thread_text, created_at, replied, intended_tier)
+  <out>.ndjson  one reply event per line for /webhook/reply and
+                /webhook/replies, in near-global timestamp order
+                (sorted within blocks of --block leads; per-lead order is
+                always exact)
+
+Usage:
+  python benchmarks/generate_corpus.py --leads 1000000 --out corpus/leads
+      [--format csv|ndjson|both] [--seed 42] [--days 30] [--leads-per-day N] [--zipf 1.6]
+      [--max-messages 40] [--tier-mix ready_now=0.05,evaluating=0.15,curious=0.3,noise=0.5]
+      [--auto-reply-rate 0.08] [--agent-rate 0.6]
+
+Memory stays flat (one block of leads at a time), so the lead count is
+bounded by disk, not RAM.
+"""
+
+import argparse
+import bisect
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+# ==========================================
+# TEMPLATES
+# ==========================================
+TIER_SENTENCES = {
+    "ready_now": [
+        "Budget approved, please send the contract.",
+        "Can we get a demo with our team this week?",
+        "We need to launch this month, what are the next steps?",
+        "Send over the MSA and we'll get it signed by Friday.",
+        "Our CFO signed off on the pilot budget.",
+        "What is the pricing for {seats} seats? We want to move quickly.",
+        "Let's set up a call with our VP of Sales on {day}.",
+    ],
+    "evaluating": [
+        "How does this compare to {competitor}?",
+        "Can your API integrate with our CRM?",
+        "We are comparing vendors this quarter.",
+        "Who else in {industry} uses you?",
+        "What does onboarding look like for a team of {seats}?",
+        "Do you have a security questionnaire or SOC 2 report?",
+        "We're struggling with manual reporting. How would you handle that?",
+    ],
+    "curious": [
+        "Looks interesting, keep me posted.",
+        "Thanks, will check.",
+        "Maybe next quarter.",
+        "Can you send a one-pager?",
+        "Interesting idea, not sure it's a priority right now.",
+        "I'll take a look when I have a minute.",
+    ],
+    "noise": [
+        "ok",
+        "Not interested, please remove me.",
+        "Please unsubscribe me.",
+        "Wrong person.",
+        "We are all set, thanks.",
+        "Stop emailing me.",
+        "Love your LinkedIn posts!",
+    ],
+}
+AUTO_REPLIES = [
+    "Automatic reply: I'm out of office until {day} with limited access to email.",
+    "Thank you for your email. This mailbox is not monitored.",
+    "I am currently on leave and will return on {day}. For urgent matters contact {name}.",
+    "Auto-reply: I've moved on from {company}. Please reach out to {name} instead.",
+]
+AGENT_REPLIES = [
+    "Happy to help, here are the details.",
+    "Thanks for getting back to me! Does {day} work for a quick call?",
+    "Attaching the one-pager and pricing overview.",
+    "Just following up on my last note.",
+]
+SHORT_REPLIES = ["ok", "Let's talk", "price?", "interested", "send deck", "not now", "who is this?"]
+FILLER = [
+    "Thanks for the note.",
+    "Hope your week is going well.",
+    "Some context on our side: we're a team of {seats} in {industry}.",
+    "I read through the material you sent over.",
+    "We've been growing quickly and the current process doesn't scale.",
+]
+COMPETITORS = ["Apollo", "ZoomInfo", "Outreach", "Salesloft", "Clearbit"]
+INDUSTRIES = ["fintech", "healthcare", "logistics", "e-commerce", "SaaS", "manufacturing"]
+NAMES = ["Sarah", "Priya", "Tom", "Alex", "Jordan", "Mei", "Carlos"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+TIERS = ("ready_now", "evaluating", "curious", "noise")
+WARMER = {"noise": "curious", "curious": "evaluating", "evaluating": "ready_now", "ready_now": "ready_now"}
+
+LENGTH_MIX = (("short", 0.35), ("typical", 0.5), ("long", 0.15))
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in TIERS:
+            raise ValueError(f"unknown tier {name!r} (expected one of {', '.join(TIERS)})")
+        mix[name.strip()] = float(weight)
+    total = sum(mix.values())
+    return {tier: mix.get(tier, 0.0) / total for tier in TIERS}
+
+
+class CorpusGenerator:
+    def __init__(self, seed=42, start=None, days=30, leads_per_day=3000.0, zipf=1.6, max_messages=40,
+                 tier_mix="ready_now=0.05,evaluating=0.15,curious=0.3,noise=0.5",
+                 auto_reply_rate=0.08, agent_rate=0.6):
+        self.seed = seed
+        self.start = start if start is not None else time.time() - days * 86400
+        self.interval = 86400 / leads_per_day
+        self.auto_reply_rate = auto_reply_rate
+        self.agent_rate = agent_rate
+        mix = parse_mix(tier_mix) if isinstance(tier_mix, str) else tier_mix
+        self._tiers = list(mix)
+        self._tier_cum = list(itertools.accumulate(mix.values()))
+        # Zipf(s) over 1..max_messages via cumulative weights + bisect
+        self._length_cum = list(itertools.accumulate(k ** -zipf for k in range(1, max_messages + 1)))
+
+    def _pick_length(self, rng):
+        return bisect.bisect_left(self._length_cum, rng.random() * self._length_cum[-1]) + 1
+
+    def _pick_tier(self, rng):
+        return self._tiers[min(bisect.bisect_left(self._tier_cum, rng.random() * self._tier_cum[-1]),
+                               len(self._tiers) - 1)]
+
+    @staticmethod
+    def _fill(rng, template):
+        return template.format(
+            seats=rng.choice([5, 12, 25, 50, 120, 400]), day=rng.choice(DAYS),
+            competitor=rng.choice(COMPETITORS), industry=rng.choice(INDUSTRIES),
+            name=rng.choice(NAMES), company=rng.choice(COMPANIES))
+
+    def _body(self, rng, tier, previous):
+        kind = rng.choices(LENGTH_MIX, weights=[w for _, w in LENGTH_MIX])[0][0]
+        if kind == "short":
+            return rng.choice(SHORT_REPLIES) if tier in ("curious", "noise") else \
+                self._fill(rng, rng.choice(TIER_SENTENCES[tier]))
+        sentences = [self._fill(rng, rng.choice(TIER_SENTENCES[tier]))]
+        if kind == "long":
+            sentences = [self._fill(rng, s) for s in rng.sample(FILLER, 2)] + sentences
+            sentences += [self._fill(rng, rng.choice(TIER_SENTENCES[tier])) for _ in range(rng.randint(1, 3))]
+        body = " ".join(sentences)
+        if kind == "long" and previous:
+            quoted = "\n".join("> " + line for line in previous.splitlines())
+            body += "\n\nOn " + rng.choice(DAYS) + ", you wrote:\n" + quoted
+        return body
+
+    def lead(self, index):
+        """One lead: {"email", "tier", "messages": [{sender, body, timestamp}]}."""
+        # Per-lead RNG and a fixed start rate: lead i depends only on the
+        # seed, start and leads_per_day, not on how many leads are generated
+        rng = random.Random(f"{self.seed}:{index}")
+        tier = self._pick_tier(rng)
+        trajectory = rng.random()
+        # Starts are in index order (block sorting relies on it)
+        ts = self.start + self.interval * (index + rng.random())
+        messages = []
+        previous = None
+        n_lead = self._pick_length(rng)
+        for i in range(n_lead):
+            # ~20% of multi-reply threads warm up towards their tier, ~10% cool off
+            if trajectory < 0.2 and i < n_lead - 1:
+                current = "curious" if tier != "noise" else "noise"
+            elif trajectory > 0.9 and i == n_lead - 1 and n_lead > 1:
+                current = "noise"
+            else:
+                current = tier
+            if rng.random() < self.auto_reply_rate:
+                body = self._fill(rng, rng.choice(AUTO_REPLIES))
+            else:
+                body = self._body(rng, current, previous)
+            messages.append({"sender": "lead", "body": body, "timestamp": round(ts, 3)})
+            previous = body
+            if rng.random() < self.agent_rate:
+                ts += rng.lognormvariate(math.log(45 * 60), 1.2)   # median 45 min
+                messages.append({"sender": "agent", "body": self._fill(rng, rng.choice(AGENT_REPLIES)),
+                                 "timestamp": round(ts, 3)})
+            ts += rng.lognormvariate(math.log(20 * 3600), 1.0)     # median 20 h
+        return {"email": f"lead{index}@synth{index % 97}.example", "tier": tier, "messages": messages}
+
+    def leads(self, count, first=0):
+        for index in range(first, first + count):
+            yield self.lead(index)
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def write_csv(leads, path):
+    rows = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "thread_text", "created_at", "replied", "intended_tier"])
+        for lead in leads:
+            lead_msgs = [m for m in lead["messages"] if m["sender"] == "lead"]
+            last = lead_msgs[-1]
+            writer.writerow([lead["email"], last["body"], _iso(last["timestamp"]),
+                             "true" if lead["messages"][-1]["sender"] == "agent" else "false",
+                             lead["tier"]])
+            rows += 1
+    return rows
+
+
+def write_ndjson(leads, path, block=10000):
+    events = 0
+    with open(path, "w") as f:
+        while True:
+            chunk = list(itertools.islice(leads, block))
+            if not chunk:
+                break
+            batch = [(m["timestamp"], lead["email"], i, m, lead["tier"])
+                     for lead in chunk for i, m in enumerate(lead["messages"])]
+            batch.sort(key=lambda e: (e[0], e[1], e[2]))
+            for _, email, i, m, tier in batch:
+                f.write(json.dumps({"email": email, "body": m["body"], "timestamp": m["timestamp"],
+                                    "sender": m["sender"], "idempotency_key": f"{email}:{i}",
+                                    "intended_tier": tier}, separators=(",", ":")) + "\n")
+            events += len(batch)
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=100000)
+    parser.add_argument("--out", default="corpus/leads", help="output path prefix")
+    parser.add_argument("--format", choices=("csv", "ndjson", "both"), default="both")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start", type=float, help="epoch of the first lead (default: now - days)")
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--leads-per-day", type=float,
+                        help="lead start rate (default: --leads / --days)")
+    parser.add_argument("--zipf", type=float, default=1.6)
+    parser.add_argument("--max-messages", type=int, default=40)
+    parser.add_argument("--tier-mix", default="ready_now=0.05,evaluating=0.15,curious=0.3,noise=0.5")
+    parser.add_argument("--auto-reply-rate", type=float, default=0.08)
+    parser.add_argument("--agent-rate", type=float, default=0.6)
+    parser.add_argument("--block", type=int, default=10000, help="leads per NDJSON sort block")
+    args = parser.parse_args()
+
+    gen = CorpusGenerator(seed=args.seed, start=args.start, days=args.days,
+                          leads_per_day=args.leads_per_day or args.leads / args.days, zipf=args.zipf,
+                          max_messages=args.max_messages, tier_mix=args.tier_mix,
+                          auto_reply_rate=args.auto_reply_rate, agent_rate=args.agent_rate)
+    if os.path.dirname(args.out):
+        os.makedirs(os.path.dirname(args.out), exist_ok=True)
+
+    started = time.perf_counter()
+    if args.format in ("csv", "both"):
+        rows = write_csv(gen.leads(args.leads), args.out + ".csv")
+        print(f"{args.out}.csv: {rows:,} rows")
+    if args.format in ("ndjson", "both"):
+        events = write_ndjson(gen.leads(args.leads), args.out + ".ndjson", block=args.block)
+        print(f"{args.out}.ndjson: {events:,} events")
+    print(f"Generated in {time.perf_counter() - started:.1f}s (seed {args.seed})")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""
+Open-loop HTTP load replay.
+Replays a corpus against POST /score (main.py) or POST /webhook/reply
+(server.py) at a fixed arrival rate over a pool of keep-alive
+connections, then reports throughput, error rate and latency
+percentiles (p50 / p95 / p99 / p99.9).
+
+Open loop: request i is due at start + i / rate, whether or not earlier
+requests have finished. Latency is measured from that due time, so
+queueing behind a slow server counts (no coordinated omission). With
+--rate 0 the pool runs closed-loop, as fast as the server answers.
+
+The run stops at the end of the corpus unless --loop is given. Each
+later pass is rewritten so the webhook's idempotency index doesn't
+turn it into duplicates: the email gets a "+passN" tag, the timestamp
+moves past the previous pass and the Idempotency-Key gets a pass
+suffix. Replies the server still reports as "ignored_duplicate" are
+counted in the report.
+
+Corpus formats (one JSON object per line):
+  generated NDJSON   {"email", "body", "timestamp", "sender", ...}
+                     (benchmarks/generate_corpus.py)
+  backlog / notes    {"title", "body", ...}, e.g. requests.jsonl
+  plain text         any other line is sent as the reply body
+
+Usage:
+  python benchmarks/load_replay.py CORPUS [--target webhook|score]
+      [--url http://localhost:8081] [--rate 200] [--concurrency 32]
+      [--duration 30] [--limit N] [--loop] [--poisson] [--json results.json]
+
+Stdlib only (asyncio streams, HTTP/1.1 keep-alive; reconnects when the
+server closes the connection, as the Flask dev server does).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from quantile_sketch import DDSketch  # noqa: E402
+
+PATHS = {"webhook": "/webhook/reply", "score": "/score"}
+
+
+def load_corpus(path, target):
+    """(payload, body bytes, extra headers) per line, ready to send."""
+    requests = []
+    with open(path) as f:
+        for n, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                item = line
+            if not isinstance(item, dict):
+                item = {"body": str(item)}
+            text = item.get("body") or item.get("text") or item.get("title") or ""
+            headers = {}
+            if target == "score":
+                payload = {"text": text}
+            else:
+                payload = {
+                    "email": item.get("email") or f"replay{n}@load.test",
+                    "body": text,
+                    "timestamp": item.get("timestamp", time.time()),
+                    "sender": item.get("sender", "lead")
+                }
+                if item.get("idempotency_key"):
+                    headers["Idempotency-Key"] = item["idempotency_key"]
+            requests.append((payload, json.dumps(payload).encode(), headers))
+    return requests
+
+
+def replay_pass(requests, target, lap):
+    """
+    Yield (body bytes, headers) for pass `lap` over the corpus. The first
+    pass sends the pre-encoded bodies; later webhook passes are rewritten
+    (email tag, shifted timestamp, key suffix) so they aren't retries.
+    """
+    if lap == 0 or target != "webhook":
+        for _, body, headers in requests:
+            yield body, headers
+        return
+    timestamps = [p["timestamp"] for p, _, _ in requests]
+    shift = lap * (max(timestamps) - min(timestamps) + 1)
+    for payload, _, headers in requests:
+        local, _, domain = payload["email"].partition("@")
+        rewritten = dict(payload, email=f"{local}+pass{lap}@{domain}",
+                         timestamp=payload["timestamp"] + shift)
+        if "Idempotency-Key" in headers:
+            headers = {**headers, "Idempotency-Key": f"{headers['Idempotency-Key']}-pass{lap}"}
+        yield json.dumps(rewritten).encode(), headers
+
+
+class Connection:
+    """One HTTP/1.1 connection, reopened after the server closes it."""
+
+    def __init__(self, host, port, ssl):
+        self.host, self.port, self.ssl = host, port, ssl
+        self.reader = self.writer = None
+
+    async def _open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def post(self, path, body, headers):
+        """Returns (status, response body)."""
+        if self.writer is None:
+            await self._open()
+        head = [f"POST {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                "Content-Type: application/json", f"Content-Length: {len(body)}",
+                "Connection: keep-alive"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed before response")
+        version, status = status_line.split(b" ", 2)[:2]
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                chunks.append((await self.reader.readexactly(size + 2))[:size])
+                if size == 0:
+                    break
+            content = b"".join(chunks)
+        elif "content-length" in response_headers:
+            content = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            content = await self.reader.read()   # body runs to EOF
+            self.close()
+            return int(status), content
+
+        if version == b"HTTP/1.0" or response_headers.get("connection", "").lower() == "close":
+            self.close()
+        return int(status), content
+
+
+async def run(requests, url, target, rate, concurrency, duration, limit, poisson, loop=False, seed=1):
+    parts = urlsplit(url)
+    host = parts.hostname or "localhost"
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    ssl = parts.scheme == "https" or None
+    path = PATHS[target]
+
+    total = limit or (int(rate * duration) if rate else None)
+    # Closed loop keeps the queue shallow so the workers set the pace
+    queue = asyncio.Queue(maxsize=0 if rate else concurrency)
+    latency = DDSketch()
+    statuses = Counter()
+    errors = Counter()
+    deduplicated = 0
+    max_backlog = 0
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def schedule():
+        nonlocal max_backlog
+        rng = random.Random(seed)
+        due = start
+        laps = itertools.count() if loop else (0,)
+        source = itertools.chain.from_iterable(replay_pass(requests, target, lap) for lap in laps)
+        for i in itertools.count():
+            if (total is not None and i >= total) or due >= deadline:
+                break
+            item = next(source, None)
+            if item is None:
+                break
+            if rate:
+                due = start + i / rate if not poisson else due + rng.expovariate(rate)
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await queue.put((due, item))
+                max_backlog = max(max_backlog, queue.qsize())
+            else:
+                await queue.put((None, item))
+                if time.perf_counter() >= deadline:
+                    break
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker():
+        nonlocal deduplicated
+        conn = Connection(host, port, ssl)
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            due, (body, headers) = item
+            sent = time.perf_counter() if due is None else due
+            try:
+                status, content = await conn.post(path, body, headers)
+                statuses[status] += 1
+                if b'"ignored_duplicate"' in content:
+                    deduplicated += 1
+                if status >= 400:
+                    errors[f"http_{status}"] += 1
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                conn.close()
+                errors[type(e).__name__] += 1
+                statuses["error"] += 1
+            latency.add(time.perf_counter() - sent)
+        conn.close()
+
+    await asyncio.gather(schedule(), *(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    completed = sum(statuses.values())
+    failed = sum(errors.values())
+    return {
+        "target": f"{url.rstrip('/')}{path}",
+        "offered_rate": rate or None,
+        "concurrency": concurrency,
+        "elapsed_sec": round(elapsed, 3),
+        "requests": completed,
+        "throughput_rps": round(completed / elapsed, 1) if elapsed else 0.0,
+        "error_rate": round(failed / completed, 4) if completed else 0.0,
+        "errors": dict(errors),
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "deduplicated": deduplicated,
+        "max_backlog": max_backlog,
+        "latency_ms": {
+            "mean": round(latency.mean() * 1000, 2) if latency.count else None,
+            **{name: round(latency.quantile(q) * 1000, 2) if latency.count else None
+               for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("p99.9", 0.999))},
+            "max": round(latency.max * 1000, 2) if latency.count else None
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus")
+    parser.add_argument("--target", choices=sorted(PATHS), default="webhook")
+    parser.add_argument("--url", default="http://localhost:8081")
+    parser.add_argument("--rate", type=float, default=100.0, help="requests/sec (0 = closed loop)")
+    parser.add_argument("--concurrency", type=int, default=32, help="connections in the pool")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--limit", type=int, help="stop after this many requests")
+    parser.add_argument("--loop", action="store_true",
+                        help="replay the corpus again (rewritten) until --duration/--limit")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times")
+    parser.add_argument("--json", help="also write the report here")
+    args = parser.parse_args()
+
+    requests = load_corpus(args.corpus, args.target)
+    if not requests:
+        print(f"No requests in {args.corpus}")
+        return 1
+    report = asyncio.run(run(requests, args.url, args.target, args.rate, args.concurrency,
+                             args.duration, args.limit, args.poisson, args.loop))
+
+    lat = report["latency_ms"]
+    print(f"Target:       {report['target']}")
+    print(f"Offered:      {args.rate or 'closed loop'} req/s, {args.concurrency} connections")
+    print(f"Requests:     {report['requests']:,} in {report['elapsed_sec']}s")
+    print(f"Throughput:   {report['throughput_rps']:,} req/s")
+    print(f"Errors:       {report['error_rate'] * 100:.2f}% {report['errors'] or ''}")
+    print(f"Deduplicated: {report['deduplicated']:,} (ignored_duplicate replies)")
+    print(f"Max backlog:  {report['max_backlog']}")
+    print(f"Latency (ms): p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  "
+          f"p99.9 {lat['p99.9']}  max {lat['max']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
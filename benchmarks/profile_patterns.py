@@ -0,0 +1,63 @@
+"""
+Per-pattern profile of the decide_lead rule lists.
+Runs decide_lead over a corpus with the pattern profiler on and prints
+the most expensive patterns plus the ones that never matched.
+
+Usage: python benchmarks/profile_patterns.py [replies.csv] [--sort total_us|mean_us|max_us|hit_rate]
+The CSV needs a `text` column (same format as /score-batch-csv); without
+it a built-in corpus of short, typical and very long replies is used.
+"""
+
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pattern_profiler  # noqa: E402
+from reply_intelligence import decide_lead  # noqa: E402
+
+BUILTIN = [
+    "Let's talk",
+    "Thanks, will check.",
+    "Sounds good, let's proceed with next steps.",
+    "Not interested, please remove me.",
+    "Budget approved, please send the contract.",
+    "I passed this along to our head of operations; the founder makes the final decision.",
+    "What is the pricing? We are comparing vendors and need to launch this month. "
+    "Can your API integrate with our CRM?",
+    "We're currently using a competitor but we're struggling with reporting. Who else uses you?",
+]
+# Long inputs are where backtracking patterns (".*") get expensive
+LONG = [" ".join([text] * 40) for text in BUILTIN[4:]]
+
+
+def load_corpus(path):
+    with open(path, newline="") as f:
+        return [row["text"] for row in csv.DictReader(f) if row.get("text")]
+
+
+def main():
+    args = sys.argv[1:]
+    sort_by = "total_us"
+    if "--sort" in args:
+        i = args.index("--sort")
+        sort_by = args[i + 1]
+        del args[i:i + 2]
+    corpus = load_corpus(args[0]) if args else (BUILTIN + LONG) * 25
+
+    pattern_profiler.enable()
+    for text in corpus:
+        decide_lead(text)
+    profiler = pattern_profiler.PROFILER
+
+    print(f"Replies profiled: {len(corpus)}\n")
+    print(profiler.dump(sort_by=sort_by, limit=25))
+    never = profiler.never_hit()
+    print(f"\nNever matched ({len(never)} patterns):")
+    for row in never:
+        print(f"  {row['list']:<34} {row['pattern']}")
+
+
+if __name__ == "__main__":
+    main()
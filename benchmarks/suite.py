@@ -0,0 +1,339 @@
+"""
+Scoring engine benchmark suite.
+Times the engine entry points and the hot HTTP routes on fixed, seeded
+corpora, reports ops/sec with run-to-run variance, writes the results as
+JSON and compares them against a saved baseline.
+
+  decide_lead        one reply through the full rule pipeline
+  analyze_thread     1 / 3 / 10 message threads
+  extract_signals    ReplyIntelligence._extract_signals alone
+  score              POST /score            (FastAPI test client)
+  score_batch_csv    POST /score-batch-csv  (200-row upload)
+  webhook_reply      POST /webhook/reply    (Flask test client)
+  dashboard          GET /api/dashboard     (500 leads)
+
+Usage:
+  python benchmarks/suite.py [--only NAME[,NAME]] [--rounds N] [--min-time S]
+                             [--save-baseline] [--baseline PATH]
+                             [--threshold 0.10] [--fail-on-regression]
+
+Each run is written to benchmarks/results/<timestamp>.json. With a
+baseline (benchmarks/baseline.json by default) every benchmark whose
+mean ops/sec dropped by more than max(threshold, 2 x its coefficient of
+variation) is flagged as a regression. Baselines are only comparable on
+the machine that recorded them.
+"""
+
+import argparse
+import csv
+import gc
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# ==========================================
+# FIXED CORPORA (seeded, identical every run)
+# ==========================================
+REPLIES = [
+    "ok",
+    "Let's talk",
+    "Thanks, will check.",
+    "Not interested, please remove me.",
+    "Please unsubscribe me.",
+    "I'm out of office until Monday with limited access to email.",
+    "I passed this along to our head of operations; the founder makes the final decision.",
+    "Budget approved, please send the contract.",
+    "Looks interesting, keep me posted.",
+    "We're drowning in manual work. How does onboarding work and what does it cost?",
+    "What is the pricing? We are comparing vendors and need to launch this month. "
+    "Can your API integrate with our CRM?",
+    "We're currently using a competitor but we're struggling with reporting. Who else uses you?",
+]
+# Long inputs are where backtracking patterns get expensive
+REPLIES += [" ".join([text] * 20) for text in REPLIES[-3:]]
+
+
+def make_thread(rng, length, start=1700000000.0):
+    thread = []
+    for i in range(length):
+        sender = "lead" if i % 2 == 0 else "agent"
+        body = rng.choice(REPLIES) if sender == "lead" else "Happy to help, here are the details."
+        thread.append({"sender": sender, "body": body, "timestamp": start + i * 1800})
+    return thread
+
+
+def make_csv(rows, seed=11):
+    rng = random.Random(seed)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["id", "thread_text", "created_at"])
+    for i in range(rows):
+        writer.writerow([f"row{i}", rng.choice(REPLIES), "2026-01-01T09:00:00"])
+    return out.getvalue().encode("utf-8")
+
+
+# ==========================================
+# BENCHMARKS
+# ==========================================
+# Each entry is setup() -> op, where op() performs one operation.
+# Ops that walk a corpus carry its length as op.cycle, so every round
+# covers whole passes and the input mix is the same from round to round.
+BENCHMARKS = {}
+
+
+def cycled(items, fn):
+    state = [0]
+
+    def op():
+        fn(items[state[0] % len(items)])
+        state[0] += 1
+    op.cycle = len(items)
+    return op
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@benchmark("decide_lead")
+def _decide_lead():
+    from reply_intelligence import decide_lead
+    return cycled(REPLIES, decide_lead)
+
+
+@benchmark("analyze_thread.1")
+def _analyze_1():
+    return _analyze(1)
+
+
+@benchmark("analyze_thread.3")
+def _analyze_3():
+    return _analyze(3)
+
+
+@benchmark("analyze_thread.10")
+def _analyze_10():
+    return _analyze(10)
+
+
+def _analyze(length):
+    from reply_intelligence import ReplyIntelligence
+    engine = ReplyIntelligence()
+    rng = random.Random(length)
+    return cycled([make_thread(rng, length) for _ in range(50)], engine.analyze_thread)
+
+
+@benchmark("extract_signals")
+def _extract_signals():
+    from reply_intelligence import ReplyIntelligence
+    engine = ReplyIntelligence()
+    rng = random.Random(3)
+    return cycled([make_thread(rng, 3) for _ in range(50)], engine._extract_signals)
+
+
+def _fastapi_client():
+    from fastapi.testclient import TestClient
+    import main
+    return TestClient(main.app)
+
+
+@benchmark("score")
+def _score():
+    client = _fastapi_client()
+    return cycled(REPLIES, lambda text: client.post("/score", json={"text": text}))
+
+
+@benchmark("score_batch_csv")
+def _score_batch_csv():
+    client = _fastapi_client()
+    payload = make_csv(200)
+    return lambda: client.post("/score-batch-csv", files={"file": ("bench.csv", payload, "text/csv")})
+
+
+@benchmark("webhook_reply")
+def _webhook_reply():
+    import server
+    server.LEAD_DB.clear()
+    client = server.app.test_client()
+    rng = random.Random(5)
+    state = {"n": 0, "ts": 1700000000.0}
+
+    def op():
+        n = state["n"]
+        state["n"] += 1
+        state["ts"] += 60
+        client.post("/webhook/reply", json={
+            "email": f"lead{n % 1000}@bench.test", "body": rng.choice(REPLIES),
+            "timestamp": state["ts"], "sender": "lead" if n % 3 else "agent"})
+    return op
+
+
+@benchmark("dashboard")
+def _dashboard():
+    import server
+    server.LEAD_DB.clear()
+    client = server.app.test_client()
+    rng = random.Random(9)
+    ts = 1700000000.0
+    for n in range(500):
+        for j in range(rng.randint(1, 4)):
+            client.post("/webhook/reply", json={
+                "email": f"lead{n}@bench.test", "body": rng.choice(REPLIES),
+                "timestamp": ts + j * 1800, "sender": "lead" if j % 2 == 0 else "agent"})
+    return lambda: client.get("/api/dashboard")
+
+
+# ==========================================
+# RUNNER
+# ==========================================
+def measure(op, rounds, min_time):
+    """ops/sec for each of `rounds` rounds, each lasting about `min_time` seconds."""
+    cycle = getattr(op, "cycle", 1)
+    op()   # warm-up (imports, regex compile cache, lazy state)
+    start = time.perf_counter()
+    for _ in range(cycle):
+        op()
+    single = max((time.perf_counter() - start) / cycle, 1e-7)
+    number = max(cycle, -(-int(min_time / single) // cycle) * cycle)
+    rates = []
+    gc_was_enabled = gc.isenabled()
+    try:
+        for _ in range(rounds):
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            for _ in range(number):
+                op()
+            elapsed = time.perf_counter() - start
+            if gc_was_enabled:
+                gc.enable()
+            rates.append(number / elapsed)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    mean = statistics.mean(rates)
+    stdev = statistics.stdev(rates) if len(rates) > 1 else 0.0
+    return {
+        "ops_per_sec": round(mean, 2),
+        "stdev": round(stdev, 2),
+        "cv": round(stdev / mean, 4) if mean else 0.0,
+        "min": round(min(rates), 2),
+        "max": round(max(rates), 2),
+        "rounds": rounds,
+        "number": number,
+        "us_per_op": round(1e6 / mean, 2) if mean else None
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Rows of (name, baseline ops/sec, current ops/sec, change, regressed)."""
+    rows = []
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "ops_per_sec" not in current:
+            continue
+        change = current["ops_per_sec"] / base["ops_per_sec"] - 1
+        tolerance = max(threshold, 2 * max(current.get("cv", 0), base.get("cv", 0)))
+        rows.append((name, base["ops_per_sec"], current["ops_per_sec"], change, change < -tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help="comma-separated benchmark names (prefix match)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per round")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    names = list(BENCHMARKS)
+    if args.only:
+        wanted = [w.strip() for w in args.only.split(",")]
+        names = [n for n in names if any(n.startswith(w) for w in wanted)]
+
+    results = {}
+    print(f"{'benchmark':<20} {'ops/sec':>12} {'+/-':>8} {'cv':>7} {'us/op':>10}")
+    for name in names:
+        try:
+            op = BENCHMARKS[name]()
+        except ImportError as e:
+            results[name] = {"skipped": str(e)}
+            print(f"{name:<20} skipped ({e})")
+            continue
+        r = results[name] = measure(op, args.rounds, args.min_time)
+        print(f"{name:<20} {r['ops_per_sec']:>12,.1f} {r['stdev']:>8,.1f} "
+              f"{r['cv'] * 100:>6.1f}% {r['us_per_op']:>10,.1f}")
+
+    run = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rounds": args.rounds,
+            "min_time": args.min_time
+        },
+        "results": results
+    }
+    if "score_batch_csv" in results:
+        # The CSV route persists duplicate-suppression memory to disk
+        from reply_intelligence import clear_lead_memory
+        clear_lead_memory()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(out_path, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"\nResults: {out_path}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Baseline saved: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline).")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.threshold)
+    regressions = [r for r in rows if r[4]]
+    print(f"\nVs baseline {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}):")
+    for name, base, current, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"  {name:<20} {base:>12,.1f} -> {current:>12,.1f}  {change * 100:+6.1f}%{flag}")
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import json
+import os
+import time
+import urllib.request
+
+# ==========================================
+# HARNESS TRANSPORT (Stress / Edge Scripts)
+# ==========================================
+# How stress_test_protocol.py, synthetic_batch_12.py, synthetic_round2.py
+# and tests/edge_matrix.py reach the scoring server:
+#
+#   HARNESS_TRANSPORT=http     live server at HARNESS_URL (default; the
+#                              original behaviour)
+#   HARNESS_TRANSPORT=client   Flask test client, in-process (full
+#                              request path, no socket)
+#   HARNESS_TRANSPORT=direct   server._score_reply for webhook posts, no
+#                              HTTP or JSON at all; other routes fall
+#                              back to the test client
+#
+# In-process transports get a fresh LEAD_DB per process, so scripts can
+# run side by side (see run_harnesses.py) without sharing leads.
+HARNESS_TRANSPORT = os.environ.get("HARNESS_TRANSPORT", "http")
+HARNESS_URL = os.environ.get("HARNESS_URL", "http://localhost:8081")
+
+
+class HttpTransport:
+    name = "http"
+
+    def __init__(self, base=HARNESS_URL):
+        self.base = base.rstrip("/")
+
+    def post_json(self, path, payload):
+        req = urllib.request.Request(
+            f"{self.base}{path}",
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req) as res:
+            return json.loads(res.read())
+
+    def get_json(self, path):
+        with urllib.request.urlopen(f"{self.base}{path}") as res:
+            return json.loads(res.read())
+
+
+class ClientTransport:
+    name = "client"
+
+    def __init__(self):
+        import server   # deferred: importing it builds the app and LEAD_DB
+        self.server = server
+        self.client = server.app.test_client()
+
+    def post_json(self, path, payload):
+        return self.client.post(path, json=payload).get_json()
+
+    def get_json(self, path):
+        return self.client.get(path).get_json()
+
+
+class DirectTransport(ClientTransport):
+    name = "direct"
+
+    def post_json(self, path, payload):
+        if path != "/webhook/reply":
+            return super().post_json(path, payload)
+        return self.server._score_reply(
+            payload["email"], payload["body"], payload.get("timestamp", time.time()),
+            payload.get("sender", "lead"), payload.get("idempotency_key"))
+
+
+TRANSPORTS = {"http": HttpTransport, "client": ClientTransport, "direct": DirectTransport}
+
+
+def get_transport(name=None):
+    name = name or HARNESS_TRANSPORT
+    if name not in TRANSPORTS:
+        raise ValueError(f"HARNESS_TRANSPORT must be one of {', '.join(TRANSPORTS)}, got {name!r}")
+    return TRANSPORTS[name]()
+
+
+TRANSPORT = get_transport()
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ==========================================
+# IDEMPOTENCY INDEX (Webhook Deduplication)
+# ==========================================
+# Global index of recently applied messages, replacing the scan of the
+# last 5 thread messages. A message is keyed by
+#   (email, sender, body hash, timestamp bucket)
+# and matches a retry when the event timestamps are < DEDUP_WINDOW apart
+# (the neighbouring buckets are probed, so lookups stay O(1)).
+# Providers that send an `Idempotency-Key` header get an exact match on
+# that key as well.
+#
+# Memory is bounded two ways: entries expire INDEX_TTL_SECONDS after they
+# were added (wall clock) and the oldest entries are evicted past MAX_KEYS.
+# A message costs one key (two with a provider key), so MAX_KEYS has to
+# cover every message received within the TTL: the default holds about
+# 11 messages/sec sustained over 6 h. Past that, the oldest keys are
+# evicted early (counted in `evicted`) and retries of those messages are
+# no longer caught; raise IDEMPOTENCY_MAX_KEYS for busier deployments.
+#
+# On restart only messages whose timestamp is inside the TTL are
+# re-indexed, in timestamp order, so the rebuilt index holds exactly
+# what a live one would and the number of leads doesn't matter.
+#
+# The webhook path only check()s; keys are added by on_publish once the
+# message is actually stored, so a scoring failure (nothing published)
+# never turns the client's retry into a duplicate.
+DEDUP_WINDOW_SECONDS = 300
+INDEX_TTL_SECONDS = 6 * 3600
+MAX_KEYS = int(os.environ.get("IDEMPOTENCY_MAX_KEYS", "500000"))
+
+
+def _body_hash(body):
+    return hashlib.blake2b(body.encode("utf-8", "replace"), digest_size=12).digest()
+
+
+class IdempotencyIndex:
+    """TTL- and size-bounded set of applied message keys."""
+
+    def __init__(self, window=DEDUP_WINDOW_SECONDS, ttl=INDEX_TTL_SECONDS, max_keys=MAX_KEYS):
+        self.window = window
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> (event timestamp, added_at); insertion order == added_at order
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def _message_key(self, email, sender, body_hash, bucket):
+        return ("m", email, sender, body_hash, bucket)
+
+    def _seen(self, email, sender, body_hash, bucket, timestamp, provider_key):
+        if provider_key and ("k", email, provider_key) in self._entries:
+            return True
+        for b in (bucket - 1, bucket, bucket + 1):
+            entry = self._entries.get(self._message_key(email, sender, body_hash, b))
+            if entry is not None and abs(entry[0] - timestamp) < self.window:
+                return True
+        return False
+
+    def seen(self, email, body, timestamp, sender, provider_key=None):
+        """Read-only lookup: True if this message was already applied."""
+        with self._lock:
+            self._expire(time.time())
+            return self._seen(email, sender, _body_hash(body), int(timestamp // self.window),
+                              timestamp, provider_key)
+
+    def check(self, email, body, timestamp, sender, provider_key=None, pending=()):
+        """
+        Returns True if this message was already applied (a retry) or
+        repeats one of `pending`, the messages accepted earlier in the same
+        not-yet-published transaction. Records nothing (see on_publish).
+        """
+        body_hash = _body_hash(body)
+        with self._lock:
+            self._expire(time.time())
+            duplicate = self._seen(email, sender, body_hash, int(timestamp // self.window),
+                                   timestamp, provider_key)
+            if not duplicate:
+                duplicate = any(
+                    (provider_key and msg.get('idempotency_key') == provider_key)
+                    or (msg['sender'] == sender and msg['body'] == body
+                        and abs(msg['timestamp'] - timestamp) < self.window)
+                    for msg in pending)
+            if duplicate:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return duplicate
+
+    def _insert(self, key, timestamp, now):
+        self._entries[key] = (timestamp, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def _expire(self, now):
+        cutoff = now - self.ttl
+        entries = self._entries
+        while entries:
+            key, (_, added_at) = next(iter(entries.items()))
+            if added_at >= cutoff:
+                break
+            entries.popitem(last=False)
+
+    def rebuild(self, items):
+        """
+        Re-indexes messages from lead records after a restart: those with
+        a timestamp inside the TTL (walking back from the end of each
+        thread), added oldest first and aged from their own timestamp.
+        """
+        now = time.time()
+        cutoff = now - self.ttl
+        recent = []
+        for email, record in items:
+            thread = record.get('thread', [])
+            for pos in range(len(thread) - 1, -1, -1):
+                msg = thread[pos]
+                if msg['timestamp'] < cutoff:
+                    break
+                recent.append((msg['timestamp'], email, msg))
+        recent.sort(key=lambda item: item[0])
+        with self._lock:
+            for timestamp, email, msg in recent:
+                self._add(email, msg, min(timestamp, now))
+
+    def _add(self, email, msg, added_at):
+        bucket = int(msg['timestamp'] // self.window)
+        key = self._message_key(email, msg['sender'], _body_hash(msg['body']), bucket)
+        self._insert(key, msg['timestamp'], added_at)
+        if msg.get('idempotency_key'):
+            self._insert(("k", email, msg['idempotency_key']), msg['timestamp'], added_at)
+
+    def add_messages(self, email, messages):
+        """Indexes stored messages of one lead."""
+        now = time.time()
+        with self._lock:
+            for msg in messages:
+                self._add(email, msg, now)
+
+    def on_publish(self, email, old, new):
+        """
+        LeadStore listener: indexes the messages a publish appended and
+        forgets everything when the store is cleared.
+        """
+        if email is None:
+            self.clear()
+            return
+        if new is None:
+            return
+        thread = new.get('thread') or []
+        start = 0
+        old_thread = old.get('thread') if old is not None else None
+        if old_thread:
+            # Messages are shared between record copies: find where the
+            # previously published thread ended (normally the last message)
+            last = old_thread[-1]
+            for pos in range(len(thread) - 1, -1, -1):
+                if thread[pos] is last:
+                    start = pos + 1
+                    break
+        if start < len(thread):
+            self.add_messages(email, thread[start:])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
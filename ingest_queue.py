@@ -0,0 +1,110 @@
+import queue
+import threading
+import time
+
+# ==========================================
+# INGEST QUEUE (Burst Absorption)
+# ==========================================
+# After a campaign send the email provider delivers thousands of replies
+# at once. In async mode the webhook only validates + dedups, drops the
+# event here and answers 202; a pool of scoring workers drains it.
+#
+# Ordering: each lead is hashed to exactly one partition and every
+# partition is drained by exactly one worker, so replies for the same
+# lead are always scored in arrival order.
+NUM_WORKERS = 4
+MAX_DEPTH = 100000
+
+
+class IngestQueue:
+    """Partitioned FIFO work queue with a fixed worker pool."""
+
+    def __init__(self, handler, num_workers=NUM_WORKERS, max_depth=MAX_DEPTH):
+        self.handler = handler
+        self.num_workers = max(1, num_workers)
+        self.max_depth = max_depth
+        self._partitions = [queue.Queue() for _ in range(self.num_workers)]
+        self._workers = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    def start(self):
+        with self._start_lock:
+            if self._workers:
+                return
+            for i, partition in enumerate(self._partitions):
+                worker = threading.Thread(
+                    target=self._drain, args=(partition,),
+                    name=f"ingest-worker-{i}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, email, event):
+        """Queues an event for `email`. Returns False when the queue is full."""
+        if self.depth() >= self.max_depth:
+            return False
+        self.start()
+        partition = self._partitions[hash(email) % self.num_workers]
+        partition.put((time.time(), email, event))
+        with self._stats_lock:
+            self.enqueued += 1
+        return True
+
+    def _drain(self, partition):
+        while True:
+            enqueued_at, email, event = partition.get()
+            try:
+                self.handler(email, event)
+                ok = True
+            except Exception as e:
+                ok = False
+                print(f"Ingest Worker Error ({email}): {e}")
+            finally:
+                partition.task_done()
+            lag = time.time() - enqueued_at
+            with self._stats_lock:
+                if ok:
+                    self.processed += 1
+                else:
+                    self.failed += 1
+                self.last_lag_seconds = lag
+                self.max_lag_seconds = max(self.max_lag_seconds, lag)
+
+    def depth(self):
+        return sum(p.qsize() for p in self._partitions)
+
+    def oldest_age_seconds(self):
+        """Age of the oldest event still waiting (0 when idle)."""
+        now = time.time()
+        oldest = now
+        for partition in self._partitions:
+            with partition.mutex:
+                if partition.queue:
+                    oldest = min(oldest, partition.queue[0][0])
+        return now - oldest
+
+    def join(self):
+        """Blocks until every queued event has been processed."""
+        for partition in self._partitions:
+            partition.join()
+
+    def metrics(self):
+        with self._stats_lock:
+            return {
+                "depth": self.depth(),
+                "partition_depths": [p.qsize() for p in self._partitions],
+                "workers": self.num_workers,
+                "running": bool(self._workers),
+                "enqueued": self.enqueued,
+                "processed": self.processed,
+                "failed": self.failed,
+                "oldest_waiting_seconds": round(self.oldest_age_seconds(), 3),
+                "last_lag_seconds": round(self.last_lag_seconds, 3),
+                "max_lag_seconds": round(self.max_lag_seconds, 3)
+            }
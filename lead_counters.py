@@ -0,0 +1,115 @@
+import threading
+
+# ==========================================
+# LEAD COUNTERS (Incremental Dashboard Aggregates)
+# ==========================================
+# The dashboard stats / SLA / band distribution used to be recomputed by
+# scanning every lead (and every thread) on each poll. Instead each lead
+# *contributes* a small vector to a set of global counters; the store
+# listener subtracts the old record's contribution and adds the new one
+# on every publish, so reads are O(1).
+#
+# Contribution of one lead:
+#   band            ready_now | evaluating | curious | noise
+#   replies         lead messages (lead_reply_count)
+#   time_saved      replies * 5 minutes for noise leads
+#   sla bucket      for score >= 60: under_30 | over_30 | no_response
+MINUTES_SAVED_PER_NOISE_REPLY = 5
+SLA_SCORE_THRESHOLD = 60
+SLA_MINUTES = 30
+
+BANDS = ("ready_now", "evaluating", "curious", "noise")
+SLA_BUCKETS = ("responded_under_30m", "responded_over_30m", "no_response_yet")
+
+
+def lead_reply_count(record):
+    """Lead messages in the thread, including folded history."""
+    count = record.get('lead_reply_count')
+    if count is not None:
+        return count
+    thread = record.get('thread', [])
+    return (sum(1 for m in thread if m.get('sender') == 'lead')
+            + record.get('thread_summary', {}).get('lead_messages', 0))
+
+
+class LeadCounters:
+    """Global aggregates kept in sync with a LeadStore via subscribe()."""
+
+    def __init__(self, band_of):
+        self.band_of = band_of
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.leads = 0
+        self.bands = dict.fromkeys(BANDS, 0)
+        self.sla = dict.fromkeys(SLA_BUCKETS, 0)
+        self.total_replies = 0
+        self.time_saved_minutes = 0
+
+    def _contribution(self, record):
+        band = self.band_of(record.get('state', 'Noise'))
+        replies = lead_reply_count(record)
+        sla = None
+        if record.get('score', 0) >= SLA_SCORE_THRESHOLD:
+            avg_resp = record.get('avg_response_time_min')
+            if avg_resp is not None:
+                sla = SLA_BUCKETS[0] if avg_resp <= SLA_MINUTES else SLA_BUCKETS[1]
+            elif record.get('last_lead_reply_at'):
+                sla = SLA_BUCKETS[2]
+        saved = replies * MINUTES_SAVED_PER_NOISE_REPLY if band == "noise" else 0
+        return band, replies, saved, sla
+
+    def _apply(self, contribution, sign):
+        band, replies, saved, sla = contribution
+        self.leads += sign
+        self.bands[band] += sign
+        self.total_replies += sign * replies
+        self.time_saved_minutes += sign * saved
+        if sla is not None:
+            self.sla[sla] += sign
+
+    def on_publish(self, email, old, new):
+        """LeadStore listener."""
+        if email is None:
+            with self._lock:
+                self._reset()
+            return
+        # Records are immutable once published: compute outside the lock
+        removed = self._contribution(old) if old is not None else None
+        added = self._contribution(new) if new is not None else None
+        with self._lock:
+            if removed is not None:
+                self._apply(removed, -1)
+            if added is not None:
+                self._apply(added, +1)
+
+    def rebuild(self, items):
+        with self._lock:
+            self._reset()
+            for _, record in items:
+                self._apply(self._contribution(record), +1)
+
+    def snapshot(self):
+        """Dashboard-shaped stats, sla and band_distribution."""
+        with self._lock:
+            total = self.leads
+            bands = dict(self.bands)
+            sla = dict(self.sla)
+            replies = self.total_replies
+            saved = self.time_saved_minutes
+        return {
+            "stats": {
+                "total_analyzed": replies,
+                "ready_count": bands["ready_now"],
+                "evaluating_count": bands["evaluating"],
+                "time_saved_minutes": saved
+            },
+            "sla": sla,
+            "band_distribution": {
+                band: round(count / total * 100) if total else 0
+                for band, count in bands.items()
+            },
+            "band_counts": bands,
+            "total_leads": total
+        }
@@ -0,0 +1,231 @@
+import glob
+import json
+import os
+import threading
+import time
+from array import array
+
+import metrics
+from lead_record import to_json
+
+# ==========================================
+# LEAD JOURNAL (Durability)
+# ==========================================
+# Append-only write-ahead log of every published lead change, plus
+# periodic compact snapshots. Each log line is a *delta* against the
+# previously published record (fields set, list items appended), so
+# recovery replays stored results and never re-runs analyze_thread.
+#
+# Layout of the data directory:
+#   snapshot.jsonl          header line {"seq": N, ...} then [email, record] lines
+#   wal-<first seq>.log     one JSON delta per line, seq strictly increasing
+SNAPSHOT_FILE = "snapshot.jsonl"
+SNAPSHOT_EVERY = 50000   # log entries between compactions
+
+_MISSING = object()
+
+
+def _diff(old, new):
+    """Returns (set, append, unset) taking `old` to `new`."""
+    sets, appends = {}, {}
+    for key, value in new.items():
+        prev = old.get(key, _MISSING)
+        if prev is value:
+            continue
+        if (isinstance(value, (list, array)) and type(prev) is type(value)
+                and len(value) >= len(prev) and value[:len(prev)] == prev):
+            # Append-only growth (thread, score_history, ...): log the tail only.
+            # The whole prefix is compared; copy-on-write shares its items,
+            # so the comparison is mostly identity checks in C.
+            if len(value) > len(prev):
+                appends[key] = value[len(prev):]
+            continue
+        if prev is _MISSING or prev != value:
+            sets[key] = value
+    unset = [key for key in old if key not in new]
+    return sets, appends, unset
+
+
+def apply_delta(record, entry):
+    """Applies one log entry to `record` (or builds it) and returns it."""
+    if record is None or entry.get("new"):
+        record = {}
+    record.update(entry.get("set", {}))
+    for key, items in entry.get("append", {}).items():
+        record.setdefault(key, []).extend(items)
+    for key in entry.get("unset", []):
+        record.pop(key, None)
+    return record
+
+
+class LeadJournal:
+    """Write-ahead log + snapshot compaction for a LeadStore."""
+
+    def __init__(self, data_dir, snapshot_every=SNAPSHOT_EVERY, fsync=False):
+        self.data_dir = data_dir
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.last_flush_seconds = 0.0
+        self._file = None
+        self._since_snapshot = 0
+        self._compacting = False
+        os.makedirs(data_dir, exist_ok=True)
+
+    # ── Recovery ──
+    def recover(self):
+        """Loads the latest snapshot plus the log tail. Returns {email: record}."""
+        records = {}
+        snapshot_seq = 0
+        path = os.path.join(self.data_dir, SNAPSHOT_FILE)
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                header = json.loads(f.readline())
+                snapshot_seq = header.get("seq", 0)
+                for line in f:
+                    email, record = json.loads(line)
+                    records[email] = record
+
+        self.seq = snapshot_seq
+        for segment in self._segments():
+            with open(segment, "rb+") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("partial line")
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn write at crash time: drop the tail so new
+                        # appends to this segment stay readable
+                        f.truncate(offset)
+                        break
+                    offset += len(line)
+                    if entry["seq"] <= snapshot_seq:
+                        continue
+                    self._replay(records, entry)
+                    self.seq = entry["seq"]
+                    self._since_snapshot += 1
+
+        self._open_segment()
+        return records
+
+    def _replay(self, records, entry):
+        op = entry["op"]
+        email = entry.get("email")
+        if op == "clear":
+            records.clear()
+        elif op == "delete":
+            records.pop(email, None)
+        else:
+            records[email] = apply_delta(records.get(email), entry)
+
+    # ── Logging ──
+    def encode(self, op, email, old, new):
+        """Builds the log payload (without seq) outside the journal lock."""
+        entry = {"op": op, "email": email}
+        if new is None:
+            pass
+        elif old is None:
+            entry["new"] = True
+            entry["set"] = new
+        else:
+            sets, appends, unset = _diff(old, new)
+            if sets:
+                entry["set"] = sets
+            if appends:
+                entry["append"] = appends
+            if unset:
+                entry["unset"] = unset
+        return json.dumps(entry, separators=(",", ":"), default=to_json)
+
+    def write(self, payload):
+        """
+        Appends an encoded entry. Caller must hold self.lock.
+        `seq` only advances once the entry is flushed.
+        """
+        seq = self.seq + 1
+        start = time.perf_counter()
+        self._file.write('{"seq":%d,%s\n' % (seq, payload[1:]))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.seq = seq
+        self.last_flush_seconds = time.perf_counter() - start
+        metrics.JOURNAL_FLUSH.observe(self.last_flush_seconds)
+        self._since_snapshot += 1
+        return self.seq
+
+    def needs_snapshot(self):
+        return self._since_snapshot >= self.snapshot_every and not self._compacting
+
+    # ── Compaction ──
+    def compact(self, snapshot):
+        """
+        Rotates the log and writes a snapshot of the store.
+        `snapshot()` (LeadStore.snapshot) is taken with the rotation under
+        the journal lock, so it matches `seq`; the (slow) snapshot write
+        runs outside it, because published records and shards are immutable.
+        No-op while another compaction is running.
+        """
+        if self._claim_compaction():
+            self._compact(snapshot)
+
+    def compact_async(self, snapshot):
+        """compact() on a background thread; at most one runs at a time."""
+        if self._claim_compaction():
+            threading.Thread(target=self._compact, args=(snapshot,), daemon=True).start()
+
+    def _claim_compaction(self):
+        with self.lock:
+            if self._compacting:
+                return False
+            self._compacting = True
+            return True
+
+    def _compact(self, snapshot):
+        try:
+            with self.lock:
+                seq = self.seq
+                records = snapshot()
+                self._open_segment()
+                self._since_snapshot = 0
+            self._write_snapshot(records, seq)
+            for segment in self._segments():
+                if self._segment_start(segment) <= seq:
+                    os.remove(segment)
+        finally:
+            self._compacting = False
+
+    def _write_snapshot(self, records, seq):
+        path = os.path.join(self.data_dir, SNAPSHOT_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(json.dumps({"seq": seq, "count": len(records), "created": time.time()}) + "\n")
+            for email, record in records.items():
+                f.write(json.dumps([email, record], separators=(",", ":"), default=to_json))
+                f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    # ── Segments ──
+    def _segments(self):
+        return sorted(glob.glob(os.path.join(self.data_dir, "wal-*.log")), key=self._segment_start)
+
+    @staticmethod
+    def _segment_start(path):
+        return int(os.path.basename(path)[4:-4])
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.data_dir, "wal-%020d.log" % (self.seq + 1))
+        self._file = open(path, "a")
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,247 @@
+import sys
+from array import array
+
+# ==========================================
+# LEAD RECORD (Compact Representation)
+# ==========================================
+# LEAD_DB entries used to be plain dicts (~20 keys) holding a dict per
+# message, which costs kilobytes per lead in interpreter overhead alone.
+# LeadRecord / Message keep the same fields in __slots__:
+#   - short categorical strings (state, momentum, sender, ...) are interned
+#   - score_history is a typed array, not a list of int objects
+#   - response times are running aggregates (count / mean / EWMA); old
+#     records may still carry the legacy response_times array
+#   - the default profile is not stored at all
+# Both classes keep a dict-compatible interface (record['score'],
+# record.get('thread'), 'outcome' in record, items()) so the webhook code
+# and analyze_thread work unchanged; to_dict() gives the JSON view.
+
+_INTERNED = frozenset(("state", "momentum", "cliff_flag", "outcome", "sender"))
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Message:
+    """One thread message (lead or agent)."""
+    __slots__ = ("body", "timestamp", "sender", "idempotency_key")
+
+    def __init__(self, body, timestamp, sender, idempotency_key=None):
+        self.body = body
+        self.timestamp = timestamp
+        self.sender = _intern(sender)
+        self.idempotency_key = idempotency_key
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["body"], data["timestamp"], data.get("sender", "lead"),
+                   data.get("idempotency_key"))
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            value = getattr(self, key)
+            if value is not None or key != "idempotency_key":
+                return value
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def to_dict(self):
+        data = {"body": self.body, "timestamp": self.timestamp, "sender": self.sender}
+        if self.idempotency_key is not None:
+            data["idempotency_key"] = self.idempotency_key
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, Message):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __repr__(self):
+        return f"Message({self.to_dict()!r})"
+
+
+class LeadRecord:
+    """Slotted LEAD_DB entry with a dict-compatible interface."""
+    FIELDS = (
+        "email", "thread", "score", "state", "signals", "full_explanation",
+        "last_updated", "cliff_flag", "profile", "score_history",
+        "intent_jump_alert", "response_times", "avg_response_time_min",
+        "response_count", "response_mean_sec", "response_ewma_sec", "lead_reply_count", "outcome", "last_lead_reply_at", "disagreements", "momentum",
+        "tiebreaker", "raw_signals", "raw_metrics", "thread_summary", "momentum_state",
+    )
+    __slots__ = FIELDS + ("_extra",)
+    _FIELD_SET = frozenset(FIELDS)
+
+    def __init__(self, email, timestamp=None):
+        self.email = email
+        self.thread = []
+        self.score = 0
+        self.state = "Noise"
+        self.signals = []
+        self.full_explanation = []
+        self.last_updated = timestamp
+        self.cliff_flag = None
+        self.profile = None  # None == the default {"name": "Unknown", "email": email}
+        self.score_history = array("h")
+        self.intent_jump_alert = None
+        self.avg_response_time_min = None
+        self.response_count = 0
+        self.response_mean_sec = None
+        self.response_ewma_sec = None
+        self.lead_reply_count = 0
+        self.outcome = None
+        self.last_lead_reply_at = None
+        self.disagreements = []
+        self._extra = None
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        record = cls(data.get("email"))
+        for key, value in data.items():
+            record[key] = value
+        if "lead_reply_count" not in data:
+            # Written before the counter existed
+            record.lead_reply_count = (
+                sum(1 for m in record.thread if m.sender == "lead")
+                + data.get("thread_summary", {}).get("lead_messages", 0))
+        return record
+
+    # ── Dict-compatible interface ──
+    def __setitem__(self, key, value):
+        if key not in self._FIELD_SET:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+            return
+        if key in _INTERNED:
+            value = _intern(value)
+        elif key == "score_history" and not isinstance(value, array):
+            value = array("h", value)
+        elif key == "response_times" and not isinstance(value, array):
+            value = array("d", value)
+        elif key == "thread":
+            value = [m if isinstance(m, Message) else Message.from_dict(m) for m in value]
+        elif key == "profile" and value == self._default_profile():
+            value = None
+        setattr(self, key, value)
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            if key == "profile" and value is None:
+                return self._default_profile()
+            return value
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        if key in self._FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __delitem__(self, key):
+        if key in self._FIELD_SET:
+            if not hasattr(self, key):
+                raise KeyError(key)
+            delattr(self, key)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def pop(self, key, *default):
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return value
+
+    def keys(self):
+        keys = [k for k in self.FIELDS if hasattr(self, k)]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def _default_profile(self):
+        return {"name": "Unknown", "email": self.email}
+
+    # ── Copies / views ──
+    def copy(self):
+        """One-level copy for copy-on-write: containers copied, messages shared."""
+        clone = LeadRecord.__new__(LeadRecord)
+        for key in self.__slots__:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                continue
+            if isinstance(value, (list, dict)):
+                value = value.copy()
+            elif isinstance(value, array):
+                value = array(value.typecode, value)
+            setattr(clone, key, value)
+        return clone
+
+    def to_dict(self):
+        """Plain JSON-ready dict (for jsonify, exports and the journal)."""
+        data = {}
+        for key in self.keys():
+            value = self[key]
+            if isinstance(value, array):
+                value = value.tolist()
+            elif key == "thread":
+                value = [m.to_dict() if isinstance(m, Message) else m for m in value]
+            data[key] = value
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, LeadRecord):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __repr__(self):
+        return f"LeadRecord({self.email!r}, score={self.get('score')}, state={self.get('state')!r})"
+
+
+def to_json(obj):
+    """json.dumps `default=` hook for records, messages and arrays."""
+    if isinstance(obj, (LeadRecord, Message)):
+        return obj.to_dict()
+    if isinstance(obj, array):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,281 @@
+import threading
+from collections.abc import ItemsView, Mapping, ValuesView
+from contextlib import contextmanager
+from itertools import chain
+
+# ==========================================
+# LEAD STORE (Concurrency Hardening)
+# ==========================================
+# Flask serves requests on multiple threads. Every read-modify-write of a
+# lead record goes through a per-key lock taken from a fixed pool of
+# stripes, so two webhooks for the same lead serialize while unrelated
+# leads (almost always on different stripes) never contend.
+#
+# Records are copy-on-write: a transaction edits a private copy and only
+# publishes it (one reference swap) when the block exits cleanly.
+# Published records are never mutated again, so readers can iterate a
+# point-in-time snapshot() without taking any lock while webhooks keep
+# writing.
+#
+# The map itself is copy-on-write too, in NUM_SHARDS small dicts: a
+# publish copies only the shard holding that lead (~N / NUM_SHARDS
+# entries) and swaps it in, and a snapshot freezes the list of shard
+# references (O(NUM_SHARDS), independent of the number of leads). Every
+# shard belongs to exactly one stripe, so the stripe lock also orders
+# writes to its shards.
+#
+# With a LeadJournal attached, every change is appended to the
+# write-ahead log (see lead_journal.py) before it is published, and the
+# store is rebuilt from snapshot + log tail on startup.
+NUM_STRIPES = 64
+NUM_SHARDS = 1024
+
+
+def _copy_record(record):
+    """One-level copy: containers are copied, messages are shared (append-only)."""
+    if not isinstance(record, dict):
+        return record.copy()   # LeadRecord
+    return {
+        k: (v.copy() if isinstance(v, (list, dict)) else v)
+        for k, v in record.items()
+    }
+
+
+class _SnapshotView(Mapping):
+    """Read-only mapping over a frozen tuple of shards (never mutated)."""
+
+    __slots__ = ("_shards",)
+
+    def __init__(self, shards):
+        self._shards = shards
+
+    def __getitem__(self, email):
+        return self._shards[hash(email) % len(self._shards)][email]
+
+    def get(self, email, default=None):
+        return self._shards[hash(email) % len(self._shards)].get(email, default)
+
+    def __contains__(self, email):
+        return email in self._shards[hash(email) % len(self._shards)]
+
+    def __iter__(self):
+        return chain.from_iterable(self._shards)
+
+    def __len__(self):
+        return sum(map(len, self._shards))
+
+    def items(self):
+        return _SnapshotItems(self)
+
+    def values(self):
+        return _SnapshotValues(self)
+
+
+class _SnapshotItems(ItemsView):
+    def __iter__(self):
+        return chain.from_iterable(shard.items() for shard in self._mapping._shards)
+
+
+class _SnapshotValues(ValuesView):
+    def __iter__(self):
+        return chain.from_iterable(shard.values() for shard in self._mapping._shards)
+
+
+class LeadStore:
+    """Dict-like lead storage with per-key lock striping and COW snapshots."""
+
+    def __init__(self, num_stripes=NUM_STRIPES, journal=None, record_factory=None,
+                 num_shards=NUM_SHARDS):
+        num_stripes = max(1, num_stripes)
+        self._locks = [threading.RLock() for _ in range(num_stripes)]
+        # A multiple of the stripe count, so each shard maps to one stripe
+        self._shards = [{} for _ in range(num_stripes * max(1, num_shards // num_stripes))]
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self._snapshot = (-1, _SnapshotView(()))
+        self._journal = journal
+        self._listeners = []
+        if journal is not None:
+            for email, record in journal.recover().items():
+                if record_factory is not None:
+                    # Recovered records are plain dicts
+                    record = record_factory(record)
+                self._shard(email)[email] = record
+
+    def lock_for(self, email):
+        return self._locks[hash(email) % len(self._locks)]
+
+    def _shard(self, email):
+        return self._shards[hash(email) % len(self._shards)]
+
+    def _put(self, email, record):
+        """Copy-on-write of the shard holding `email`. Caller holds its stripe lock."""
+        index = hash(email) % len(self._shards)
+        shard = self._shards[index].copy()
+        if record is None:
+            shard.pop(email, None)
+        else:
+            shard[email] = record
+        self._shards[index] = shard
+
+    @property
+    def version(self):
+        """Incremented on every published write."""
+        return self._version
+
+    def subscribe(self, listener):
+        """
+        Registers listener(email, old, new), called after every publish
+        while the stripe lock is still held (new is None for a delete;
+        email is None when the whole store is cleared).
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, email, old, new):
+        for listener in self._listeners:
+            listener(email, old, new)
+
+    def _publish(self, email, record, op="put"):
+        old = self._shard(email).get(email)
+        self._write(email, old, record, op)
+        if self._listeners:
+            self._notify(email, old, record)
+
+    def _write(self, email, old, record, op):
+        journal = self._journal
+        if journal is None:
+            self._put(email, record)
+            with self._version_lock:
+                self._version += 1
+            return
+        # Encode outside the journal lock; the stripe lock already orders
+        # writes to this email. Append, then publish, both under the
+        # journal lock so a compaction never sees one without the other;
+        # if the append raises, nothing becomes visible.
+        payload = journal.encode(op, email, old, record)
+        with journal.lock:
+            journal.write(payload)
+            self._put(email, record)
+            self._version += 1
+        if journal.needs_snapshot():
+            journal.compact_async(self.snapshot)
+
+    # ── Atomic read-modify-write helpers ──
+    @contextmanager
+    def transaction(self, email, create=None, op="update"):
+        """
+        Holds the stripe lock for `email` and yields a private copy of its
+        record, published when the block exits without raising.
+        If the lead is missing, `create()` builds the new record;
+        without a factory the missing lead is yielded as None.
+        `op` labels the change in the write-ahead log.
+        Don't nest transactions on the same email: the inner copy is
+        taken from the published record and would be overwritten.
+        """
+        with self.lock_for(email):
+            current = self._shard(email).get(email)
+            if current is not None:
+                record = _copy_record(current)
+            elif create is not None:
+                record = create()
+            else:
+                record = None
+            yield record
+            if record is not None:
+                self._publish(email, record, op)
+
+    def update(self, email, fn, create=None, op="update"):
+        """Applies fn(record) atomically and returns its result."""
+        with self.transaction(email, create=create, op=op) as record:
+            return fn(record)
+
+    # ── Snapshot reads ──
+    def snapshot(self):
+        """Read-only point-in-time view of all leads (see snapshot_with_version)."""
+        return self.snapshot_with_version()[1]
+
+    def snapshot_with_version(self):
+        """
+        (version, view): a read-only point-in-time view of all leads and
+        the store version it reflects, for caches keyed on that version.
+        Freezes the current shard references (tuple() of the list runs
+        without releasing the GIL, so it can't observe a half-applied
+        write); nothing is copied per lead. Cached until the next write.
+        """
+        # Version first: writers bump it after swapping their shard, so the
+        # view is never older than the version it is cached under
+        version = self._version
+        cached_version, view = self._snapshot
+        if cached_version != version:
+            view = _SnapshotView(tuple(self._shards))
+            self._snapshot = (version, view)
+        return version, view
+
+    # ── Mapping interface (keeps `LEAD_DB[email]` call sites working) ──
+    def __getitem__(self, email):
+        return self._shard(email)[email]
+
+    def __setitem__(self, email, record):
+        with self.lock_for(email):
+            self._publish(email, record, "put")
+
+    def __delitem__(self, email):
+        with self.lock_for(email):
+            if email not in self._shard(email):
+                raise KeyError(email)
+            self._publish(email, None, "delete")
+
+    def __contains__(self, email):
+        return email in self._shard(email)
+
+    def __len__(self):
+        return sum(map(len, self._shards))
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def get(self, email, default=None):
+        return self._shard(email).get(email, default)
+
+    def pop(self, email, *default):
+        with self.lock_for(email):
+            shard = self._shard(email)
+            if email not in shard:
+                if default:
+                    return default[0]
+                raise KeyError(email)
+            value = shard[email]
+            self._publish(email, None, "delete")
+            return value
+
+    def keys(self):
+        return self.snapshot().keys()
+
+    def values(self):
+        return self.snapshot().values()
+
+    def items(self):
+        return self.snapshot().items()
+
+    def clear(self):
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            if self._journal is not None:
+                with self._journal.lock:
+                    self._journal.write('{"op":"clear"}')
+                    self._shards[:] = [{} for _ in self._shards]
+                    self._version += 1
+            else:
+                self._shards[:] = [{} for _ in self._shards]
+                with self._version_lock:
+                    self._version += 1
+            self._notify(None, None, None)
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def compact(self):
+        """Forces a journal snapshot now (no-op without a journal)."""
+        if self._journal is not None:
+            self._journal.compact(self.snapshot)
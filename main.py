@@ -1,13 +1,18 @@
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi import FastAPI, UploadFile, File, Request, HTTPException
+from fastapi.responses import StreamingResponse, FileResponse, Response, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from reply_intelligence import decide_lead, clear_lead_memory
+import stage_timer
+import pattern_profiler
+import metrics
+import batch_telemetry
+import slow_capture
+from sampling_profiler import PROFILER as SAMPLER
 import csv
 import io
-import json
 import os
-from datetime import datetime
+import time
 
 app = FastAPI()
 
@@ -25,6 +30,30 @@ app.add_middleware(
 )
 
 
+# ==========================================
+# METRICS — per-route request counts and latency
+# (see metrics.py; scraped from GET /metrics)
+# ==========================================
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route template, not the raw path, to keep label cardinality bounded
+        route = request.scope.get("route")
+        metrics.observe_request("main", getattr(route, "path", "unmatched"), request.method,
+                                status, time.perf_counter() - start)
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # ==========================================
 # FRONTEND — serves the Reply Readiness Engine UI
 # ==========================================
@@ -49,7 +78,7 @@ def score(data: LeadInput):
     }
     result = decide_lead(data.text, metadata=metadata)
     
-    return {
+    response = {
         "score": result["priority_score"], 
         "tier": result["tier"],
         "action": result["action"],
@@ -62,6 +91,34 @@ def score(data: LeadInput):
         "beta_feedback_prompt": result["feedback_prompt"],
         "disposition": result["disposition"]
     }
+    if "timings" in result:
+        response["timings"] = result["timings"]
+    return response
+
+
+# ---------- Rule list profile ----------
+@app.get("/pattern-profile")
+def pattern_profile(sort_by: str = "total_us", list_name: str = None, limit: int = 100):
+    """Per-pattern evaluations / hits / match time (PATTERN_PROFILE=1 to record)."""
+    if sort_by not in ("total_us", "mean_us", "max_us", "evaluations", "hits", "hit_rate"):
+        sort_by = "total_us"
+    profiler = pattern_profiler.PROFILER
+    return {
+        "enabled": pattern_profiler.ENABLED,
+        "patterns": profiler.report(sort_by=sort_by, list_name=list_name)[:limit],
+        "never_hit": len(profiler.never_hit())
+    }
+
+
+# ---------- Stage latency histograms ----------
+@app.get("/stage-timings")
+def stage_timings():
+    """Per-stage decide_lead / analyze_thread latency (STAGE_TIMINGS=1 to record)."""
+    return {
+        "enabled": stage_timer.ENABLED,
+        "attach": stage_timer.ATTACH,
+        "stages": stage_timer.HISTOGRAMS.snapshot()
+    }
 
 
 # ---------- Batch CSV scoring ----------
@@ -69,12 +126,22 @@ def score(data: LeadInput):
 async def score_batch_csv(file: UploadFile = File(...)):
     # Clear lead memory between CSV test runs to prevent stale duplicate suppression
     clear_lead_memory()
-    
+    run = batch_telemetry.BatchRun()
+    try:
+        return await _score_batch_csv(file, run)
+    finally:
+        # Stops tracemalloc if this run started it, even when scoring raised
+        run.close()
+
+
+async def _score_batch_csv(file, run):
     content = await file.read()
+    run.lap("read")
     try:
         decoded = content.decode("utf-8")
     except UnicodeDecodeError:
         decoded = content.decode("latin-1") 
+    run.lap("decode")
         
     reader = csv.DictReader(io.StringIO(decoded))
 
@@ -107,6 +174,7 @@ async def score_batch_csv(file: UploadFile = File(...)):
 
     # Read all rows first
     all_rows = list(reader)
+    run.lap("parse")
 
     for index, row in enumerate(all_rows, start=1):
         text = row.get("thread_text", "").strip()
@@ -172,6 +240,8 @@ async def score_batch_csv(file: UploadFile = File(...)):
             }
         })
 
+    run.lap("score")
+
     # Sort priority: respond_now > respond_later > do_not_respond
     action_rank = {"respond_now": 3, "respond_later": 2, "do_not_respond": 1, "dont_respond": 1}
     
@@ -183,37 +253,35 @@ async def score_batch_csv(file: UploadFile = File(...)):
         -x["sort_data"]["index"]
     ), reverse=True)
 
+    run.lap("sort")
+
+    for item in sorted_rows:
+        writer.writerow(item["row"])
+    run.lap("write")
+
     # ==========================================
     # HARDENING 5: BATCH MONITORING
     # ==========================================
+    # One JSON line per batch (batch_telemetry.py); see GET /batch-telemetry
     try:
         total_processed = len(sorted_rows)
-        if total_processed > 0:
-            actions = {"respond_now": 0, "respond_later": 0, "do_not_respond": 0}
-            total_score = 0
-            
-            for item in sorted_rows:
-                act = item["sort_data"]["action"]
-                if act == "dont_respond": act = "do_not_respond"
-                actions[act] = actions.get(act, 0) + 1
-                total_score += item["sort_data"]["score"]
-            
-            avg_score = round(total_score / total_processed, 1)
-            
-            log_entry = (
-                f"{datetime.now().isoformat()} | BATCH | "
-                f"Total: {total_processed} | AvgScore: {avg_score} | "
-                f"Actions: {json.dumps(actions)}\n"
-            )
-            
-            with open("batch_metrics.log", "a") as f:
-                f.write(log_entry)
+        actions = {"respond_now": 0, "respond_later": 0, "do_not_respond": 0}
+        total_score = 0
+        
+        for item in sorted_rows:
+            act = item["sort_data"]["action"]
+            if act == "dont_respond": act = "do_not_respond"
+            actions[act] = actions.get(act, 0) + 1
+            total_score += item["sort_data"]["score"]
+        
+        avg_score = round(total_score / total_processed, 1) if total_processed else None
+        batch_telemetry.TELEMETRY.record(run.finish(
+            total_processed, len(content),
+            filename=file.filename, avg_score=avg_score, actions=actions
+        ))
     except Exception as e:
         print(f"Monitoring Log Error: {e}")
 
-    for item in sorted_rows:
-        writer.writerow(item["row"])
-
     output.seek(0)
 
     return StreamingResponse(
@@ -223,6 +291,66 @@ async def score_batch_csv(file: UploadFile = File(...)):
     )
 
 
+# ---------- Batch telemetry ----------
+@app.get("/batch-telemetry")
+def batch_telemetry_summary(limit: int = 20):
+    """Throughput / phase timing / memory for recent /score-batch-csv uploads."""
+    telemetry = batch_telemetry.TELEMETRY
+    return {
+        "summary": telemetry.summary(),
+        "batches": telemetry.recent(limit=max(0, limit))
+    }
+
+
+# ---------- Slow reply capture ----------
+@app.get("/slow-replies")
+def slow_replies(limit: int = 20):
+    """Most recent inputs that crossed SLOW_REPLY_MS (see slow_capture.py)."""
+    return {
+        "enabled": slow_capture.ENABLED,
+        "threshold_ms": slow_capture.SLOW_REPLY_MS,
+        "captured": slow_capture.LOG.captured,
+        "cases": slow_capture.LOG.recent(limit=max(0, limit))
+    }
+
+
+# ---------- Admin: sampling profiler ----------
+class ProfilerStart(BaseModel):
+    interval: float = None
+    duration: float = 60
+    include_idle: bool = False
+
+
+@app.post("/admin/profiler/start")
+def start_profiler(options: ProfilerStart = None):
+    """Starts stack sampling (see sampling_profiler.py); stops itself after `duration` s (max 300)."""
+    options = options or ProfilerStart()
+    if not SAMPLER.start(interval=options.interval, duration=options.duration,
+                         include_idle=options.include_idle):
+        raise HTTPException(status_code=409, detail="Profiler already running")
+    return SAMPLER.status()
+
+
+@app.post("/admin/profiler/stop")
+def stop_profiler():
+    SAMPLER.stop()
+    return SAMPLER.status()
+
+
+@app.get("/admin/profiler")
+def profiler_status():
+    return SAMPLER.status()
+
+
+@app.get("/admin/profiler/collapsed")
+def profiler_collapsed(route: str = None):
+    """Collapsed stacks for flamegraph.pl / speedscope, optionally for one route."""
+    return PlainTextResponse(
+        SAMPLER.collapsed(route=route),
+        headers={"Content-Disposition": "attachment; filename=main.collapsed"},
+    )
+
+
 # ---------- Beta JSON summary ----------
 @app.post("/beta-summary-json")
 async def beta_summary_json(file: UploadFile = File(...)):
@@ -268,4 +396,10 @@ async def beta_summary_json(file: UploadFile = File(...)):
             "suggested_focus": f"Reply to {actions.get('respond_now', 0)} 'Respond Now' leads today",
             "note": "Summary computed via decide_lead logic."
         }
-    }
\ No newline at end of file
+    }
+
+
+# Samples are attributed to the route whose endpoint is on the stack
+for _route in app.routes:
+    if hasattr(_route, "endpoint"):
+        SAMPLER.register_route(_route.endpoint, _route.path)
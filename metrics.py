@@ -0,0 +1,228 @@
+import threading
+import weakref
+
+# ==========================================
+# METRICS (Prometheus Text Exposition)
+# ==========================================
+# Shared by main.py (FastAPI) and server.py (Flask); each app serves
+# REGISTRY.render() from its own /metrics route.
+#
+# Hot-path updates are lock-free: every thread accumulates into its own
+# shard (a plain dict only that thread writes). A scrape sums the shards;
+# dict.copy() is atomic under the GIL, so it never sees a torn update.
+# When a thread exits its shard is folded into the metric's retired
+# totals, so a thread-per-request server doesn't grow the shard list.
+#
+# Gauges are callbacks evaluated at scrape time (store size, queue
+# depth, ...), so they cost nothing between scrapes.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Sharded:
+    """
+    Per-thread accumulation with totals folded in when threads exit.
+    Subclasses define _merge(total, value), where total is None the
+    first time a label set is seen.
+    """
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = {}
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            weakref.finalize(threading.current_thread(), self._retire, shard)
+            return shard
+
+    def _retire(self, shard):
+        with self._lock:
+            try:
+                self._shards.remove(shard)
+            except ValueError:
+                return
+            for key, value in shard.items():
+                self._retired[key] = self._merge(self._retired.get(key), value)
+
+    def _collect(self):
+        with self._lock:
+            shards = [s.copy() for s in self._shards]
+            totals = dict(self._retired)
+        for shard in shards:
+            for key, value in shard.items():
+                totals[key] = self._merge(totals.get(key), value)
+        return totals
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        shard = self._shard()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    def _merge(self, a, b):
+        return b if a is None else a + b
+
+    def value(self, *labelvalues):
+        return self._collect().get(labelvalues, 0)
+
+    def samples(self):
+        for key, value in sorted(self._collect().items()):
+            yield self.name, _labels(self.labelnames, key), value
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labelvalues):
+        shard = self._shard()
+        entry = shard.get(labelvalues)
+        if entry is None:
+            # [count per bucket..., +Inf count, sum]
+            entry = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        i = 0
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        entry[i] += 1
+        entry[-1] += value
+
+    def _merge(self, a, b):
+        if a is None:
+            return list(b)
+        return [x + y for x, y in zip(a, b)]
+
+    def count(self, *labelvalues):
+        entry = self._collect().get(labelvalues)
+        return sum(entry[:-1]) if entry else 0
+
+    def samples(self):
+        for key, entry in sorted(self._collect().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), entry[:-1]):
+                cumulative += n
+                yield (self.name + "_bucket",
+                       _labels(self.labelnames, key, f'le="{_fmt(float(bound))}"'), cumulative)
+            yield self.name + "_sum", _labels(self.labelnames, key), entry[-1]
+            yield self.name + "_count", _labels(self.labelnames, key), cumulative
+
+
+class Gauge:
+    """Scrape-time callback: fn() returns a number or {labelvalues tuple: number}."""
+    kind = "gauge"
+
+    def __init__(self, name, help, fn, labelnames=()):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def samples(self):
+        value = self.fn()
+        if isinstance(value, dict):
+            for key, v in sorted(value.items()):
+                yield self.name, _labels(self.labelnames, key), v
+        elif value is not None:
+            yield self.name, "", value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Registers `metric`; an existing metric with the same name wins."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name, help, fn, labelnames=()):
+        """Gauges are replaced on re-registration (callbacks may be rebound)."""
+        gauge = Gauge(name, help, fn, labelnames)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def render(self):
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                # A broken gauge callback must not take the scrape down
+                lines.append(f"# {metric.name} collection failed: {_escape(e)}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{labels} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ── Shared instruments ──
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by app, route, method and status.",
+    ("app", "route", "method", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by app, route and method.",
+    ("app", "route", "method"))
+DECISIONS = REGISTRY.counter(
+    "lead_decisions_total", "decide_lead results by tier and action.", ("tier", "action"))
+CACHE_EVENTS = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result"))
+JOURNAL_FLUSH = REGISTRY.histogram(
+    "lead_journal_flush_seconds", "Write-ahead log append + flush (+ fsync) latency.",
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5))
+
+
+def observe_request(app, route, method, status, seconds):
+    HTTP_REQUESTS.inc(app, route, method, str(status))
+    HTTP_LATENCY.observe(seconds, app, route, method)
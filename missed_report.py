@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ==========================================
+# MISSED OPPORTUNITY REPORT (Rolling Buckets)
+# ==========================================
+# Backs /api/missed-report (the dashboard's "Weekly Revenue Risk
+# Snapshot"). Instead of scanning lead history on each request, lead
+# store publishes are turned into events and counted into hourly and
+# daily buckets:
+#   high_intent_threads   lead crossed into high intent (score >= 60)
+#   unanswered            ... and no agent has answered it yet
+#   responded_under_30m   first agent reply to it came within 30 min
+#   responded_over_30m    ... after more than 30 min
+#   meetings_booked / no_meetings   outcome recorded on a high-intent lead
+# Every thread is counted once: it starts as unanswered and moves to
+# under/over 30m on the first agent reply to a lead reply (later waits on
+# the same thread don't count again). The move is booked in the thread's
+# own buckets, so in any window
+#   responded_under_30m + responded_over_30m + unanswered == high_intent_threads
+# A report sums the buckets inside its window (7 daily buckets for the
+# weekly view), so a read touches at most a few dozen counters.
+#
+# Retention: hourly buckets are kept HOURLY_RETENTION hours and daily
+# buckets DAILY_RETENTION days; older buckets are pruned on insert. The
+# per-lead detail list is capped at MAX_DETAILS (least recently updated
+# leads are evicted first).
+SLA_SCORE_THRESHOLD = 60
+SLA_MINUTES = 30
+HOURLY_RETENTION = 48
+DAILY_RETENTION = 90
+MAX_DETAILS = 200
+
+COUNTERS = ("high_intent_threads", "responded_under_30m", "responded_over_30m", "unanswered",
+            "meetings_booked", "no_meetings")
+OUTCOME_COUNTERS = {"meeting": "meetings_booked", "no_meeting": "no_meetings"}
+
+
+class MissedReport:
+    """Incrementally maintained missed-opportunity aggregates."""
+
+    def __init__(self, clock=time.time, score_threshold=SLA_SCORE_THRESHOLD,
+                 hourly_retention=HOURLY_RETENTION, daily_retention=DAILY_RETENTION,
+                 max_details=MAX_DETAILS):
+        self.clock = clock
+        self.score_threshold = score_threshold
+        self.hourly_retention = hourly_retention
+        self.daily_retention = daily_retention
+        self.max_details = max_details
+        self._lock = threading.Lock()
+        self._hourly = {}             # hour index -> {counter: n}
+        self._daily = {}              # day index -> {counter: n}
+        self._details = OrderedDict() # email -> detail row
+        self._unanswered = {}         # email -> when its open thread was counted
+
+    # ── Buckets ──
+    def _bucket(self, buckets, index, retention):
+        bucket = buckets.get(index)
+        if bucket is None:
+            bucket = buckets[index] = dict.fromkeys(COUNTERS, 0)
+            for old in [i for i in buckets if i <= index - retention]:
+                del buckets[old]
+        return bucket
+
+    def _count(self, counter, at, n=1):
+        """Adds n to `counter` in the buckets holding time `at` (if still retained)."""
+        now = self.clock()
+        for buckets, size, retention in ((self._hourly, 3600, self.hourly_retention),
+                                         (self._daily, 86400, self.daily_retention)):
+            index = int(at // size)
+            if index > int(now // size) - retention:
+                self._bucket(buckets, index, retention)[counter] += n
+
+    def _open_thread(self, email, now):
+        self._count("high_intent_threads", now)
+        self._count("unanswered", now)
+        self._unanswered[email] = now
+        # Threads older than every retained bucket can't be reported on
+        # (insertion order is open order, so they sit at the front)
+        cutoff = now - self.daily_retention * 86400
+        while self._unanswered:
+            oldest, at = next(iter(self._unanswered.items()))
+            if at > cutoff:
+                break
+            del self._unanswered[oldest]
+
+    def _answer_thread(self, email, late):
+        """Moves an open thread to under/over 30m. False if none is open."""
+        opened = self._unanswered.pop(email, None)
+        if opened is None:
+            return False
+        self._count("unanswered", opened, -1)
+        self._count("responded_over_30m" if late else "responded_under_30m", opened)
+        return True
+
+    def _detail(self, email, record, status, now):
+        row = self._details.pop(email, None) or {"email": email}
+        row["score"] = record.get('score', 0)
+        row["response_time_min"] = record.get('avg_response_time_min')
+        row["status"] = status
+        row["updated"] = now
+        self._details[email] = row
+        while len(self._details) > self.max_details:
+            self._details.popitem(last=False)
+
+    # ── Events (LeadStore listener) ──
+    def on_publish(self, email, old, new):
+        if email is None:
+            self.clear()
+            return
+        if new is None:
+            with self._lock:
+                self._details.pop(email, None)
+                self._unanswered.pop(email, None)
+            return
+        now = self.clock()
+        threshold = self.score_threshold
+        old_score = old.get('score', 0) if old is not None else 0
+        new_score = new.get('score', 0)
+        was_waiting = old is not None and bool(old.get('last_lead_reply_at'))
+        waiting = bool(new.get('last_lead_reply_at'))
+        tracked = old_score >= threshold or new_score >= threshold
+
+        with self._lock:
+            if new_score >= threshold > old_score:
+                if email not in self._unanswered:
+                    self._open_thread(email, now)
+                self._detail(email, new, "No Response Yet" if waiting else "Active", now)
+
+            if was_waiting and not waiting and email in self._unanswered:
+                # First agent answer on this high-intent thread
+                thread = new.get('thread', [])
+                answered_at = thread[-1]['timestamp'] if thread else now
+                minutes = (answered_at - old['last_lead_reply_at']) / 60
+                late = minutes > SLA_MINUTES
+                self._answer_thread(email, late)
+                self._detail(email, new, "Late Response" if late else "Responded", now)
+            elif waiting and old_score >= threshold > new_score:
+                self._detail(email, new, "Cooled Before Response", now)
+            elif waiting and new_score >= threshold and email in self._details:
+                self._detail(email, new, "No Response Yet", now)
+
+            old_outcome = old.get('outcome') if old is not None else None
+            new_outcome = new.get('outcome')
+            if tracked and new_outcome != old_outcome:
+                if old_outcome in OUTCOME_COUNTERS:
+                    self._count(OUTCOME_COUNTERS[old_outcome], now, -1)
+                if new_outcome in OUTCOME_COUNTERS:
+                    self._count(OUTCOME_COUNTERS[new_outcome], now)
+
+    def rebuild(self, items):
+        """
+        Startup seed from current lead state (buckets are not journaled):
+        every high-intent lead is counted once, in the current bucket.
+        """
+        for email, record in items:
+            if record.get('score', 0) >= self.score_threshold:
+                self.on_publish(email, None, record)
+                avg = record.get('avg_response_time_min')
+                if avg is not None:
+                    with self._lock:
+                        late = avg > SLA_MINUTES
+                        self._answer_thread(email, late)
+                        self._details[email]["status"] = "Late Response" if late else "Responded"
+
+    # ── Reads ──
+    def report(self, window_hours=24 * 7):
+        """Totals over the last `window_hours` plus the detail rows in it."""
+        now = self.clock()
+        with self._lock:
+            if window_hours <= self.hourly_retention and window_hours < 24 * 7:
+                buckets, index, span = self._hourly, int(now // 3600), int(window_hours)
+            else:
+                buckets, index, span = self._daily, int(now // 86400), max(1, int(window_hours // 24))
+            totals = dict.fromkeys(COUNTERS, 0)
+            for i, bucket in buckets.items():
+                if index - span < i <= index:
+                    for counter, n in bucket.items():
+                        totals[counter] += n
+            cutoff = now - window_hours * 3600
+            details = [dict(row) for row in reversed(self._details.values()) if row["updated"] >= cutoff]
+
+        totals = {k: max(0, v) for k, v in totals.items()}
+        totals["pending_outcome"] = max(
+            0, totals["high_intent_threads"] - totals["meetings_booked"] - totals["no_meetings"])
+        for row in details:
+            del row["updated"]
+        return {"window_hours": window_hours, "revenue_snapshot": totals, "details": details}
+
+    def clear(self):
+        with self._lock:
+            self._hourly.clear()
+            self._daily.clear()
+            self._details.clear()
+            self._unanswered.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hourly_buckets": len(self._hourly), "daily_buckets": len(self._daily),
+                    "details": len(self._details), "open_threads": len(self._unanswered)}
@@ -0,0 +1,105 @@
+import os
+import re
+import threading
+import time
+
+# ==========================================
+# PATTERN PROFILER (Rule List Evidence)
+# ==========================================
+# Profiling mode for the regex rule lists on ReplyIntelligence
+# (PATTERNS.*, TERMINAL_*, SHORT_*, POSITIVE_INTEREST_PATTERNS, plus the
+# inline negation / disengagement lists). For every (list, pattern) it
+# records evaluations, hits and cumulative match time, so slow rules can
+# be reordered and dead rules pruned from evidence.
+#
+# Off by default (PATTERN_PROFILE=1 or enable()); when off the engine
+# calls re.search directly.
+ENABLED = os.environ.get("PATTERN_PROFILE", "0") == "1"
+
+_clock = time.perf_counter_ns
+
+
+class PatternProfiler:
+    """Per-pattern evaluation / hit / time counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}   # (list_name, pattern) -> [evals, hits, total_ns, max_ns]
+
+    def _record(self, list_name, pattern, hit, ns):
+        key = (list_name, pattern)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = [0, 0, 0, 0]
+            entry[0] += 1
+            if hit:
+                entry[1] += 1
+            entry[2] += ns
+            if ns > entry[3]:
+                entry[3] = ns
+
+    def search(self, list_name, pattern, text):
+        start = _clock()
+        match = re.search(pattern, text)
+        self._record(list_name, pattern, match is not None, _clock() - start)
+        return match
+
+    def sub(self, list_name, pattern, repl, text):
+        start = _clock()
+        result, count = re.subn(pattern, repl, text)
+        self._record(list_name, pattern, count > 0, _clock() - start)
+        return result
+
+    def report(self, sort_by="total_us", list_name=None):
+        """Rows sorted descending by `sort_by` (total_us, mean_us, max_us, evaluations, hits, hit_rate)."""
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._stats.items()]
+        rows = []
+        for (name, pattern), (evals, hits, total, peak) in items:
+            if list_name and name != list_name:
+                continue
+            rows.append({
+                "list": name,
+                "pattern": pattern,
+                "evaluations": evals,
+                "hits": hits,
+                "hit_rate": round(hits / evals, 4) if evals else 0.0,
+                "total_us": round(total / 1000.0, 2),
+                "mean_us": round(total / evals / 1000.0, 3) if evals else 0.0,
+                "max_us": round(peak / 1000.0, 2)
+            })
+        rows.sort(key=lambda r: r[sort_by], reverse=True)
+        return rows
+
+    def never_hit(self):
+        """Patterns evaluated at least once that never matched (prune candidates)."""
+        return [r for r in self.report(sort_by="evaluations") if r["hits"] == 0]
+
+    def dump(self, sort_by="total_us", limit=None):
+        """Plain-text table of report(), for logs and terminals."""
+        rows = self.report(sort_by=sort_by)[:limit]
+        lines = [f"{'list':<34} {'evals':>8} {'hits':>8} {'hit%':>6} {'total_ms':>10} {'mean_us':>9}  pattern"]
+        for r in rows:
+            lines.append(
+                f"{r['list']:<34} {r['evaluations']:>8} {r['hits']:>8} {r['hit_rate'] * 100:>5.1f}% "
+                f"{r['total_us'] / 1000:>10.2f} {r['mean_us']:>9.3f}  {r['pattern']}"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+PROFILER = PatternProfiler()
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
@@ -0,0 +1,108 @@
+import math
+import threading
+
+# ==========================================
+# QUANTILE SKETCH (Streaming Percentiles)
+# ==========================================
+# DDSketch: values are counted in logarithmic buckets
+#   index = ceil(log(x) / log(gamma)),  gamma = (1 + a) / (1 - a)
+# so any quantile is returned within relative error `a` (1% by default).
+# Memory depends on the value range, not on how many values were added,
+# and is hard-capped at MAX_BUCKETS (the lowest buckets are collapsed,
+# which only affects the accuracy of the smallest values).
+# Two sketches with the same accuracy merge by adding bucket counts.
+RELATIVE_ACCURACY = 0.01
+MAX_BUCKETS = 2048
+
+
+class DDSketch:
+    """Mergeable quantile sketch for positive values (e.g. seconds)."""
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, max_buckets=MAX_BUCKETS):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self._buckets = {}
+        self._zero_count = 0   # values <= 0 (not representable in log space)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def add(self, value, count=1):
+        if count <= 0:
+            return
+        with self._lock:
+            if value > 0:
+                index = math.ceil(math.log(value) / self._log_gamma)
+                self._buckets[index] = self._buckets.get(index, 0) + count
+                if len(self._buckets) > self.max_buckets:
+                    self._collapse()
+            else:
+                self._zero_count += count
+            self.count += count
+            self.sum += value * count
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def _collapse(self):
+        # Fold the two lowest buckets together until we fit again
+        indexes = sorted(self._buckets)
+        excess = len(indexes) - self.max_buckets
+        target = indexes[excess]
+        for index in indexes[:excess]:
+            self._buckets[target] += self._buckets.pop(index)
+
+    def merge(self, other):
+        """Adds another sketch's counts into this one (same accuracy only)."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        with other._lock:
+            buckets = dict(other._buckets)
+            zero, count, total = other._zero_count, other.count, other.sum
+            lo, hi = other.min, other.max
+        with self._lock:
+            for index, n in buckets.items():
+                self._buckets[index] = self._buckets.get(index, 0) + n
+            if len(self._buckets) > self.max_buckets:
+                self._collapse()
+            self._zero_count += zero
+            self.count += count
+            self.sum += total
+            if lo is not None:
+                self.min = lo if self.min is None else min(self.min, lo)
+                self.max = hi if self.max is None else max(self.max, hi)
+
+    def quantile(self, q):
+        """Value at quantile q in [0, 1], or None when empty."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q * (self.count - 1)
+            seen = self._zero_count
+            if rank < seen:
+                return 0.0
+            for index in sorted(self._buckets):
+                seen += self._buckets[index]
+                if seen > rank:
+                    # Bucket midpoint (in relative terms) of (gamma^(i-1), gamma^i]
+                    value = 2 * self.gamma ** index / (self.gamma + 1)
+                    return min(max(value, self.min), self.max)
+            return self.max
+
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._zero_count = 0
+            self.count = 0
+            self.sum = 0.0
+            self.min = None
+            self.max = None
+
+    def __len__(self):
+        return len(self._buckets)
@@ -1,10 +1,17 @@
 import re
 import time
 import math
+import functools
 import json
 import os
 from datetime import datetime
 
+import stage_timer
+import pattern_profiler
+import slow_capture
+# The instrument, not the module: `metrics` is a common local name here
+from metrics import DECISIONS
+
 # ==========================================
 # CONFIGURATION & PERSISTENCE (Hardening 1)
 # ==========================================
@@ -47,6 +54,22 @@ def clear_lead_memory():
 # Global State initialized from disk
 LEAD_MEMORY = _load_memory()
 
+def _searcher(list_name):
+    """
+    search(pattern, text) for one pattern list: re.search itself, or the
+    per-pattern counted version when pattern_profiler is enabled. Bind
+    it once per list so the loops pay nothing when profiling is off.
+    """
+    if pattern_profiler.ENABLED:
+        return functools.partial(pattern_profiler.PROFILER.search, list_name)
+    return re.search
+
+def _subber(list_name):
+    """sub(pattern, repl, text), like _searcher."""
+    if pattern_profiler.ENABLED:
+        return functools.partial(pattern_profiler.PROFILER.sub, list_name)
+    return re.sub
+
 # ==========================================
 # SIGNAL FAMILIES (Hardening 3)
 # ==========================================
@@ -366,43 +389,34 @@ class ReplyIntelligence:
             "consistency": 3, "shallow_penalty": -15,
         }
 
-    # Signal Extraction updated for logging
-    def _extract_signals(self, history):
-        lead_messages = [m['body'].lower() for m in history if m.get('sender') == 'lead']
-        combined_text = " ".join(lead_messages)
-        
+    # ==========================================
+    # THREAD COMPACTION (Long Threads)
+    # ==========================================
+    # Very long threads keep only their last N messages verbatim; older
+    # lead messages are folded into a summary of which patterns matched,
+    # word/question counts and lead timestamps. Every signal is a
+    # "did pattern p match anywhere" test, so the union of the folded and
+    # live match sets reproduces the full-thread result (except for a
+    # pattern spanning the fold boundary, which is not counted).
+    NEGATED_SIGNAL_KEYS = ('competitor', 'business_pain', 'implementation')
+
+    def _match_text(self, combined_text):
+        """Pattern matches for one block of (lowercased) lead text."""
         # Negation Handling
         negation_patterns = [
             r"not\s+", r"no\s+", r"never\s+", r"don't\s+", r"won't\s+", 
             r"aren't\s+", r"we're\s+not\s+", r"happy\s+with"
         ]
         negated_text = combined_text
+        sub = _subber("negation")
         for neg_pat in negation_patterns:
-            negated_text = re.sub(neg_pat + r'(\S+(?:\s+\S+){0,5})', '', negated_text)
+            negated_text = sub(neg_pat + r'(\S+(?:\s+\S+){0,5})', '', negated_text)
 
-        extracted = {}
+        hits = {}
         for key, patterns in self.PATTERNS.items():
-            count = 0
-            search_text = negated_text if key in ('competitor', 'business_pain', 'implementation') else combined_text
-            for p in patterns:
-                if re.search(p, search_text):
-                    count += 1
-            extracted[key] = count
-            
-        # Logging unknown phrases (Persistence)
-        if len(combined_text.split()) > 50 and sum(extracted.values()) == 0:
-             _log_unknown(combined_text[:200]) # Log first 200 chars
-
-        extracted["word_count"] = len(combined_text.split())
-        extracted["question_count"] = combined_text.count("?")
-        
-        # Keyword Spam
-        total_words = extracted["word_count"]
-        total_signals = sum(v for k,v in extracted.items() if k not in ('word_count', 'question_count'))
-        is_spam = False
-        if total_words > 0 and (total_signals / total_words) > 0.4 and total_signals > 5:
-            is_spam = True
-        extracted["is_keyword_spam"] = is_spam
+            search_text = negated_text if key in self.NEGATED_SIGNAL_KEYS else combined_text
+            search = _searcher("PATTERNS." + key)
+            hits[key] = [p for p in patterns if search(p, search_text)]
 
         # Disengagement
         disengage_patterns = [
@@ -415,24 +429,175 @@ class ReplyIntelligence:
             r"not\s+a\s+fit",
             r"don'?t\s+do\s+cold",
         ]
-        is_disengaging = any(re.search(p, combined_text) for p in disengage_patterns)
-        extracted["is_disengaging"] = is_disengaging
-
+        search = _searcher("disengage")
+        disengaged_by = next((p for p in disengage_patterns if search(p, combined_text)), None)
         # Positive intent detection (catches short interested replies)
-        has_positive_intent = any(re.search(p, combined_text) for p in self.POSITIVE_INTEREST_PATTERNS)
-        extracted["has_positive_intent"] = has_positive_intent
+        search = _searcher("POSITIVE_INTEREST_PATTERNS")
+        positive_by = next((p for p in self.POSITIVE_INTEREST_PATTERNS if search(p, combined_text)), None)
+        return {
+            "hits": hits,
+            "word_count": len(combined_text.split()),
+            "question_count": combined_text.count("?"),
+            "is_disengaging": disengaged_by is not None,
+            "has_positive_intent": positive_by is not None,
+            "disengaged_by": disengaged_by,
+            "positive_by": positive_by,
+        }
+
+    def summarize_messages(self, messages, summary=None):
+        """
+        Folds `messages` (oldest first) into a thread summary that
+        analyze_thread can consume in place of those messages.
+        Pass the previous summary to keep folding.
+        """
+        summary = dict(summary) if summary else {
+            "messages": 0, "lead_messages": 0, "word_count": 0, "question_count": 0,
+            "hits": {}, "is_disengaging": False, "has_positive_intent": False,
+            "first_lead_ts": None, "last_lead_ts": None
+        }
+        lead_msgs = [m for m in messages if m.get('sender') == 'lead']
+        summary["messages"] += len(messages)
+        summary["lead_messages"] += len(lead_msgs)
+        if lead_msgs:
+            matched = self._match_text(" ".join(m['body'].lower() for m in lead_msgs))
+            hits = {k: list(v) for k, v in summary["hits"].items()}
+            for key, patterns in matched["hits"].items():
+                known = hits.setdefault(key, [])
+                known.extend(p for p in patterns if p not in known)
+            summary["hits"] = hits
+            summary["word_count"] += matched["word_count"]
+            summary["question_count"] += matched["question_count"]
+            summary["is_disengaging"] = summary["is_disengaging"] or matched["is_disengaging"]
+            summary["has_positive_intent"] = summary["has_positive_intent"] or matched["has_positive_intent"]
+            timestamps = [m['timestamp'] for m in lead_msgs]
+            if summary["first_lead_ts"] is not None:
+                timestamps += [summary["first_lead_ts"], summary["last_lead_ts"]]
+            summary["first_lead_ts"] = min(timestamps)
+            summary["last_lead_ts"] = max(timestamps)
+        return summary
+
+    # Signal Extraction updated for logging
+    def _extract_signals(self, history, summary=None, matched_out=None):
+        """
+        Signal counts for `history` plus the folded `summary`. When
+        `matched_out` is a dict it also receives the patterns that hit,
+        keyed by pattern list (for slow_capture).
+        """
+        lead_messages = [m['body'].lower() for m in history if m.get('sender') == 'lead']
+        combined_text = " ".join(lead_messages)
+        matched = self._match_text(combined_text)
+
+        extracted = {}
+        for key, patterns in matched["hits"].items():
+            if summary and summary["hits"].get(key):
+                patterns = list(summary["hits"][key]) + [p for p in patterns if p not in summary["hits"][key]]
+            extracted[key] = len(patterns)
+            if matched_out is not None and patterns:
+                matched_out["PATTERNS." + key] = patterns
+        if matched_out is not None:
+            if matched["disengaged_by"]:
+                matched_out["disengage"] = [matched["disengaged_by"]]
+            if matched["positive_by"]:
+                matched_out["POSITIVE_INTEREST_PATTERNS"] = [matched["positive_by"]]
+            
+        # Logging unknown phrases (Persistence)
+        if matched["word_count"] > 50 and sum(extracted.values()) == 0:
+             _log_unknown(combined_text[:200]) # Log first 200 chars
+
+        extracted["word_count"] = matched["word_count"]
+        extracted["question_count"] = matched["question_count"]
+        if summary:
+            extracted["word_count"] += summary["word_count"]
+            extracted["question_count"] += summary["question_count"]
+        
+        # Keyword Spam
+        total_words = extracted["word_count"]
+        total_signals = sum(v for k,v in extracted.items() if k not in ('word_count', 'question_count'))
+        is_spam = False
+        if total_words > 0 and (total_signals / total_words) > 0.4 and total_signals > 5:
+            is_spam = True
+        extracted["is_keyword_spam"] = is_spam
+
+        extracted["is_disengaging"] = matched["is_disengaging"] or bool(summary and summary["is_disengaging"])
+        extracted["has_positive_intent"] = matched["has_positive_intent"] or bool(summary and summary["has_positive_intent"])
 
         return extracted
 
+    # ==========================================
+    # MOMENTUM (Incremental)
+    # ==========================================
+    # Per-lead running state kept on the lead record and updated in O(1):
+    #   lead_messages, first_lead_ts, last_lead_ts -> velocity, since the
+    #       mean gap between sorted replies telescopes to (last-first)/(n-1)
+    #   score_ewma, last_score -> EWMA of the deltas in score_history,
+    #       i.e. momentum; it only advances when a lead reply appends to
+    #       score_history, so the live state always equals what
+    #       seed_momentum_state rebuilds from the stored history
+    MOMENTUM_ALPHA = 0.5       # weight of the newest score delta
+    MOMENTUM_THRESHOLD = 5     # |EWMA| above this is Rising / Cooling
+
+    def new_momentum_state(self):
+        return {"lead_messages": 0, "first_lead_ts": None, "last_lead_ts": None,
+                "score_ewma": 0.0, "last_score": None}
+
+    def seed_momentum_state(self, history, summary=None, score_history=()):
+        """Builds the running state from a stored thread (legacy records, once)."""
+        state = self.new_momentum_state()
+        if summary and summary["lead_messages"]:
+            state["lead_messages"] = summary["lead_messages"]
+            state["first_lead_ts"] = summary["first_lead_ts"]
+            state["last_lead_ts"] = summary["last_lead_ts"]
+        for m in history:
+            if m.get('sender') == 'lead':
+                state = self.observe_lead_reply(state, m['timestamp'])
+        for score in score_history:
+            state = self.advance_momentum(state, score)
+        return state
+
+    def observe_lead_reply(self, state, timestamp):
+        """Returns the state after one more lead reply at `timestamp`."""
+        state = dict(state)
+        state["lead_messages"] += 1
+        first, last = state["first_lead_ts"], state["last_lead_ts"]
+        state["first_lead_ts"] = timestamp if first is None else min(first, timestamp)
+        state["last_lead_ts"] = timestamp if last is None else max(last, timestamp)
+        return state
+
+    def advance_momentum(self, state, score):
+        """Returns the state after `score` is appended to score_history."""
+        state = dict(state)
+        if state["last_score"] is not None:
+            delta = score - state["last_score"]
+            state["score_ewma"] += self.MOMENTUM_ALPHA * (delta - state["score_ewma"])
+        state["last_score"] = score
+        return state
+
+    def momentum_label(self, state):
+        ewma = state["score_ewma"]
+        if ewma >= self.MOMENTUM_THRESHOLD:
+            return "Rising"
+        if ewma <= -self.MOMENTUM_THRESHOLD:
+            return "Cooling"
+        return "Stable"
+
     # Metrics & Scoring
-    def _calculate_metrics(self, history, signals):
+    def _calculate_metrics(self, history, signals, summary=None, momentum_state=None):
         lead_replies = [m for m in history if m.get('sender') == 'lead']
         depth = len(lead_replies)
+        if summary and summary["lead_messages"]:
+            depth += summary["lead_messages"]
         velocity_hours = 999
-        if len(lead_replies) > 1:
-             timestamps = sorted([m['timestamp'] for m in lead_replies])
-             diffs = [timestamps[i] - timestamps[i-1] for i in range(1, len(timestamps))]
-             velocity_hours = (sum(diffs) / len(diffs)) / 3600
+        if depth > 1:
+            if momentum_state and momentum_state["lead_messages"] == depth:
+                first, last = momentum_state["first_lead_ts"], momentum_state["last_lead_ts"]
+            else:
+                timestamps = [m['timestamp'] for m in lead_replies]
+                if summary and summary["lead_messages"]:
+                    timestamps += [summary["first_lead_ts"], summary["last_lead_ts"]]
+                first, last = min(timestamps), max(timestamps)
+            # Mean gap between consecutive (sorted) lead replies telescopes
+            # to (last - first) / (n - 1): no sort, works with folded history
+            velocity_hours = ((last - first) / (depth - 1)) / 3600
         return {
             "depth": depth, "signals": signals, "velocity_hours": velocity_hours,
             "avg_words_per_reply": signals["word_count"] / max(1, depth), "is_consistent": 1
@@ -516,27 +681,68 @@ class ReplyIntelligence:
         if state == "Deprioritize": return "Lead explicitly requested to disconnect."
         return "Not enough signal to warrant action." 
 
-    def analyze_thread(self, thread_history):
-        if not thread_history: return self._default_result()
-        signals = self._extract_signals(thread_history)
-        metrics = self._calculate_metrics(thread_history, signals)
+    def analyze_thread(self, thread_history, summary=None, momentum_state=None):
+        """
+        `summary` is the folded history from summarize_messages(), if any.
+        With the lead's `momentum_state`, velocity comes from the running
+        state and the result carries "momentum_state" advanced by this
+        score, plus its momentum label. Store it only when this score is
+        appended to score_history (a lead reply); otherwise the label is
+        momentum_label() of the unchanged state.
+        """
+        if not slow_capture.ENABLED:
+            return self._analyze_thread(thread_history, summary, momentum_state)
+        started = slow_capture.start("analyze_thread")
+        if started is None:
+            return self._analyze_thread(thread_history, summary, momentum_state)
+        try:
+            result = self._analyze_thread(thread_history, summary, momentum_state)
+        except BaseException:
+            slow_capture.abandon()
+            raise
+        bodies = [m.get('body', '') for m in (thread_history or []) if m.get('sender') == 'lead']
+        slow_capture.finish(started, "\n---\n".join(bodies), result.pop("timings", None),
+                            matched=result.pop("matched_rules", None), outcome=result.get("state"),
+                            messages=len(thread_history or []))
+        return result
+
+    def _analyze_thread(self, thread_history, summary=None, momentum_state=None):
+        if not thread_history and not summary: return self._default_result()
+        capture = slow_capture.ENABLED and slow_capture.capturing("analyze_thread")
+        sw = stage_timer.start("analyze_thread.", force=True) if stage_timer.ENABLED or capture else None
+        # Nested in a captured decide_lead too: its entry lists these patterns
+        matched_rules = {} if slow_capture.ENABLED and slow_capture.active() else None
+        signals = self._extract_signals(thread_history, summary, matched_rules)
+        if sw: sw.lap("extract_signals")
+        metrics = self._calculate_metrics(thread_history, signals, summary, momentum_state)
+        if sw: sw.lap("metrics")
         score_breakdown = self._calculate_score(metrics)
         raw_score = sum(score_breakdown.values())
         normalized_score = min(100, max(0, raw_score))
         
-        lead_count = len([m for m in thread_history if m.get('sender') == 'lead'])
+        lead_count = metrics['depth']
         if lead_count <= 1 and normalized_score > 90: normalized_score = 90
         if signals.get('is_keyword_spam'): normalized_score = min(normalized_score, 15)
 
+        if sw: sw.lap("score")
         state = self._classify_state(normalized_score, signals)
         explanation = self._generate_explanation_v2(state, signals, normalized_score)
+        if sw: sw.lap("classify")
         
-        return {
+        result = {
             "score": normalized_score, "score_breakdown": score_breakdown,
             "state": state, "explanation": explanation, "signals": signals,
             "metrics": metrics, "momentum": "Stable", 
             "tiebreaker": {}, "full_explanation": [], "cliff_flag": None
         }
+        if momentum_state is not None:
+            result["momentum_state"] = self.advance_momentum(momentum_state, normalized_score)
+            result["momentum"] = self.momentum_label(result["momentum_state"])
+        if sw and capture:
+            result["timings"] = sw.as_dict()
+        if matched_rules is not None:
+            result["matched_rules"] = matched_rules
+        return result
 
     def _default_result(self):
         return {
@@ -544,12 +750,134 @@ class ReplyIntelligence:
             "signals": {}, "metrics": {}, "score_breakdown": {}, "full_explanation": [], "tiebreaker": {}
         }
 
+    # ==========================================
+    # COMPARATIVE EXPLANATION (Ready Now ranking)
+    # ==========================================
+    # Each lead becomes a fixed-order signal vector. Leads are sorted once
+    # and every lead is explained against its neighbour just below it, so
+    # n leads cost O(n log n) + O(n * dims) instead of all pairs.
+    # Like the Ready Now tiebreaker, the order is driven by signal evidence
+    # (weighted vector), with the score only breaking ties.
+    # (key, weight ~ score impact, phrase)
+    COMPARISON_DIMENSIONS = (
+        ("competitor", 12, "is actively comparing competitors"),
+        ("business_pain", 10, "described business pain"),
+        ("implementation", 10, "asked about implementation"),
+        ("pricing", 5, "asked about pricing"),
+        ("budget", 5, "confirmed budget"),
+        ("timeline", 5, "has a timeline"),
+        ("stakeholder", 5, "involved stakeholders"),
+        ("analytical", 5, "asked analytical questions"),
+        ("problem_desc", 3, "described the problem"),
+        ("question_count", 3, "asked more questions"),
+        ("depth", 5, "replied more often"),
+        ("velocity", 3, "replies within a day"),
+    )
+    MAX_REASONS = 3
+
+    def _comparison_vector(self, lead):
+        signals = lead.get('signals') or {}
+        metrics = lead.get('metrics') or {}
+        vector = []
+        for key, _, _ in self.COMPARISON_DIMENSIONS:
+            if key == "depth":
+                value = metrics.get('depth', 0)
+            elif key == "velocity":
+                value = 1 if metrics.get('velocity_hours', 999) <= 24 else 0
+            else:
+                value = signals.get(key, 0) or 0
+            vector.append(value)
+        return vector
+
+    def compare_leads(self, leads):
+        """
+        `leads`: [{email, score, signals, metrics}].
+        Returns one entry per adjacent pair in rank order:
+        {higher, lower, score_gap, differences, reason}; the reason names
+        the higher-ranked lead first.
+        """
+        if len(leads) < 2:
+            return []
+        weights = [w for _, w, _ in self.COMPARISON_DIMENSIONS]
+        ranked = sorted(
+            ((lead.get('score', 0), self._comparison_vector(lead), lead) for lead in leads),
+            key=lambda item: (sum(w * v for w, v in zip(weights, item[1])), item[0]),
+            reverse=True
+        )
+        comparisons = []
+        for (score_a, vec_a, lead_a), (score_b, vec_b, lead_b) in zip(ranked, ranked[1:]):
+            diffs = []
+            for (key, weight, phrase), a, b in zip(self.COMPARISON_DIMENSIONS, vec_a, vec_b):
+                if a > b:
+                    diffs.append((weight * (a - b), key, phrase, a, b))
+            diffs.sort(key=lambda d: d[0], reverse=True)
+            top = diffs[:self.MAX_REASONS]
+
+            email_a, email_b = lead_a.get('email'), lead_b.get('email')
+            if top:
+                reason = f"{email_a} ranks above {email_b}: " + ", ".join(d[2] for d in top)
+            elif score_a > score_b:
+                reason = f"{email_a} ranks above {email_b} on overall score"
+            else:
+                reason = f"{email_a} and {email_b} are level on every signal"
+            reason += f" ({score_a} vs {score_b})."
+            comparisons.append({
+                "higher": email_a,
+                "lower": email_b,
+                "score_gap": score_a - score_b,
+                "differences": [{"signal": key, "higher": a, "lower": b} for _, key, _, a, b in top],
+                "reason": reason
+            })
+        return comparisons
+
 
 # ==========================================
 # DECIDE LEAD with HARDENING
 # ==========================================
+def _finish(decision, metadata, sw, stage, decided_by=None, matched=None):
+    """
+    Closes the current stage timer and applies inbox reality.
+    `decided_by` / `matched` name the rule that returned and the patterns
+    that hit; they are only kept while slow_capture is recording.
+    """
+    if sw: sw.lap(stage)
+    decision = _apply_inbox_reality(decision, metadata, sw)
+    capture = slow_capture.ENABLED and slow_capture.capturing("decide_lead")
+    if sw and (stage_timer.ATTACH or capture):
+        decision["timings"] = sw.as_dict()
+    if capture:
+        decision["decided_by"] = decided_by
+        decision["matched_rules"] = matched or {}
+    DECISIONS.inc(decision.get("tier", "unknown"), decision.get("action", "unknown"))
+    return decision
+
 def decide_lead(thread_text=None, thread_history=None, metadata=None):
+    # Slow reply capture (off unless SLOW_REPLY_MS is set, see slow_capture.py)
+    if not slow_capture.ENABLED:
+        return _decide_lead(thread_text, thread_history, metadata)
+    started = slow_capture.start("decide_lead")
+    if started is None:
+        return _decide_lead(thread_text, thread_history, metadata)
+    try:
+        decision = _decide_lead(thread_text, thread_history, metadata)
+    except BaseException:
+        slow_capture.abandon()
+        raise
+    timings = decision.get("timings") if stage_timer.ATTACH else decision.pop("timings", None)
+    decided_by = decision.pop("decided_by", None)
+    matched = decision.pop("matched_rules", None)
+    text = thread_text
+    if thread_history:
+        text = "\n---\n".join(m.get('body', '') for m in thread_history if m.get('sender') == 'lead')
+    slow_capture.finish(started, text, timings, decided_by=decided_by, matched=matched,
+                        outcome=f'{decision.get("tier")} / {decision.get("action")}')
+    return decision
+
+def _decide_lead(thread_text=None, thread_history=None, metadata=None):
     if metadata is None: metadata = {}
+    # Stage timers (off unless STAGE_TIMINGS is set, see stage_timer.py)
+    capture = slow_capture.ENABLED and slow_capture.capturing("decide_lead")
+    sw = stage_timer.start(force=True) if stage_timer.ENABLED or capture else None
     
     # Resolve input...
     latest_text = ""
@@ -571,7 +899,7 @@ def decide_lead(thread_text=None, thread_history=None, metadata=None):
     }
 
     if not latest_text and not history_to_analyze:
-        return _apply_inbox_reality(decision, metadata)
+        return _finish(decision, metadata, sw, "prepare")
 
     engine = ReplyIntelligence()
     text_lower = latest_text.lower().strip()
@@ -579,6 +907,7 @@ def decide_lead(thread_text=None, thread_history=None, metadata=None):
     # Terminal checks on latest text...
     cleaned_lines = [l for l in text_lower.split('\n') if not l.strip().startswith('>')]
     cleaned_text = " ".join(cleaned_lines).strip()
+    if sw: sw.lap("prepare")
 
     # ==========================================
     # SHORT REPLY OVERRIDE (word_count <= 10)
@@ -591,31 +920,38 @@ def decide_lead(thread_text=None, thread_history=None, metadata=None):
         # Check high intent FIRST — promote to Ready Now
         # (checked before noise so "sure, let's talk" hits high-intent
         # on "let's talk" rather than noise on "sure")
+        search = _searcher("SHORT_HIGH_INTENT_PHRASES")
         for p in engine.SHORT_HIGH_INTENT_PHRASES:
-            if re.search(p, cleaned_text):
+            if search(p, cleaned_text):
                 decision.update({
                     "action": "respond_now", "tier": "Ready Now", "confidence_bucket": "High",
                     "priority_score": 90, "priority_level": "Critical",
                     "explanation": "Short high-intent reply. Prospect expressed direct interest. Follow up immediately.",
                     "feedback_prompt": "Did you reply? (Yes/No)", "disposition": "qualified"
                 })
-                return _apply_inbox_reality(decision, metadata)
+                return _finish(decision, metadata, sw, "short_reply_override",
+                               f"SHORT_HIGH_INTENT_PHRASES: {p}", {"SHORT_HIGH_INTENT_PHRASES": [p]})
 
         # Then check noise — reject low-value short replies
+        search = _searcher("SHORT_NOISE_PHRASES")
         for p in engine.SHORT_NOISE_PHRASES:
-            if re.search(p, cleaned_text):
+            if search(p, cleaned_text):
                 decision.update({
                     "action": "do_not_respond", "tier": "Noise", "confidence_bucket": "High",
                     "priority_score": 0, "priority_level": "Low",
                     "explanation": "Short low-value reply. No actionable intent.",
                     "feedback_prompt": "Correctly blocked? (Yes/No)", "disposition": "ignore"
                 })
-                return _apply_inbox_reality(decision, metadata)
+                return _finish(decision, metadata, sw, "short_reply_override",
+                               f"SHORT_NOISE_PHRASES: {p}", {"SHORT_NOISE_PHRASES": [p]})
+
+    if sw: sw.lap("short_reply_override")
 
     # BUYING INTENT OVERRIDE: budget approved + contract/pricing language always = Ready Now
     # This must be checked BEFORE referral detection so strong intent is not swallowed
-    has_budget_approved = bool(re.search(r"budget approved", cleaned_text))
-    has_contract_language = bool(re.search(r"(?:send|contract|pricing|proposal|terms)", cleaned_text))
+    search = _searcher("BUYING_INTENT_OVERRIDE")
+    has_budget_approved = bool(search(r"budget approved", cleaned_text))
+    has_contract_language = bool(search(r"(?:send|contract|pricing|proposal|terms)", cleaned_text))
     if has_budget_approved and has_contract_language:
         decision.update({
             "action": "respond_now", "tier": "Ready Now", "confidence_bucket": "High",
@@ -623,11 +959,15 @@ def decide_lead(thread_text=None, thread_history=None, metadata=None):
             "explanation": "Budget approved with contract/pricing language — terminal buying signal.",
             "feedback_prompt": "Did you reply? (Yes/No)", "disposition": "qualified"
         })
-        return _apply_inbox_reality(decision, metadata)
+        patterns = [r"budget approved", r"(?:send|contract|pricing|proposal|terms)"]
+        return _finish(decision, metadata, sw, "buying_intent_override",
+                       "BUYING_INTENT_OVERRIDE", {"BUYING_INTENT_OVERRIDE": patterns})
+    if sw: sw.lap("buying_intent_override")
 
     # Referral / internal escalation check
+    search = _searcher("TERMINAL_REFERRED_PATTERNS")
     for p in engine.TERMINAL_REFERRED_PATTERNS:
-        if re.search(p, cleaned_text):
+        if search(p, cleaned_text):
             decision.update({
                 "action": "respond_later", "tier": "Referred", "confidence_bucket": "Medium",
                 "priority_score": 70, "priority_level": "Standard",
@@ -638,28 +978,37 @@ def decide_lead(thread_text=None, thread_history=None, metadata=None):
                 "status": "Awaiting decision maker response",
                 "follow_up": "3 to 5 business days"
             })
-            return _apply_inbox_reality(decision, metadata)
+            return _finish(decision, metadata, sw, "referred_patterns",
+                           f"TERMINAL_REFERRED_PATTERNS: {p}", {"TERMINAL_REFERRED_PATTERNS": [p]})
+    if sw: sw.lap("referred_patterns")
 
+    search = _searcher("TERMINAL_READY_PATTERNS")
     for p in engine.TERMINAL_READY_PATTERNS:
-        if re.search(p, cleaned_text):
+        if search(p, cleaned_text):
             decision.update({
                 "action": "respond_now", "tier": "Ready Now", "confidence_bucket": "High",
                 "priority_score": 95, "priority_level": "Critical", "explanation": "Terminal buying command detected.",
                 "feedback_prompt": "Did you reply? (Yes/No)", "disposition": "qualified"
             })
-            return _apply_inbox_reality(decision, metadata)
+            return _finish(decision, metadata, sw, "terminal_patterns",
+                           f"TERMINAL_READY_PATTERNS: {p}", {"TERMINAL_READY_PATTERNS": [p]})
 
+    search = _searcher("TERMINAL_NOISE_PATTERNS")
     for p in engine.TERMINAL_NOISE_PATTERNS:
-        if re.search(p, cleaned_text):
+        if search(p, cleaned_text):
             decision.update({
                 "action": "do_not_respond", "tier": "Noise", "confidence_bucket": "High",
                 "priority_score": 0, "priority_level": "Low", "explanation": "Explicit unsubscribe request.",
                 "feedback_prompt": "Correctly blocked? (Yes/No)", "disposition": "blocked"
             })
-            return _apply_inbox_reality(decision, metadata)
+            return _finish(decision, metadata, sw, "terminal_patterns",
+                           f"TERMINAL_NOISE_PATTERNS: {p}", {"TERMINAL_NOISE_PATTERNS": [p]})
+    if sw: sw.lap("terminal_patterns")
 
     # Heuristic Analysis
     result = engine.analyze_thread(history_to_analyze)
+    matched = result.pop("matched_rules", None)
+    if sw: sw.lap("analyze_thread")
     score = result['score']
     state = result['state']
     signals = result['signals']
@@ -702,13 +1051,13 @@ def decide_lead(thread_text=None, thread_history=None, metadata=None):
             decision["confidence_bucket"] = "Medium"
 
     decision["analysis"] = result
-    return _apply_inbox_reality(decision, metadata)
+    return _finish(decision, metadata, sw, "confidence", f"analyze_thread: {state}", matched)
 
 
 # ==========================================
 # HARDENING 2: STRICT RECENCY & PERSISTENCE
 # ==========================================
-def _apply_inbox_reality(decision, metadata):
+def _apply_inbox_reality(decision, metadata, sw=None):
     email_id = metadata.get("email_id") or metadata.get("id")
     
     # 1. STRICT RECENCY (Hardening 2)
@@ -737,6 +1086,7 @@ def _apply_inbox_reality(decision, metadata):
             pass # Malformed = No bonus
             
     decision["priority_score"] += recency_bonus
+    if sw: sw.lap("inbox_reality.recency")
 
     # 2. DUPLICATE SUPPRESSION + SAVE (Hardening 1)
     if email_id and decision["action"] == "respond_now":
@@ -762,6 +1112,7 @@ def _apply_inbox_reality(decision, metadata):
         _save_memory(LEAD_MEMORY) # <--- WRITE TO DISK
     
     decision["priority_score"] = min(100, max(0, int(decision["priority_score"])))
+    if sw: sw.lap("inbox_reality.persistence")
     
     return decision
 
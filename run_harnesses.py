@@ -0,0 +1,95 @@
+"""
+Runs the stress / edge harnesses side by side, one process each.
+
+  stress_test_protocol.py       10-stage scoring stress protocol
+  stress_test_classification.py decide_lead tier / action checks
+  synthetic_batch_12.py         12 synthetic threads
+  synthetic_round2.py           vendor-eval false positives
+  tests/edge_matrix.py          20 corner cases
+  tests/chaos_sim.py            15 chaotic leads over 10 days
+
+By default every harness runs in-process (HARNESS_TRANSPORT=client, see
+harness_transport.py), so no server on :8081 is needed and each process
+gets its own empty LEAD_DB. --transport http drives a live server as the
+scripts always have (keep --jobs 1 there unless the emails don't clash).
+
+Usage: python run_harnesses.py [--transport client|direct|http] [--jobs N]
+                               [--only NAME[,NAME]] [--verbose] [--out DIR]
+Exit status is non-zero if any harness crashed.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+HARNESSES = [
+    "stress_test_protocol.py",
+    "stress_test_classification.py",
+    "synthetic_batch_12.py",
+    "synthetic_round2.py",
+    "tests/edge_matrix.py",
+    "tests/chaos_sim.py",
+]
+SUMMARY_LINES = 6
+
+
+def run_one(script, transport):
+    env = dict(os.environ)
+    env.update({
+        "HARNESS_TRANSPORT": transport,
+        "PYTHONPATH": ROOT + os.pathsep + env.get("PYTHONPATH", ""),
+        "PYTHONIOENCODING": "utf-8",
+    })
+    if transport != "http":
+        env["LEAD_DATA_DIR"] = ""   # in-memory store, nothing left on disk
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, os.path.join(ROOT, script)], cwd=ROOT, env=env,
+                          capture_output=True, text=True, encoding="utf-8", errors="replace")
+    return script, proc.returncode, time.perf_counter() - start, proc.stdout, proc.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=("client", "direct", "http"), default="client")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--only", help="comma-separated substrings of harness paths")
+    parser.add_argument("--verbose", action="store_true", help="print each harness's full output")
+    parser.add_argument("--out", help="write each harness's output to DIR/<name>.log")
+    args = parser.parse_args()
+
+    scripts = HARNESSES
+    if args.only:
+        wanted = [w.strip() for w in args.only.split(",")]
+        scripts = [s for s in scripts if any(w in s for w in wanted)]
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    started = time.perf_counter()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for script, code, elapsed, stdout, stderr in pool.map(
+                lambda s: run_one(s, args.transport), scripts):
+            status = "ok" if code == 0 else f"CRASHED (exit {code})"
+            failed += code != 0
+            print(f"\n{'=' * 70}\n  {script}: {status} in {elapsed:.2f}s\n{'=' * 70}")
+            lines = stdout.rstrip().splitlines()
+            print("\n".join(lines if args.verbose else lines[-SUMMARY_LINES:]))
+            if code != 0:
+                print(stderr.rstrip())
+            if args.out:
+                name = os.path.basename(script).rsplit(".", 1)[0]
+                with open(os.path.join(args.out, name + ".log"), "w", encoding="utf-8") as f:
+                    f.write(stdout + stderr)
+
+    print(f"\n{len(scripts)} harnesses via {args.transport} in {time.perf_counter() - started:.2f}s, "
+          f"{failed} crashed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
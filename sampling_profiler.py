@@ -0,0 +1,145 @@
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# ==========================================
+# SAMPLING PROFILER (On-Demand, Per Route)
+# ==========================================
+# Started and stopped from the admin routes on either app
+# (POST /admin/profiler/start|stop, GET /admin/profiler,
+# GET /admin/profiler/collapsed). While running, a daemon thread reads
+# sys._current_frames() every `interval` seconds and counts each
+# thread's stack.
+#
+# A sample belongs to the route whose view function is on its stack.
+# Routes are registered by code object, so this works for Flask request
+# threads, FastAPI worker threads and async endpoints on the event loop
+# alike. Stacks with no route (idle workers, queue drains, timers) are
+# dropped unless include_idle is set.
+#
+# Output is collapsed-stack text ("route;file:func;... count"), which
+# flamegraph.pl and speedscope read directly.
+DEFAULT_INTERVAL = float(os.environ.get("PROFILER_INTERVAL", "0.005"))
+MAX_DURATION = 300
+IDLE_ROUTE = "(no route)"
+
+
+def _label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}          # code object -> route label
+        self._stacks = Counter()   # (route, collapsed frames) -> samples
+        self._thread = None
+        self._stop = threading.Event()
+        self.interval = DEFAULT_INTERVAL
+        self.include_idle = False
+        self.started_at = None
+        self.stopped_at = None
+        self.sample_count = 0
+
+    def register_route(self, view_func, route):
+        """Attributes stacks passing through `view_func` to `route`."""
+        code = getattr(inspect.unwrap(view_func), "__code__", None)
+        if code is not None:
+            self._routes.setdefault(code, route)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=None, duration=60, include_idle=False, reset=True):
+        """Starts sampling; stops by itself after `duration` seconds (capped)."""
+        if self.running:
+            return False
+        if reset:
+            self.reset()
+        self.interval = max(0.001, interval or DEFAULT_INTERVAL)
+        self.include_idle = include_idle
+        self._stop.clear()
+        self.started_at = time.time()
+        self.stopped_at = None
+        duration = min(duration or MAX_DURATION, MAX_DURATION)
+        self._thread = threading.Thread(target=self._run, args=(duration,),
+                                        name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if not self.running:
+            return False
+        self._stop.set()
+        self._thread.join()
+        return True
+
+    def _run(self, duration):
+        deadline = time.monotonic() + duration
+        me = threading.get_ident()
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            self._sample(me)
+            self._stop.wait(self.interval)
+        self.stopped_at = time.time()
+
+    def _sample(self, skip_ident):
+        routes = self._routes
+        batch = []
+        for ident, frame in sys._current_frames().items():
+            if ident == skip_ident:
+                continue
+            labels = []
+            route = None
+            while frame is not None:
+                code = frame.f_code
+                if code in routes:
+                    # Outermost view function wins (frames are walked leaf-first)
+                    route = routes[code]
+                labels.append(_label(code))
+                frame = frame.f_back
+            if route is None:
+                if not self.include_idle:
+                    continue
+                route = IDLE_ROUTE
+            labels.reverse()
+            batch.append((route, ";".join(labels)))
+        with self._lock:
+            self._stacks.update(batch)
+            self.sample_count += 1
+
+    def collapsed(self, route=None):
+        """Flamegraph-compatible collapsed stacks, route as the root frame."""
+        with self._lock:
+            items = list(self._stacks.items())
+        lines = [f"{r};{stack} {count}" for (r, stack), count in sorted(items)
+                 if route is None or r == route]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def status(self, top=10):
+        with self._lock:
+            by_route = Counter()
+            leaves = Counter()
+            for (route, stack), count in self._stacks.items():
+                by_route[route] += count
+                leaves[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "ticks": self.sample_count,
+            "samples_by_route": dict(by_route.most_common()),
+            "top_frames": [{"frame": f, "samples": n} for f, n in leaves.most_common(top)]
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.sample_count = 0
+
+
+PROFILER = SamplingProfiler()
@@ -1,18 +1,50 @@
 import os
 import time
 import json
-from flask import Flask, request, jsonify
+import base64
+import heapq
+from flask import Flask, Response, request, jsonify, stream_with_context, g
 from reply_intelligence import ReplyIntelligence
+from lead_store import LeadStore
+from lead_record import LeadRecord, Message
+from lead_journal import LeadJournal
+from ingest_queue import IngestQueue
+from idempotency import IdempotencyIndex
+from quantile_sketch import DDSketch
+from lead_counters import LeadCounters
+from alert_engine import AlertEngine
+from missed_report import MissedReport
+import metrics
+import slow_capture
+from sampling_profiler import PROFILER as SAMPLER
 
 # ==========================================
 # CONFIGURATION
 # ==========================================
 PORT = 8081
 
+# Durability: set LEAD_DATA_DIR to persist LEAD_DB (write-ahead log +
+# snapshots). Unset keeps the original in-memory-only behaviour.
+LEAD_DATA_DIR = os.environ.get("LEAD_DATA_DIR")
+LEAD_WAL_FSYNC = os.environ.get("LEAD_WAL_FSYNC", "0") == "1"
+
+# Webhook ingestion: "sync" scores inside the request (200),
+# "async" validates + dedups, queues and answers 202.
+INGEST_MODE = os.environ.get("INGEST_MODE", "sync")
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "4"))
+
+# Thread compaction: keep the last THREAD_WINDOW messages verbatim and fold
+# older ones into lead['thread_summary']. 0 keeps every message.
+THREAD_WINDOW = int(os.environ.get("THREAD_WINDOW", "0"))
+
+# Response-time EWMA weight of the newest agent response (per lead)
+RESPONSE_EWMA_ALPHA = 0.3
+
 # ==========================================
-# STORAGE (In-Memory for MVP)
+# STORAGE (In-Memory, optionally journaled to disk)
 # ==========================================
-# Structure (FLAT per user request):
+# Structure (FLAT per user request; each entry is a slotted LeadRecord
+# with the same keys, see lead_record.py):
 # {
 #   "email": {
 #       "email": "user@example.com",
@@ -26,19 +58,208 @@ PORT = 8081
 #       "profile": { "name": "Unknown", "email": ... },
 #       "score_history": [0, 32, 71],
 #       "intent_jump_alert": None | {"from": 32, "to": 71, "delta": 39, "timestamp": ...},
-#       "response_times": [120, 540],
 #       "avg_response_time_min": 5.5,
+#       "response_count": 2, "response_mean_sec": 330.0, "response_ewma_sec": 183.0,
 #       "outcome": None | "meeting" | "no_meeting",
 #       "last_lead_reply_at": None,
-#       "disagreements": []
+#       "disagreements": [],
+#       "lead_reply_count": 3,
+#       "momentum": "Rising" | "Stable" | "Cooling",
+#       "momentum_state": {lead_messages, first/last_lead_ts, score_ewma, last_score},
+#       "thread_summary": (only with THREAD_WINDOW) folded older messages
 #   }
 # }
-LEAD_DB = {} 
+# Writes go through LEAD_DB.transaction(email), which holds that lead's
+# stripe lock for the whole read-modify-write. Full scans read
+# LEAD_DB.snapshot(), an immutable point-in-time view.
+# With LEAD_DATA_DIR set, startup loads the latest snapshot plus the log
+# tail (stored scores are replayed, analyze_thread is not re-run).
+JOURNAL = LeadJournal(LEAD_DATA_DIR, fsync=LEAD_WAL_FSYNC) if LEAD_DATA_DIR else None
+LEAD_DB = LeadStore(journal=JOURNAL, record_factory=LeadRecord.from_dict)
+
+# Webhook dedup index; rebuilt from the recovered threads on restart
+IDEMPOTENCY = IdempotencyIndex()
+IDEMPOTENCY.rebuild(LEAD_DB.items())
+LEAD_DB.subscribe(IDEMPOTENCY.on_publish)
+
+# Team-wide agent response times (seconds). Bounded memory no matter how
+# many responses are recorded. Not journaled: after a restart it is seeded
+# from each lead's running mean, weighted by its response count. Fed from
+# the store listener, so a transaction that fails (and is retried) never
+# records its sample.
+RESPONSE_SKETCH = DDSketch()
+
+def _response_total(record):
+    """(count, sum of seconds) of the responses recorded on a lead."""
+    if record is None:
+        return 0, 0.0
+    count = record.get('response_count') or 0
+    if count:
+        return count, record['response_mean_sec'] * count
+    legacy = record.get('response_times') or []
+    return len(legacy), float(sum(legacy))
+
+def _seed_response_sketch(items):
+    for _, record in items:
+        if record.get('response_count') and record.get('response_mean_sec') is not None:
+            RESPONSE_SKETCH.add(record['response_mean_sec'], record['response_count'])
+
+def _record_response_sketch(email, old, new):
+    if email is None:
+        RESPONSE_SKETCH.clear()
+        return
+    if new is None or not new.get('response_count'):
+        return
+    old_count, old_total = _response_total(old)
+    added = new['response_count'] - old_count
+    if added > 0:
+        new_total = new['response_mean_sec'] * new['response_count']
+        RESPONSE_SKETCH.add((new_total - old_total) / added, added)
+
+_seed_response_sketch(LEAD_DB.items())
+LEAD_DB.subscribe(_record_response_sketch)
 
 reply_engine = ReplyIntelligence()
 
 app = Flask(__name__, static_folder='public', static_url_path='/public')
 
+# ==========================================
+# LEAD PROJECTIONS
+# ==========================================
+BAND_NAMES = ("ready_now", "evaluating", "curious", "noise")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def _band_of(state):
+    """Maps a lead state onto its dashboard column."""
+    if state == "Ready Now":
+        return "ready_now"
+    if state in ["High Intent", "Evaluating"]:
+        # High Intent (71-84) and Evaluating (51-70) share the 2nd column
+        return "evaluating"
+    if state == "Light Interest":
+        # Light Interest (31-50) maps to the 3rd column
+        return "curious"
+    return "noise"
+
+# Dashboard stats / SLA / band counts, updated on every publish
+LEAD_COUNTERS = LeadCounters(_band_of)
+LEAD_COUNTERS.rebuild(LEAD_DB.items())
+LEAD_DB.subscribe(LEAD_COUNTERS.on_publish)
+
+# SLA breach deadlines (min-heap) + intent jump alerts for /api/alerts.
+# The background ticker starts with the first open deadline.
+ALERTS = AlertEngine()
+ALERTS.rebuild(LEAD_DB.items())
+LEAD_DB.subscribe(ALERTS.on_publish)
+
+# Rolling hour/day buckets behind /api/missed-report
+MISSED_REPORT = MissedReport()
+MISSED_REPORT.rebuild(LEAD_DB.items())
+LEAD_DB.subscribe(MISSED_REPORT.on_publish)
+
+def _needs_decay(data, now):
+    # Only re-score active leads to save CPU
+    return ((now - data.get('last_updated', 0)) > (4 * 3600)
+            and data.get('state') in ["Ready Now", "High Intent", "Evaluating", "Light Interest"])
+
+def _apply_lazy_decay(email, data, now):
+    """
+    HARDENING: LAZY DECAY (Operational Stability)
+    If lead hasn't been updated in >4 hours, re-score it.
+    This ensures "ghost" leads decay even if no new webhook arrives.
+    """
+    if not _needs_decay(data, now):
+        return data
+    with LEAD_DB.transaction(email, op="decay") as data:
+        # Re-check under the lock: a webhook may have just refreshed it
+        if data is not None and _needs_decay(data, now):
+            # Silent re-score
+            analysis = _analyze_lead(data)
+            
+            # Update DB in place
+            data['score'] = analysis.get('score', 0)
+            data['state'] = analysis.get('state', 'Noise')
+            data['signals'] = analysis.get('explanation', [])
+            data['full_explanation'] = analysis.get('full_explanation', [])
+            data['cliff_flag'] = analysis.get('cliff_flag')
+            data['momentum'] = analysis.get('momentum', 'Stable')
+            data['tiebreaker'] = analysis.get('tiebreaker', {})
+            data['last_updated'] = now  # Mark as fresh
+    # Snapshots hold the pre-decay record; hand back the published one
+    return LEAD_DB.get(email, data)
+
+def _lead_summary(email, data):
+    """Lean projection used by the paginated listings."""
+    thread = data.get('thread', [])
+    return {
+        "email": email,
+        "score": data.get('score', 0),
+        "state": data.get('state', 'Noise'),
+        "momentum": data.get('momentum', 'Stable'),
+        "last_reply": thread[-1]['timestamp'] if thread else 0
+    }
+
+def _lead_detail(email, data):
+    """Heavy fields that the listings leave out."""
+    return {
+        "email": email,
+        "explanation": data.get('signals', []),
+        "full_explanation": data.get('full_explanation', []),
+        "cliff_flag": data.get('cliff_flag'),
+        "profile": data.get('profile', {}),
+        "tiebreaker": data.get('tiebreaker', {}),
+        "score_history": list(data.get('score_history', [])),
+        "intent_jump_alert": data.get('intent_jump_alert'),
+        "avg_response_time_min": data.get('avg_response_time_min'),
+        "outcome": data.get('outcome')
+    }
+
+def _lead_item(email, data):
+    """Full dashboard card: summary plus detail."""
+    item = _lead_summary(email, data)
+    item.update(_lead_detail(email, data))
+    return item
+
+def _band_sort_key(band, email, data):
+    """
+    Ascending sort key matching the dashboard ordering of each column.
+    The email is appended so the key is unique and usable as a cursor.
+    """
+    if band == "ready_now":
+        # Tie-breaker: eval_signals DESC, constraint_count DESC, urgency DESC, velocity ASC
+        tb = data.get('tiebreaker', {})
+        return [
+            -tb.get('eval_signals', 0),
+            -tb.get('constraint_count', 0),
+            -tb.get('timeline_urgency', 0),
+            tb.get('velocity_hours', 999),
+            email
+        ]
+    if band == "noise":
+        return [data.get('score', 0), email]
+    return [-data.get('score', 0), email]
+
+def _encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def _decode_cursor(cursor, band):
+    """
+    Sort key from a next_cursor, or None unless it has the shape of
+    `band`'s keys (numbers then the email), so a cursor from another
+    band or a hand-edited one can't reach the key comparison.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    numbers = 4 if band == "ready_now" else 1
+    if not isinstance(key, list) or len(key) != numbers + 1 or not isinstance(key[-1], str):
+        return None
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in key[:-1]):
+        return None
+    return key
+
 # ==========================================
 # FLASK ROUTES
 # ==========================================
@@ -51,11 +272,104 @@ def serve_index():
 def serve_dashboard():
     return app.send_static_file('dashboard.html')
 
+@app.route('/api/leads/<band>', methods=['GET'])
+def list_leads(band):
+    """
+    Cursor-paginated listing of one dashboard column.
+    Query: ?limit=50&cursor=<next_cursor from previous page>
+    Returns the lean projection only; use /api/lead/<email> for the rest.
+    """
+    global LEAD_DB
+    
+    if band not in BAND_NAMES:
+        return jsonify(error=f"Unknown band: {band}"), 404
+    
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify(error="limit must be an integer"), 400
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        after = _decode_cursor(cursor, band)
+        if after is None:
+            return jsonify(error="Invalid cursor"), 400
+    
+    now = time.time()
+    candidates = []
+    total = 0
+    snapshot = LEAD_DB.snapshot()
+    for email, data in snapshot.items():
+        data = _apply_lazy_decay(email, data, now)
+        if _band_of(data.get('state', 'Noise')) != band:
+            continue
+        total += 1
+        key = _band_sort_key(band, email, data)
+        if after is not None and key <= after:
+            continue
+        candidates.append((key, email, data))
+    
+    # Only the page (+1 to detect a next page) needs ordering
+    page = heapq.nsmallest(limit + 1, candidates, key=lambda c: c[0])
+    has_more = len(page) > limit
+    page = page[:limit]
+    
+    return jsonify({
+        "band": band,
+        "items": [_lead_summary(email, data) for _, email, data in page],
+        "next_cursor": _encode_cursor(page[-1][0]) if has_more else None,
+        "total": total
+    })
+
+@app.route('/api/lead/<email>', methods=['GET'])
+def get_lead(email):
+    """Returns the heavy fields of a single lead for the detail view."""
+    global LEAD_DB
+    
+    if email not in LEAD_DB:
+        return jsonify(error="Lead not found"), 404
+    
+    return jsonify(_lead_item(email, LEAD_DB[email]))
+
+# (store version, Ready Now emails) -> comparisons; one slot, since every
+# dashboard poll between two writes asks for the same thing
+_COMPARATIVE_CACHE = [None, []]
+
+def _comparative(ready_now, snapshot, version):
+    """
+    Adjacent-pair explanations for the Ready Now column, cached per store
+    version. `version` must be the one `snapshot` was taken at: a write
+    during the scan would otherwise file old comparisons under a newer key.
+    """
+    if len(ready_now) < 2:
+        return []
+    key = (version, tuple(item['email'] for item in ready_now))
+    cached_key, cached = _COMPARATIVE_CACHE
+    if cached_key == key:
+        metrics.CACHE_EVENTS.inc("comparative", "hit")
+        return cached
+    metrics.CACHE_EVENTS.inc("comparative", "miss")
+    ready_data = []
+    for item in ready_now:
+        db_entry = snapshot.get(item['email'], {})
+        ready_data.append({
+            "email": item['email'],
+            "score": item['score'],
+            "signals": db_entry.get('raw_signals', {}),
+            "metrics": db_entry.get('raw_metrics', {})
+        })
+    comparative = reply_engine.compare_leads(ready_data)
+    _COMPARATIVE_CACHE[:] = [key, comparative]
+    return comparative
+
 @app.route('/api/dashboard', methods=['GET'])
 def get_dashboard_data():
     """
     Returns leads sorted by readiness score and categorized.
-    Reads directly from the flat LEAD_DB structure.
+    Iterates a point-in-time LEAD_DB snapshot, so webhooks keep writing
+    while the scan runs.
     """
     global LEAD_DB
     
@@ -64,90 +378,23 @@ def get_dashboard_data():
     curious = []
     noise = []
     
-    # Calculate stats for Performance Panel
-    total_replies_analyzed = 0
-    time_saved_minutes = 0
-    
-    # SLA tracking
-    sla_under_30 = 0
-    sla_over_30 = 0
-    sla_no_response = 0
-    
     now = time.time()
     
-    for email, data in LEAD_DB.items():
-        # ── HARDENING: LAZY DECAY (Operational Stability) ──
-        # If lead hasn't been updated in >4 hours, re-score it.
-        # This ensures "ghost" leads decay even if no new webhook arrives.
-        last_updated = data.get('last_updated', 0)
-        if (now - last_updated) > (4 * 3600):
-            # Only re-score active leads to save CPU
-            if data.get('state') in ["Ready Now", "High Intent", "Evaluating", "Light Interest"]:
-                # Silent re-score
-                analysis = reply_engine.analyze_thread(data['thread'])
-                
-                # Update DB in place
-                data['score'] = analysis.get('score', 0)
-                data['state'] = analysis.get('state', 'Noise')
-                data['signals'] = analysis.get('explanation', [])
-                data['full_explanation'] = analysis.get('full_explanation', [])
-                data['cliff_flag'] = analysis.get('cliff_flag')
-                data['momentum'] = analysis.get('momentum', 'Stable')
-                data['tiebreaker'] = analysis.get('tiebreaker', {})
-                data['last_updated'] = now  # Mark as fresh
-        
-        # Read from flat structure
-        state = data.get('state', 'Noise')
-        score = data.get('score', 0)
+    version, snapshot = LEAD_DB.snapshot_with_version()
+    for email, data in snapshot.items():
+        data = _apply_lazy_decay(email, data, now)
         
-        # Count replies (user replies only)
-        thread = data.get('thread', [])
-        user_replies = [m for m in thread if m.get('sender') == 'lead']
-        reply_count = len(user_replies)
+        item = _lead_item(email, data)
         
-        if reply_count > 0:
-            total_replies_analyzed += reply_count
-            
-        item = {
-            "email": email,
-            "score": score,
-            "state": state,
-            "explanation": data.get('signals', []),
-            "full_explanation": data.get('full_explanation', []),
-            "cliff_flag": data.get('cliff_flag'),
-            "momentum": data.get('momentum', 'Stable'),
-            "profile": data.get('profile', {}),
-            "last_reply": thread[-1]['timestamp'] if thread else 0,
-            "tiebreaker": data.get('tiebreaker', {}),
-            "score_history": data.get('score_history', []),
-            "intent_jump_alert": data.get('intent_jump_alert'),
-            "avg_response_time_min": data.get('avg_response_time_min'),
-            "outcome": data.get('outcome')
-        }
-        
-        # SLA tracking for high-intent threads (score >= 60)
-        if score >= 60:
-            avg_resp = data.get('avg_response_time_min')
-            if avg_resp is not None:
-                if avg_resp <= 30:
-                    sla_under_30 += 1
-                else:
-                    sla_over_30 += 1
-            elif data.get('last_lead_reply_at'):
-                sla_no_response += 1
-        
-        if state == "Ready Now":
+        band = _band_of(data.get('state', 'Noise'))
+        if band == "ready_now":
             ready_now.append(item)
-        elif state in ["High Intent", "Evaluating"]:
-            # High Intent (71-84) and Evaluating (51-70) share the 2nd column
+        elif band == "evaluating":
             evaluating.append(item)
-        elif state == "Light Interest":
-            # Light Interest (31-50) maps to the 3rd column
+        elif band == "curious":
             curious.append(item)
         else:  # Noise
             noise.append(item)
-            if reply_count > 0:
-                time_saved_minutes += (reply_count * 5)
 
     # Sort Ready Now by tie-breaker: eval_signals DESC, constraint_count DESC, velocity ASC
     ready_now.sort(key=lambda x: (
@@ -161,28 +408,13 @@ def get_dashboard_data():
     noise.sort(key=lambda x: x['score'], reverse=False)
     
     # Comparative explanation layer
-    comparative = []
-    if len(ready_now) >= 2:
-        ready_data = []
-        for item in ready_now:
-            email = item['email']
-            db_entry = LEAD_DB.get(email, {})
-            ready_data.append({
-                "email": email,
-                "score": item['score'],
-                "signals": db_entry.get('raw_signals', {}),
-                "metrics": db_entry.get('raw_metrics', {})
-            })
-        comparative = reply_engine.compare_leads(ready_data)
-    
-    # Band distribution
-    total_leads = len(ready_now) + len(evaluating) + len(curious) + len(noise)
-    band_distribution = {
-        "ready_now": round(len(ready_now) / total_leads * 100) if total_leads else 0,
-        "evaluating": round(len(evaluating) / total_leads * 100) if total_leads else 0,
-        "curious": round(len(curious) / total_leads * 100) if total_leads else 0,
-        "noise": round(len(noise) / total_leads * 100) if total_leads else 0
-    }
+    comparative = _comparative(ready_now, snapshot, version)
+    
+    # Stats, SLA and band distribution are maintained incrementally on
+    # every publish (read after the scan so lazy decay is included)
+    counters = LEAD_COUNTERS.snapshot()
+    sla = counters['sla']
+    sla['response_time_min'] = _response_percentiles()
     
     return jsonify({
         "sections": {
@@ -192,139 +424,431 @@ def get_dashboard_data():
             "noise": noise
         },
         "comparative": comparative,
-        "stats": {
-            "total_analyzed": total_replies_analyzed,
-            "ready_count": len(ready_now),
-            "evaluating_count": len(evaluating),
-            "time_saved_minutes": time_saved_minutes
-        },
-        "sla": {
-            "responded_under_30m": sla_under_30,
-            "responded_over_30m": sla_over_30,
-            "no_response_yet": sla_no_response
-        },
-        "band_distribution": band_distribution
+        "stats": counters['stats'],
+        "sla": sla,
+        "band_distribution": counters['band_distribution']
     })
 
-@app.route('/webhook/reply', methods=['POST'])
-def ingest_reply():
+@app.route('/api/alerts', methods=['GET'])
+def get_alerts():
+    """Fired alerts, newest first: SLA breaches and intent jumps."""
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify(error="limit must be an integer"), 400
+    return jsonify(ALERTS.alerts(limit=max(1, limit)))
+
+@app.route('/api/missed-report', methods=['GET'])
+def get_missed_report():
     """
-    Receives an inbound reply from a lead.
-    Payload: { "email": "...", "body": "...", "timestamp": 1234567890, "sender": "lead" }
+    High-intent leads answered late / not yet / cooled off, summed from
+    precomputed buckets. ?window_hours= (default one week).
+    """
+    try:
+        window_hours = float(request.args.get('window_hours', 24 * 7))
+    except ValueError:
+        return jsonify(error="window_hours must be a number"), 400
+    if window_hours <= 0:
+        return jsonify(error="window_hours must be positive"), 400
+    return jsonify(MISSED_REPORT.report(window_hours=window_hours))
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """
+    O(1) wallboard view: the dashboard stats, SLA and band distribution
+    without the lead sections. Reflects published scores (lazy decay is
+    applied when a lead is next read or written).
+    """
+    counters = LEAD_COUNTERS.snapshot()
+    counters['sla']['response_time_min'] = _response_percentiles()
+    return jsonify(counters)
+
+def _new_lead(email, timestamp):
+    """Empty lead record in the flat LEAD_DB structure."""
+    return LeadRecord(email, timestamp)
+
+def _track_response_time(lead, response_seconds):
+    """O(1) running count / mean / EWMA instead of a growing list."""
+    legacy = lead.pop('response_times', None)
+    count = lead.get('response_count', 0)
+    mean = lead.get('response_mean_sec')
+    if legacy and not count:
+        # Record written before running aggregates existed
+        count, mean = len(legacy), sum(legacy) / len(legacy)
+    count += 1
+    mean = response_seconds if mean is None else mean + (response_seconds - mean) / count
+    ewma = lead.get('response_ewma_sec')
+    if ewma is None:
+        ewma = response_seconds
+    else:
+        ewma += RESPONSE_EWMA_ALPHA * (response_seconds - ewma)
+
+    lead['response_count'] = count
+    lead['response_mean_sec'] = mean
+    lead['response_ewma_sec'] = ewma
+    lead['avg_response_time_min'] = round(mean / 60, 1)
+
+def _response_percentiles():
+    """Team-wide agent response-time percentiles in minutes (None when empty)."""
+    def minutes(q):
+        value = RESPONSE_SKETCH.quantile(q)
+        return round(value / 60, 1) if value is not None else None
+    return {
+        "p50": minutes(0.5),
+        "p90": minutes(0.9),
+        "p99": minutes(0.99),
+        "responses": RESPONSE_SKETCH.count
+    }
+
+def _record_message(lead, body, timestamp, sender, idempotency_key=None, pending=()):
+    """
+    Bookkeeping for one inbound message, without scoring.
+    `pending` holds the messages appended earlier in the same transaction.
+    Returns False when the message is a duplicate retry.
     """
-    global LEAD_DB
-    
-    data = request.json
-    email = data.get('email')
-    body = data.get('body')
-    timestamp = data.get('timestamp', time.time())
-    sender = data.get('sender', 'lead') # 'lead' or 'agent'
-    
-    if not email or not body:
-        return jsonify(error="Missing email or body"), 400
-        
-    # Ensure lead exists in DB with flat structure
-    if email not in LEAD_DB:
-        LEAD_DB[email] = {
-            "email": email,
-            "thread": [],
-            "score": 0,
-            "state": "Noise",
-            "signals": [],
-            "full_explanation": [],
-            "last_updated": timestamp,
-            "cliff_flag": None,
-            "profile": {"name": "Unknown", "email": email},
-            "score_history": [],
-            "intent_jump_alert": None,
-            "response_times": [],
-            "avg_response_time_min": None,
-            "outcome": None,
-            "last_lead_reply_at": None,
-            "disagreements": []
-        }
-    
     # ── Feature 3: Response-Time Tracking ──
     # When agent replies, measure time since last lead reply
-    if sender == 'agent' and LEAD_DB[email].get('last_lead_reply_at'):
-        lead_time = LEAD_DB[email]['last_lead_reply_at']
+    if sender == 'agent' and lead.get('last_lead_reply_at'):
+        lead_time = lead['last_lead_reply_at']
         response_seconds = timestamp - lead_time
         if response_seconds > 0:
-            LEAD_DB[email]['response_times'].append(response_seconds)
-            avg_sec = sum(LEAD_DB[email]['response_times']) / len(LEAD_DB[email]['response_times'])
-            LEAD_DB[email]['avg_response_time_min'] = round(avg_sec / 60, 1)
+            _track_response_time(lead, response_seconds)
 
-        LEAD_DB[email]['last_lead_reply_at'] = None  # Reset after agent responds
+        lead['last_lead_reply_at'] = None  # Reset after agent responds
     
     # Track last lead reply timestamp
     if sender == 'lead':
-        LEAD_DB[email]['last_lead_reply_at'] = timestamp
+        lead['last_lead_reply_at'] = timestamp
     
     # ── HARDENING: IDEMPOTENCY CHECK ──
-    # Check last 5 messages for duplicates to prevent webhook retries from double-scoring
-    is_duplicate = False
-    for msg in LEAD_DB[email]['thread'][-5:]:
-        # Match body AND sender.
-        if msg['body'] == body and msg['sender'] == sender:
-            # If timestamp is within 5 minutes, treat as duplicate retry
-            if abs(msg['timestamp'] - timestamp) < 300:
-                is_duplicate = True
-                break
-    
-    if is_duplicate:
+    # Same body + sender within 5 minutes (or a repeated provider key) is a
+    # webhook retry: O(1) lookup in the global index instead of a thread scan.
+    # The key itself is indexed when the transaction publishes.
+    if IDEMPOTENCY.check(lead['email'], body, timestamp, sender, idempotency_key, pending):
         # Silent ignore
-        return jsonify(success=True, status="ignored_duplicate")
+        return False
 
     # Append to thread
-    reply_obj = {
-        "body": body,
-        "timestamp": timestamp,
-        "sender": sender
-    }
-    LEAD_DB[email]['thread'].append(reply_obj)
-    
+    # (idempotency_key is kept on the message so the index can be rebuilt
+    # after a restart)
+    if sender == 'lead':
+        momentum_state = _momentum_state(lead)
+    lead['thread'].append(Message(body, timestamp, sender, idempotency_key or None))
+    if sender == 'lead':
+        lead['lead_reply_count'] = lead.get('lead_reply_count', 0) + 1
+        lead['momentum_state'] = reply_engine.observe_lead_reply(momentum_state, timestamp)
+    return True
+
+def _momentum_state(lead):
+    """Running momentum/velocity state; seeded from the thread once for older records."""
+    state = lead.get('momentum_state')
+    if state is None:
+        state = reply_engine.seed_momentum_state(
+            lead.get('thread', []), lead.get('thread_summary'), lead.get('score_history', []))
+    return state
+
+def _analyze_lead(lead, lead_replied=False):
+    """
+    analyze_thread with the lead's running momentum. The score EWMA only
+    advances when this score goes into score_history (lead replies);
+    agent replies and lazy decay keep the stored momentum.
+    """
+    state = _momentum_state(lead)
+    analysis = reply_engine.analyze_thread(lead['thread'], lead.get('thread_summary'), state)
+    advanced = analysis.pop('momentum_state', None)
+    if lead_replied and advanced is not None:
+        state = advanced
+    else:
+        analysis['momentum'] = reply_engine.momentum_label(state)
+    lead['momentum_state'] = state
+    return analysis
+
+def _compact_thread(lead):
+    """
+    Folds messages older than the last THREAD_WINDOW into the thread
+    summary. Runs in batches (window grows to 1.5x before folding) so the
+    summary isn't rebuilt on every reply.
+    """
+    thread = lead['thread']
+    if THREAD_WINDOW <= 0 or len(thread) <= THREAD_WINDOW + max(1, THREAD_WINDOW // 2):
+        return
+    cut = len(thread) - THREAD_WINDOW
+    lead['thread_summary'] = reply_engine.summarize_messages(thread[:cut], lead.get('thread_summary'))
+    lead['thread'] = thread[cut:]
+
+def _rescore(lead, timestamp, lead_replied):
+    """
+    Re-analyzes the thread and flattens the result into the record.
+    Returns (analysis_result, intent_jump or None).
+    """
     # ── Feature 4: Intent Jump Detection ──
     # Capture previous score before re-analyzing
-    previous_score = LEAD_DB[email]['score']
+    previous_score = lead['score']
     
     # Analyze full thread (runs on even single replies)
-    analysis_result = reply_engine.analyze_thread(LEAD_DB[email]['thread'])
+    _compact_thread(lead)
+    analysis_result = _analyze_lead(lead, lead_replied)
     
     new_score = analysis_result.get('score', 0)
     
     # Flatten analysis into LEAD_DB entry
-    LEAD_DB[email]['score'] = new_score
-    LEAD_DB[email]['state'] = analysis_result.get('state', 'Noise')
-    LEAD_DB[email]['signals'] = analysis_result.get('explanation', [])
-    LEAD_DB[email]['full_explanation'] = analysis_result.get('full_explanation', [])
-    LEAD_DB[email]['cliff_flag'] = analysis_result.get('cliff_flag')
-    LEAD_DB[email]['momentum'] = analysis_result.get('momentum', 'Stable')
-    LEAD_DB[email]['tiebreaker'] = analysis_result.get('tiebreaker', {})
-    LEAD_DB[email]['raw_signals'] = analysis_result.get('signals', {})
-    LEAD_DB[email]['raw_metrics'] = analysis_result.get('metrics', {})
-    LEAD_DB[email]['last_updated'] = timestamp
+    lead['score'] = new_score
+    lead['state'] = analysis_result.get('state', 'Noise')
+    lead['signals'] = analysis_result.get('explanation', [])
+    lead['full_explanation'] = analysis_result.get('full_explanation', [])
+    lead['cliff_flag'] = analysis_result.get('cliff_flag')
+    lead['momentum'] = analysis_result.get('momentum', 'Stable')
+    lead['tiebreaker'] = analysis_result.get('tiebreaker', {})
+    lead['raw_signals'] = analysis_result.get('signals', {})
+    lead['raw_metrics'] = analysis_result.get('metrics', {})
+    lead['last_updated'] = timestamp
     
     # Track score history (only on lead replies)
-    if sender == 'lead':
-        LEAD_DB[email]['score_history'].append(new_score)
+    if lead_replied:
+        lead['score_history'].append(new_score)
     
     # Detect intent jump (delta >= 20)
     score_delta = new_score - previous_score
     intent_jump = None
-    if sender == 'lead' and score_delta >= 20 and previous_score > 0:
+    if lead_replied and score_delta >= 20 and previous_score > 0:
         intent_jump = {
             "from": previous_score,
             "to": new_score,
             "delta": score_delta,
             "timestamp": timestamp
         }
-        LEAD_DB[email]['intent_jump_alert'] = intent_jump
+        lead['intent_jump_alert'] = intent_jump
+    
+    return analysis_result, intent_jump
+
+def _apply_reply(lead, body, timestamp, sender, idempotency_key=None):
+    """
+    Scoring update for one inbound message.
+    Caller must hold the lead's stripe lock (LEAD_DB.transaction).
+    Returns the webhook response payload.
+    """
+    if not _record_message(lead, body, timestamp, sender, idempotency_key):
+        return {"success": True, "status": "ignored_duplicate"}
+    
+    analysis_result, intent_jump = _rescore(lead, timestamp, sender == 'lead')
     
     response = {"success": True, "analysis": analysis_result}
     if intent_jump:
         response["intent_jump_alert"] = intent_jump
     
-    return jsonify(response)
+    return response
+
+def _apply_reply_batch(lead, events):
+    """
+    Bulk variant of _apply_reply: records every event in order, then
+    scores the lead once. `events` is a list of
+    (index, body, timestamp, sender, idempotency_key).
+    Caller must hold the lead's stripe lock.
+    Returns one result dict per event.
+    """
+    accepted = []
+    appended = []
+    statuses = {}
+    for index, body, timestamp, sender, idempotency_key in events:
+        if _record_message(lead, body, timestamp, sender, idempotency_key, appended):
+            appended.append(lead['thread'][-1])
+            accepted.append((index, timestamp, sender))
+            statuses[index] = "scored"
+        else:
+            statuses[index] = "ignored_duplicate"
+    
+    analysis_result, intent_jump = None, None
+    if accepted:
+        last_timestamp = accepted[-1][1]
+        lead_replied = any(sender == 'lead' for _, _, sender in accepted)
+        analysis_result, intent_jump = _rescore(lead, last_timestamp, lead_replied)
+    
+    results = []
+    for index, _, _, _, _ in events:
+        result = {"index": index, "email": lead['email'], "status": statuses[index]}
+        # Duplicates were never applied, so they carry no score
+        if statuses[index] == "scored":
+            result["score"] = analysis_result.get('score', 0)
+            result["state"] = analysis_result.get('state', 'Noise')
+            if intent_jump:
+                result["intent_jump_alert"] = intent_jump
+        results.append(result)
+    return results
+
+def _score_reply(email, body, timestamp, sender, idempotency_key=None):
+    """Ensures the lead exists, then runs the scoring update under its lock."""
+    with LEAD_DB.transaction(email, create=lambda: _new_lead(email, timestamp), op="reply") as lead:
+        return _apply_reply(lead, body, timestamp, sender, idempotency_key)
+
+def _process_queued_reply(email, event):
+    """IngestQueue handler (async mode)."""
+    _score_reply(email, event['body'], event['timestamp'], event['sender'],
+                 event.get('idempotency_key'))
+
+INGEST_QUEUE = IngestQueue(_process_queued_reply, num_workers=INGEST_WORKERS)
+
+# ==========================================
+# METRICS (Prometheus, GET /metrics)
+# ==========================================
+# Route counters / latency come from the request hooks; store size,
+# queue depth and dedup hit rate are read when scraped.
+metrics.REGISTRY.gauge("lead_store_leads", "Leads in LEAD_DB.", lambda: len(LEAD_DB))
+metrics.REGISTRY.gauge("lead_store_version", "LEAD_DB publish counter.", lambda: LEAD_DB.version)
+metrics.REGISTRY.gauge("ingest_queue_depth", "Replies waiting in the async ingest queue.",
+                       INGEST_QUEUE.depth)
+metrics.REGISTRY.gauge("ingest_queue_oldest_age_seconds", "Age of the oldest queued reply.",
+                       INGEST_QUEUE.oldest_age_seconds)
+metrics.REGISTRY.gauge("idempotency_lookups", "Webhook dedup index lookups by result.",
+                       lambda: {("hit",): IDEMPOTENCY.hits, ("miss",): IDEMPOTENCY.misses},
+                       ("result",))
+metrics.REGISTRY.gauge("idempotency_keys", "Entries in the webhook dedup index.",
+                       lambda: len(IDEMPOTENCY))
+metrics.REGISTRY.gauge("idempotency_evicted", "Dedup keys evicted early by the MAX_KEYS cap.",
+                       lambda: IDEMPOTENCY.evicted)
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Route template, not the raw path, to keep label cardinality bounded
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe_request("server", route, request.method, response.status_code,
+                                time.perf_counter() - start)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/slow-replies', methods=['GET'])
+def get_slow_replies():
+    """Most recent replies whose scoring crossed SLOW_REPLY_MS (see slow_capture.py)."""
+    limit = max(0, request.args.get('limit', 20, type=int))
+    return jsonify(
+        enabled=slow_capture.ENABLED,
+        threshold_ms=slow_capture.SLOW_REPLY_MS,
+        captured=slow_capture.LOG.captured,
+        cases=slow_capture.LOG.recent(limit=limit)
+    )
+
+# ==========================================
+# ADMIN: SAMPLING PROFILER (see sampling_profiler.py)
+# ==========================================
+@app.route('/admin/profiler/start', methods=['POST'])
+def start_profiler():
+    """
+    Payload (all optional): { "interval": 0.005, "duration": 60, "include_idle": false }
+    Sampling stops by itself after `duration` seconds (max 300).
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        interval = float(data.get('interval', 0)) or None
+        duration = float(data.get('duration', 60))
+    except (TypeError, ValueError):
+        return jsonify(error="interval and duration must be numbers"), 400
+    if not SAMPLER.start(interval=interval, duration=duration,
+                         include_idle=bool(data.get('include_idle'))):
+        return jsonify(error="Profiler already running"), 409
+    return jsonify(SAMPLER.status())
+
+@app.route('/admin/profiler/stop', methods=['POST'])
+def stop_profiler():
+    SAMPLER.stop()
+    return jsonify(SAMPLER.status())
+
+@app.route('/admin/profiler', methods=['GET'])
+def profiler_status():
+    return jsonify(SAMPLER.status())
+
+@app.route('/admin/profiler/collapsed', methods=['GET'])
+def profiler_collapsed():
+    """Collapsed stacks for flamegraph.pl / speedscope. ?route= filters to one route."""
+    return Response(SAMPLER.collapsed(route=request.args.get('route')), mimetype='text/plain',
+                    headers={"Content-Disposition": "attachment; filename=server.collapsed"})
+
+@app.route('/webhook/reply', methods=['POST'])
+def ingest_reply():
+    """
+    Receives an inbound reply from a lead.
+    Payload: { "email": "...", "body": "...", "timestamp": 1234567890, "sender": "lead" }
+    In async INGEST_MODE the reply is queued and 202 is returned immediately.
+    """
+    global LEAD_DB
+    
+    data = request.json
+    email = data.get('email')
+    body = data.get('body')
+    timestamp = data.get('timestamp', time.time())
+    sender = data.get('sender', 'lead') # 'lead' or 'agent'
+    idempotency_key = request.headers.get('Idempotency-Key')
+    
+    if not email or not body:
+        return jsonify(error="Missing email or body"), 400
+    
+    if INGEST_MODE == "async":
+        # Fast path: drop retries of applied messages now; the worker
+        # re-checks in per-lead order for retries that are still queued
+        if IDEMPOTENCY.seen(email, body, timestamp, sender, idempotency_key):
+            return jsonify(success=True, status="ignored_duplicate")
+        event = {"body": body, "timestamp": timestamp, "sender": sender,
+                 "idempotency_key": idempotency_key}
+        if not INGEST_QUEUE.submit(email, event):
+            return jsonify(error="Ingest queue full, retry later"), 503
+        return jsonify(success=True, status="queued", queue_depth=INGEST_QUEUE.depth()), 202
+        
+    return jsonify(_score_reply(email, body, timestamp, sender, idempotency_key))
+
+@app.route('/webhook/replies', methods=['POST'])
+def ingest_replies_bulk():
+    """
+    Bulk ingestion: the body is NDJSON, one reply event per line
+    (same fields as /webhook/reply). Events are grouped by lead, each
+    lead is scored once per batch, and one NDJSON result per event is
+    streamed back as each lead finishes.
+    """
+    groups = {}
+    errors = []
+    for index, line in enumerate(request.stream):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            errors.append({"index": index, "status": "error", "error": "Invalid JSON"})
+            continue
+        if not isinstance(event, dict) or not event.get('email') or not event.get('body'):
+            errors.append({"index": index, "status": "error", "error": "Missing email or body"})
+            continue
+        groups.setdefault(event['email'], []).append((
+            index,
+            event['body'],
+            event.get('timestamp', time.time()),
+            event.get('sender', 'lead'),
+            event.get('idempotency_key')
+        ))
+    
+    def generate():
+        for error in errors:
+            yield json.dumps(error) + "\n"
+        for email, events in groups.items():
+            with LEAD_DB.transaction(email, create=lambda: _new_lead(email, events[0][2]), op="reply") as lead:
+                results = _apply_reply_batch(lead, events)
+            for result in results:
+                yield json.dumps(result) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/ingest/metrics', methods=['GET'])
+def get_ingest_metrics():
+    """Queue depth and lag for the async ingestion mode."""
+    queue_stats = INGEST_QUEUE.metrics()
+    queue_stats["mode"] = INGEST_MODE
+    return jsonify(queue_stats)
 
 @app.route('/api/lead/<email>/set_outcome', methods=['POST'])
 def set_outcome(email):
@@ -337,10 +861,11 @@ def set_outcome(email):
     data = request.json
     outcome = data.get('outcome')
     
-    if email not in LEAD_DB:
-        return jsonify(error="Lead not found"), 404
+    with LEAD_DB.transaction(email, op="outcome") as lead:
+        if lead is None:
+            return jsonify(error="Lead not found"), 404
+        lead['outcome'] = outcome
     
-    LEAD_DB[email]['outcome'] = outcome
     return jsonify(success=True, email=email, outcome=outcome)
 
 @app.route('/api/lead/<email>/disagree', methods=['POST'])
@@ -354,21 +879,26 @@ def log_disagreement(email):
     data = request.json
     direction = data.get('direction') # 'higher' or 'lower'
     
-    if email not in LEAD_DB:
-        return jsonify(error="Lead not found"), 404
-    
-    if 'disagreements' not in LEAD_DB[email]:
-        LEAD_DB[email]['disagreements'] = []
+    with LEAD_DB.transaction(email, op="disagreement") as lead:
+        if lead is None:
+            return jsonify(error="Lead not found"), 404
         
-    entry = {
-        "direction": direction,
-        "reason": data.get('reason'),
-        "timestamp": time.time(),
-        "score_at_time": LEAD_DB[email]['score']
-    }
-    LEAD_DB[email]['disagreements'].append(entry)
+        if 'disagreements' not in lead:
+            lead['disagreements'] = []
+            
+        entry = {
+            "direction": direction,
+            "reason": data.get('reason'),
+            "timestamp": time.time(),
+            "score_at_time": lead['score']
+        }
+        lead['disagreements'].append(entry)
     
     return jsonify(success=True, email=email, direction=direction, logged=True)
 
+# Samples are attributed to the route whose view function is on the stack
+for _rule in app.url_map.iter_rules():
+    SAMPLER.register_route(app.view_functions[_rule.endpoint], _rule.rule)
+
 if __name__ == '__main__':
     app.run(port=PORT, debug=False)
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# ==========================================
+# SLOW REPLY CAPTURE (Reproducible Outliers)
+# ==========================================
+# When decide_lead / ReplyIntelligence.analyze_thread takes longer than
+# SLOW_REPLY_MS, the input (redacted per SLOW_REPLY_REDACT), its length,
+# stage timings and the rules that decided it are kept in a bounded ring
+# buffer and appended to SLOW_REPLY_LOG. GET /slow-replies (main.py) and
+# GET /api/slow-replies (server.py) list the most recent cases.
+#
+#   SLOW_REPLY_MS=0          off (default); e.g. 50 to capture >= 50 ms
+#   SLOW_REPLY_REDACT=pii    emails / URLs / digits masked (default)
+#                   =none    raw text, for local reproduction
+#                   =full    no text, only length and sha1
+#   SLOW_REPLY_KEEP=200      ring size; the file is compacted to the ring
+#                            once it holds twice that many lines
+#
+# Only the outermost call is timed: analyze_thread inside decide_lead is
+# part of the decide_lead case, not a second one.
+SLOW_REPLY_MS = float(os.environ.get("SLOW_REPLY_MS", "0"))
+SLOW_REPLY_REDACT = os.environ.get("SLOW_REPLY_REDACT", "pii")
+SLOW_REPLY_KEEP = int(os.environ.get("SLOW_REPLY_KEEP", "200"))
+SLOW_REPLY_LOG = os.environ.get("SLOW_REPLY_LOG", "slow_replies.jsonl")
+ENABLED = SLOW_REPLY_MS > 0
+
+_clock = time.perf_counter_ns
+_local = threading.local()
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_URL = re.compile(r"https?://\S+")
+_DIGIT = re.compile(r"\d")
+
+
+def redact(text, mode=None):
+    """Masks emails, URLs and digits; the wording the patterns match is kept."""
+    mode = mode or SLOW_REPLY_REDACT
+    if mode == "none":
+        return text
+    if mode == "full":
+        return None
+    text = _EMAIL.sub("user@example.com", text)
+    text = _URL.sub("https://example.com", text)
+    return _DIGIT.sub("0", text)
+
+
+class SlowReplyLog:
+    """Ring buffer of slow cases, mirrored to a JSON-lines file."""
+
+    def __init__(self, path=SLOW_REPLY_LOG, keep=SLOW_REPLY_KEEP):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ring = deque(maxlen=keep)
+        self._lines = 0
+        self.captured = 0
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        self._ring.append(json.loads(line))
+                    except ValueError:
+                        continue   # torn last line from a crash
+                    self._lines += 1
+
+    def record(self, entry):
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._ring.append(entry)
+            self.captured += 1
+            if not self.path:
+                return
+            if self._lines >= 2 * self._ring.maxlen:
+                # Compact: rewrite only what the ring still holds
+                tmp = self.path + ".tmp"
+                with open(tmp, "w") as f:
+                    for kept in self._ring:
+                        f.write(json.dumps(kept, separators=(",", ":")) + "\n")
+                os.replace(tmp, self.path)
+                self._lines = len(self._ring)
+            else:
+                with open(self.path, "a") as f:
+                    f.write(line + "\n")
+                self._lines += 1
+
+    def recent(self, limit=20):
+        with self._lock:
+            entries = list(self._ring)
+        return entries[-limit:][::-1] if limit else []
+
+    def clear(self):
+        with self._lock:
+            self._ring.clear()
+            self._lines = 0
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+
+LOG = SlowReplyLog()
+
+
+def start(source):
+    """Start time for an outermost call, or None when off / nested."""
+    if not ENABLED or getattr(_local, "source", None):
+        return None
+    _local.source = source
+    return _clock()
+
+
+def capturing(source):
+    """True while `source` is the outermost call being timed on this thread."""
+    return getattr(_local, "source", None) == source
+
+
+def active():
+    """True while any call is being timed on this thread."""
+    return getattr(_local, "source", None) is not None
+
+
+def abandon():
+    _local.source = None
+
+
+def finish(start_ns, text, timings=None, decided_by=None, matched=None, outcome=None, **extra):
+    """
+    Records the call if it crossed the threshold. Returns elapsed ms.
+    `decided_by` is the rule that returned the decision and `matched`
+    maps each pattern list to the patterns that hit.
+    """
+    source = _local.source
+    _local.source = None
+    elapsed_ms = (_clock() - start_ns) / 1e6
+    if elapsed_ms < SLOW_REPLY_MS:
+        return elapsed_ms
+    text = text or ""
+    LOG.record({
+        "timestamp": datetime.now().isoformat(),
+        "source": source,
+        "elapsed_ms": round(elapsed_ms, 3),
+        "threshold_ms": SLOW_REPLY_MS,
+        "length": len(text),
+        "sha1": hashlib.sha1(text.encode("utf-8", "replace")).hexdigest(),
+        "redaction": SLOW_REPLY_REDACT,
+        "text": redact(text),
+        "timings_us": timings or {},
+        "decided_by": decided_by,
+        "matched_rules": matched or {},
+        "outcome": outcome,
+        **extra
+    })
+    return elapsed_ms
+
+
+def enable(threshold_ms):
+    global ENABLED, SLOW_REPLY_MS
+    SLOW_REPLY_MS = threshold_ms
+    ENABLED = threshold_ms > 0
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+# ==========================================
+# STAGE TIMERS (Latency Instrumentation)
+# ==========================================
+# Off by default. When off, start() returns None and every instrumented
+# stage costs one `if sw:` check. When on, each stage is measured with
+# perf_counter_ns and recorded into a per-stage log2 histogram.
+#
+#   STAGE_TIMINGS=1          record histograms
+#   STAGE_TIMINGS=attach     ... and attach {stage: microseconds} to each
+#                            decision as its "timings" field
+_MODE = os.environ.get("STAGE_TIMINGS", "0")
+ENABLED = _MODE in ("1", "attach")
+ATTACH = _MODE == "attach"
+
+NUM_BUCKETS = 48   # bucket i holds durations in [2^(i-1), 2^i) ns; 2^47 ns ~ 39 h
+
+_clock = time.perf_counter_ns
+
+
+class StageHistograms:
+    """Log2 latency histograms keyed by stage name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}   # stage -> [count, total_ns, max_ns, buckets]
+
+    def record(self, stage, ns):
+        bucket = min(NUM_BUCKETS - 1, ns.bit_length())
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = [0, 0, 0, [0] * NUM_BUCKETS]
+            entry[0] += 1
+            entry[1] += ns
+            if ns > entry[2]:
+                entry[2] = ns
+            entry[3][bucket] += 1
+
+    @staticmethod
+    def _quantile(buckets, count, q):
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(buckets):
+            seen += n
+            if seen >= rank and n:
+                return (1 << i) / 1000.0   # bucket upper bound, microseconds
+        return 0.0
+
+    def snapshot(self):
+        """{stage: {count, mean_us, p50_us, p90_us, p99_us, max_us}}"""
+        with self._lock:
+            stages = {k: (v[0], v[1], v[2], list(v[3])) for k, v in self._stages.items()}
+        out = {}
+        for stage, (count, total, peak, buckets) in sorted(stages.items()):
+            out[stage] = {
+                "count": count,
+                "mean_us": round(total / count / 1000.0, 2),
+                "p50_us": self._quantile(buckets, count, 0.5),
+                "p90_us": self._quantile(buckets, count, 0.9),
+                "p99_us": self._quantile(buckets, count, 0.99),
+                "max_us": round(peak / 1000.0, 2)
+            }
+        return out
+
+    def buckets(self):
+        """Raw {stage: (count, total_ns, buckets)} for exporters."""
+        with self._lock:
+            return {k: (v[0], v[1], list(v[3])) for k, v in self._stages.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+HISTOGRAMS = StageHistograms()
+
+
+class Stopwatch:
+    """Times consecutive stages: lap(name) closes the stage started at the previous lap."""
+    __slots__ = ("prefix", "laps", "_last")
+
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self.laps = {}
+        self._last = _clock()
+
+    def lap(self, stage):
+        now = _clock()
+        ns = now - self._last
+        self._last = now
+        name = self.prefix + stage
+        if ENABLED:
+            HISTOGRAMS.record(name, ns)
+        self.laps[name] = self.laps.get(name, 0) + ns
+        return ns
+
+    def skip(self):
+        """Restarts the clock without recording (excludes the time since the last lap)."""
+        self._last = _clock()
+
+    def as_dict(self):
+        return {stage: round(ns / 1000.0, 2) for stage, ns in self.laps.items()}
+
+
+def start(prefix="", force=False):
+    """
+    A Stopwatch when timing is enabled, otherwise None. `force` returns
+    one anyway for callers that only want its laps (slow_capture.py);
+    histograms are still only recorded when enabled.
+    """
+    return Stopwatch(prefix) if ENABLED or force else None
+
+
+def enable(attach=False):
+    global ENABLED, ATTACH
+    ENABLED, ATTACH = True, attach
+
+
+def disable():
+    global ENABLED, ATTACH
+    ENABLED = ATTACH = False
@@ -6,11 +6,10 @@
 =================================================================
 """
 
-import json
 import time
-import urllib.request
 
-BASE = "http://localhost:8081"
+# Live server by default; HARNESS_TRANSPORT=client|direct runs in-process
+from harness_transport import TRANSPORT
 
 # ── Helpers ──
 
@@ -23,21 +22,12 @@ def post_reply(email, body, sender="lead", mins_ago=0):
         "sender": sender,
         "timestamp": time.time() - (mins_ago * 60),
     }
-    req = urllib.request.Request(
-        f"{BASE}/webhook/reply",
-        data=json.dumps(payload).encode(),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req) as res:
-        data = json.loads(res.read())
-        # API returns {success: true, analysis: {score, state, ...}}
-        return data.get("analysis", data)
+    data = TRANSPORT.post_json("/webhook/reply", payload)
+    # API returns {success: true, analysis: {score, state, ...}}
+    return data.get("analysis", data)
 
 def get_dashboard():
-    req = urllib.request.Request(f"{BASE}/api/dashboard")
-    with urllib.request.urlopen(req) as res:
-        return json.loads(res.read())
+    return TRANSPORT.get_json("/api/dashboard")
 
 def divider(stage, title, goal):
     print(f"\n{'='*70}")
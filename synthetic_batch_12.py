@@ -3,9 +3,10 @@
 Pure observation. No weight modifications.
 """
 
-import json, time, urllib.request
+import time
 
-BASE = "http://localhost:8081"
+# Live server by default; HARNESS_TRANSPORT=client|direct runs in-process
+from harness_transport import TRANSPORT
 
 def post_reply(email, body, sender="lead", mins_ago=0):
     payload = {
@@ -14,15 +15,8 @@ def post_reply(email, body, sender="lead", mins_ago=0):
         "sender": sender,
         "timestamp": time.time() - (mins_ago * 60),
     }
-    req = urllib.request.Request(
-        f"{BASE}/webhook/reply",
-        data=json.dumps(payload).encode(),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req) as res:
-        data = json.loads(res.read())
-        return data.get("analysis", data)
+    data = TRANSPORT.post_json("/webhook/reply", payload)
+    return data.get("analysis", data)
 
 def agent_reply(email, body, mins_ago=0):
     post_reply(email, body, sender="agent", mins_ago=mins_ago)
@@ -228,10 +222,12 @@ issues = []
 
 for t in [1, 8, 12]:
     state = results[t].get("final_state", results[t].get("state"))
-    band_counts[state] += 1
+    if state:   # thread 7 only records hot / cold scores
+        band_counts[state] = band_counts.get(state, 0) + 1
 for t in [2, 3, 4, 5, 6, 7, 9, 10, 11]:
     state = results[t].get("final_state", results[t].get("state"))
-    band_counts[state] += 1
+    if state:   # thread 7 only records hot / cold scores
+        band_counts[state] = band_counts.get(state, 0) + 1
 
 total = sum(band_counts.values())
 ready_pct = (band_counts["Ready Now"] / total * 100) if total else 0
@@ -3,9 +3,10 @@ ROUND 2 — 10-THREAD VENDOR EVAL STRESS TEST
 Specifically targets the vendor_eval_bonus for false positives.
 """
 
-import json, time, urllib.request
+import time
 
-BASE = "http://localhost:8081"
+# Live server by default; HARNESS_TRANSPORT=client|direct runs in-process
+from harness_transport import TRANSPORT
 
 def post_reply(email, body, sender="lead", mins_ago=0):
     payload = {
@@ -14,15 +15,8 @@ def post_reply(email, body, sender="lead", mins_ago=0):
         "sender": sender,
         "timestamp": time.time() - (mins_ago * 60),
     }
-    req = urllib.request.Request(
-        f"{BASE}/webhook/reply",
-        data=json.dumps(payload).encode(),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req) as res:
-        data = json.loads(res.read())
-        return data.get("analysis", data)
+    data = TRANSPORT.post_json("/webhook/reply", payload)
+    return data.get("analysis", data)
 
 def divider(num, title, expected):
     print(f"\n{'='*70}")
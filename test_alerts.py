@@ -0,0 +1,60 @@
+import unittest
+import time
+from alert_engine import AlertEngine
+from server import app, LEAD_DB, ALERTS
+
+HIGH_INTENT = ("What is the pricing? Budget is approved and we need to launch this month. "
+               "Can your API integrate with our CRM? How does it compare to your competitor?")
+
+class TestAlertEngine(unittest.TestCase):
+    def test_deadlines_fire_once_and_lazy_delete(self):
+        engine = AlertEngine(sla_seconds=1800, tick_seconds=0)
+        engine.watch("a@example.com", 1000, 80, "Ready Now")
+        engine.watch("b@example.com", 1100, 75, "High Intent")
+        engine.watch("a@example.com", 1200, 82, "Ready Now")   # already waiting
+        engine.resolve("b@example.com")
+
+        self.assertEqual(engine.tick(now=2799), [])
+        fired = engine.tick(now=2900)
+        self.assertEqual([a['email'] for a in fired], ["a@example.com"])
+        self.assertEqual(fired[0]['waiting_min'], 31.7)
+        self.assertEqual(engine.tick(now=9999), [])
+        self.assertEqual(engine.stats()['stale_pops'], 1)
+        self.assertEqual(engine.open_count(), 0)
+
+class TestAlertsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        LEAD_DB.clear()
+
+    def post(self, email, body, ts, sender="lead"):
+        return self.app.post('/webhook/reply', json={
+            "email": email, "body": body, "timestamp": ts, "sender": sender
+        }).get_json()
+
+    def test_sla_breach_and_agent_reply(self):
+        start = time.time() - 3600
+        result = self.post("hot@example.com", HIGH_INTENT, start)
+        self.assertGreaterEqual(result['analysis']['score'], 60)
+        self.post("hot2@example.com", HIGH_INTENT, start)
+        self.post("hot2@example.com", "Sending pricing now.", start + 60, sender="agent")
+        self.post("cold@example.com", "ok", start)
+
+        ALERTS.tick()
+        alerts = self.app.get('/api/alerts').get_json()
+        breaches = [a for a in alerts if a['type'] == 'sla_breach']
+        self.assertEqual([a['email'] for a in breaches], ["hot@example.com"])
+        for key in ("email", "from_score", "to_score", "delta", "state", "time"):
+            self.assertIn(key, breaches[0])
+
+    def test_intent_jump_alert(self):
+        now = time.time()
+        self.post("jump@example.com", "Looks interesting, tell me more.", now - 120)
+        result = self.post("jump@example.com", HIGH_INTENT, now - 60)
+        self.assertIn('intent_jump_alert', result)
+        alerts = self.app.get('/api/alerts').get_json()
+        self.assertEqual(alerts[0]['type'], "intent_jump")
+        self.assertEqual(alerts[0]['to_score'], result['analysis']['score'])
+
+if __name__ == '__main__':
+    unittest.main()
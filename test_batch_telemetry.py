@@ -0,0 +1,65 @@
+import unittest
+import os
+import json
+import tempfile
+import tracemalloc
+from batch_telemetry import BatchRun, BatchTelemetry, PHASES
+
+class TestBatchTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "batch.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_entry_has_phases_and_throughput(self):
+        run = BatchRun(trace_memory=True)
+        for phase in PHASES:
+            run.lap(phase)
+        entry = run.finish(10, 2048, avg_score=42.0)
+        self.assertEqual(set(entry['phases_ms']), set(PHASES))
+        self.assertEqual(entry['rows'], 10)
+        self.assertEqual(entry['input_bytes'], 2048)
+        self.assertGreater(entry['rows_per_sec'], 0)
+        self.assertIn('traced_peak_mb', entry)
+        self.assertEqual(entry['avg_score'], 42.0)
+
+    def test_peak_is_per_run_and_tracing_stops(self):
+        tracemalloc.start()
+        try:
+            ballast = bytearray(8 * 1024 * 1024)
+            del ballast
+            run = BatchRun(trace_memory=True)
+            entry = run.finish(1, 1)
+            self.assertLess(entry['traced_peak_mb'], 8)
+            self.assertTrue(tracemalloc.is_tracing())   # not ours to stop
+        finally:
+            tracemalloc.stop()
+
+        run = BatchRun(trace_memory=True)
+        run.close()   # scoring raised before finish()
+        self.assertFalse(tracemalloc.is_tracing())
+        run.close()
+
+    def test_json_lines_survive_restart(self):
+        telemetry = BatchTelemetry(self.path)
+        for rows in (10, 20, 30):
+            run = BatchRun(trace_memory=False)
+            run.lap("score")
+            telemetry.record(run.finish(rows, rows * 100))
+        with open(self.path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([e['rows'] for e in lines], [10, 20, 30])
+
+        with open(self.path, "a") as f:
+            f.write('{"rows": 4')   # torn write
+        reloaded = BatchTelemetry(self.path)
+        self.assertEqual([e['rows'] for e in reloaded.recent(limit=2)], [30, 20])
+        summary = reloaded.summary()
+        self.assertEqual(summary['batches'], 3)
+        self.assertEqual(summary['rows'], 60)
+        self.assertLessEqual(summary['rows_per_sec']['min'], summary['rows_per_sec']['max'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import json
+import time
+from unittest import mock
+import server
+from server import app, LEAD_DB
+
+class TestBulkWebhook(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        LEAD_DB.clear()
+
+    def post_ndjson(self, events, raw_lines=()):
+        body = "\n".join([json.dumps(e) for e in events] + list(raw_lines)) + "\n"
+        res = self.app.post('/webhook/replies', data=body, content_type='application/x-ndjson')
+        self.assertEqual(res.status_code, 200)
+        return [json.loads(line) for line in res.data.decode().splitlines() if line]
+
+    def test_scores_each_lead_once(self):
+        now = time.time()
+        events = [
+            {"email": "a@example.com", "body": "What is the pricing?", "timestamp": now, "sender": "lead"},
+            {"email": "b@example.com", "body": "Looks interesting.", "timestamp": now, "sender": "lead"},
+            {"email": "a@example.com", "body": "Our team needs the API this month.", "timestamp": now + 60, "sender": "lead"},
+            {"email": "a@example.com", "body": "What is the pricing?", "timestamp": now + 1, "sender": "lead"},
+        ]
+        with mock.patch.object(server.reply_engine, 'analyze_thread',
+                               wraps=server.reply_engine.analyze_thread) as analyze:
+            results = self.post_ndjson(events, raw_lines=["{not json"])
+        self.assertEqual(analyze.call_count, 2)
+
+        by_index = {r['index']: r for r in results}
+        self.assertEqual(by_index[4]['status'], "error")
+        self.assertEqual(by_index[3]['status'], "ignored_duplicate")
+        self.assertNotIn('score', by_index[3])
+        self.assertNotIn('state', by_index[3])
+        self.assertEqual(by_index[0]['status'], "scored")
+        self.assertEqual(by_index[0]['score'], LEAD_DB["a@example.com"]['score'])
+
+        lead = LEAD_DB["a@example.com"]
+        self.assertEqual(len(lead['thread']), 2)
+        self.assertEqual(len(lead['score_history']), 1)
+
+    def test_matches_single_webhook_thread(self):
+        now = time.time()
+        events = [
+            {"email": "c@example.com", "body": "Budget approved, need pricing.", "timestamp": now - 600, "sender": "lead"},
+            {"email": "c@example.com", "body": "Here you go.", "timestamp": now - 300, "sender": "agent"},
+        ]
+        self.post_ndjson(events)
+        lead = LEAD_DB["c@example.com"]
+        self.assertEqual([m['sender'] for m in lead['thread']], ["lead", "agent"])
+        self.assertEqual(lead['avg_response_time_min'], 5.0)
+
+if __name__ == '__main__':
+    unittest.main()
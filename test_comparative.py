@@ -0,0 +1,67 @@
+import unittest
+import time
+from unittest import mock
+import server
+from server import app, LEAD_DB
+from reply_intelligence import ReplyIntelligence
+
+HOT = [
+    "What is the pricing? Budget is approved and we need to launch this month.",
+    "Can your API integrate with our CRM? How does it compare to your competitor?",
+]
+WARM = [
+    "We are struggling with manual work. What is the cost?",
+    "Can we get a demo with our team this week?",
+]
+
+class TestCompareLeads(unittest.TestCase):
+    def test_adjacent_pairs_in_rank_order(self):
+        engine = ReplyIntelligence()
+        now = time.time()
+        leads = []
+        for i, bodies in enumerate([WARM, HOT, WARM[:1]]):
+            analysis = engine.analyze_thread([
+                {"body": b, "timestamp": now + n, "sender": "lead"} for n, b in enumerate(bodies)
+            ])
+            leads.append({"email": f"l{i}@example.com", "score": analysis['score'],
+                          "signals": analysis['signals'], "metrics": analysis['metrics']})
+
+        comparisons = engine.compare_leads(leads)
+        self.assertEqual(len(comparisons), 2)
+        self.assertEqual(comparisons[0]['higher'], "l1@example.com")
+        self.assertEqual(comparisons[0]['lower'], comparisons[1]['higher'])
+        for c in comparisons:
+            self.assertTrue(c['reason'].startswith(c['higher']))
+        self.assertEqual(engine.compare_leads(leads[:1]), [])
+
+class TestDashboardComparative(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        LEAD_DB.clear()
+
+    def test_cached_per_store_version(self):
+        now = time.time()
+        for email, bodies in (("hot@example.com", HOT), ("warm@example.com", WARM)):
+            for n, body in enumerate(bodies):
+                self.app.post('/webhook/reply', json={
+                    "email": email, "body": body, "timestamp": now + n, "sender": "lead"
+                })
+
+        with mock.patch.object(server.reply_engine, 'compare_leads',
+                               wraps=server.reply_engine.compare_leads) as compare:
+            first = self.app.get('/api/dashboard').get_json()
+            second = self.app.get('/api/dashboard').get_json()
+            self.assertEqual(len(first['sections']['ready_now']), 2)
+            self.assertEqual(compare.call_count, 1)
+            self.assertEqual(first['comparative'], second['comparative'])
+            self.assertIn("hot@example.com", first['comparative'][0]['reason'])
+
+            self.app.post('/webhook/reply', json={
+                "email": "warm@example.com", "body": "Who else should join the call?",
+                "timestamp": now + 10, "sender": "lead"
+            })
+            self.app.get('/api/dashboard')
+            self.assertEqual(compare.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 import json
 import time
+from unittest import mock
+import server
 from server import app, LEAD_DB
 
 class TestDashboardIntegration(unittest.TestCase):
@@ -107,6 +109,29 @@ class TestDashboardIntegration(unittest.TestCase):
             print(f"\nComparative: {reason}")
             self.assertIn("leadA@example.com", reason)
 
+    def test_comparative_cache_keyed_on_snapshot_version(self):
+        now = time.time()
+        for email in ("a@example.com", "b@example.com"):
+            self.app.post('/webhook/reply', json={
+                "email": email, "body": "Budget approved. What is pricing?",
+                "timestamp": now, "sender": "lead"})
+        ready_now = [{"email": "a@example.com", "score": 90}, {"email": "b@example.com", "score": 85}]
+        version, snapshot = LEAD_DB.snapshot_with_version()
+        # A webhook lands while the dashboard is still scanning `snapshot`
+        self.app.post('/webhook/reply', json={
+            "email": "a@example.com", "body": "Can your API integrate with our CRM?",
+            "timestamp": now + 60, "sender": "lead"})
+
+        with mock.patch.object(server.reply_engine, 'compare_leads',
+                               wraps=server.reply_engine.compare_leads) as compare:
+            server._comparative(ready_now, snapshot, version)
+            fresh_version, fresh = LEAD_DB.snapshot_with_version()
+            self.assertGreater(fresh_version, version)
+            server._comparative(ready_now, fresh, fresh_version)
+            server._comparative(ready_now, fresh, fresh_version)
+        # The stale result was filed under the old version, not served for the new one
+        self.assertEqual(compare.call_count, 2)
+
     def test_shallow_penalty_applied(self):
         """'Sounds good' in 1 min should get penalized."""
         now = time.time()
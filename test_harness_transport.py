@@ -0,0 +1,35 @@
+import unittest
+from harness_transport import get_transport
+from server import LEAD_DB
+
+REPLIES = [
+    ("lead", "What is the pricing? We are comparing vendors.", 1000),
+    ("agent", "Happy to help, here are the details.", 1600),
+    ("lead", "Budget approved, can we get a demo with our team this week?", 5000),
+]
+
+class TestHarnessTransport(unittest.TestCase):
+    def setUp(self):
+        LEAD_DB.clear()
+
+    def replay(self, transport, email):
+        last = None
+        for sender, body, ts in REPLIES:
+            last = transport.post_json("/webhook/reply", {
+                "email": email, "body": body, "sender": sender, "timestamp": ts})
+        return last['analysis']
+
+    def test_client_and_direct_agree(self):
+        via_client = self.replay(get_transport("client"), "client@example.com")
+        via_direct = self.replay(get_transport("direct"), "direct@example.com")
+        for key in ("score", "state", "momentum", "score_breakdown"):
+            self.assertEqual(via_client[key], via_direct[key])
+        dashboard = get_transport("direct").get_json("/api/dashboard")
+        self.assertIn("stats", dashboard)
+
+    def test_unknown_transport(self):
+        with self.assertRaises(ValueError):
+            get_transport("carrier-pigeon")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import json
+import time
+from unittest import mock
+import server
+from idempotency import IdempotencyIndex
+from server import app, LEAD_DB
+
+def apply(index, threads, email, body, timestamp, sender, provider_key=None):
+    """
+    The webhook path: check(), and if it isn't a retry, publish the
+    message so on_publish indexes it. Returns True for a retry.
+    """
+    if index.check(email, body, timestamp, sender, provider_key):
+        return True
+    old = threads.get(email)
+    msg = {"body": body, "timestamp": timestamp, "sender": sender}
+    if provider_key:
+        msg["idempotency_key"] = provider_key
+    threads[email] = (old or []) + [msg]
+    index.on_publish(email, {"thread": old} if old is not None else None, {"thread": threads[email]})
+    return False
+
+class TestIdempotencyIndex(unittest.TestCase):
+    def test_window_and_buckets(self):
+        index, threads = IdempotencyIndex(window=300), {}
+        self.assertFalse(apply(index, threads, "a@x.com", "hello", 1000, "lead"))
+        self.assertTrue(apply(index, threads, "a@x.com", "hello", 1299, "lead"))
+        self.assertFalse(apply(index, threads, "a@x.com", "hello", 1300, "lead"))
+        self.assertFalse(apply(index, threads, "a@x.com", "hello", 1000, "agent"))
+        self.assertFalse(apply(index, threads, "b@x.com", "hello", 1000, "lead"))
+
+    def test_provider_key(self):
+        index, threads = IdempotencyIndex(), {}
+        self.assertFalse(apply(index, threads, "a@x.com", "v1", 1000, "lead", provider_key="evt-1"))
+        # Provider re-sent the same event with a different timestamp
+        self.assertTrue(apply(index, threads, "a@x.com", "v1", 90000, "lead", provider_key="evt-1"))
+
+    def test_check_records_nothing(self):
+        index = IdempotencyIndex()
+        self.assertFalse(index.check("a@x.com", "hello", 1000, "lead"))
+        self.assertFalse(index.check("a@x.com", "hello", 1000, "lead"))
+        self.assertEqual(len(index), 0)
+        pending = [{"body": "hello", "timestamp": 1000, "sender": "lead"}]
+        self.assertTrue(index.check("a@x.com", "hello", 1100, "lead", pending=pending))
+
+    def test_on_publish_indexes_only_appended_messages(self):
+        index, threads = IdempotencyIndex(), {}
+        apply(index, threads, "a@x.com", "one", 1000, "lead")
+        apply(index, threads, "a@x.com", "two", 2000, "lead")
+        self.assertEqual(len(index), 2)
+        # A publish that appends nothing (outcome, decay) adds no keys
+        index.on_publish("a@x.com", {"thread": threads["a@x.com"]}, {"thread": list(threads["a@x.com"])})
+        self.assertEqual(len(index), 2)
+
+    def test_bounded_memory(self):
+        index, threads = IdempotencyIndex(max_keys=100), {}
+        for i in range(1000):
+            apply(index, threads, "a@x.com", f"msg {i}", i * 1000, "lead")
+        self.assertEqual(len(index), 100)
+        self.assertEqual(index.evicted, 900)
+
+    def test_ttl_expiry(self):
+        index, threads = IdempotencyIndex(ttl=0), {}
+        apply(index, threads, "a@x.com", "hello", 1000, "lead")
+        time.sleep(0.01)
+        self.assertFalse(index.seen("a@x.com", "hello", 1000, "lead"))
+
+    def test_rebuild_from_store(self):
+        index = IdempotencyIndex()
+        now = time.time()
+        records = {"a@x.com": {"thread": [
+            {"body": "old", "timestamp": 10, "sender": "lead"},
+            {"body": "recent", "timestamp": now - 60, "sender": "lead", "idempotency_key": "evt-9"},
+        ]}}
+        index.rebuild(records.items())
+        # Outside the TTL a live index would have expired it too
+        self.assertFalse(index.seen("a@x.com", "old", 10, "lead"))
+        self.assertTrue(index.seen("a@x.com", "recent", now - 60, "lead"))
+        self.assertTrue(index.seen("a@x.com", "other", 0, "lead", provider_key="evt-9"))
+
+    def test_rebuild_keeps_newest_within_max_keys(self):
+        index = IdempotencyIndex(max_keys=50)
+        now = time.time()
+        # 100 leads x 2 recent messages, listed in no particular time order
+        records = {f"lead{i}@x.com": {"thread": [
+            {"body": "first", "timestamp": now - 3000 + i, "sender": "lead"},
+            {"body": "second", "timestamp": now - 1000 + i, "sender": "lead"},
+        ]} for i in reversed(range(100))}
+        index.rebuild(records.items())
+        self.assertEqual(len(index), 50)
+        self.assertEqual(index.evicted, 150)
+        # The newest 50 messages survive: retries of those are still caught
+        for i in range(50, 100):
+            self.assertTrue(index.seen(f"lead{i}@x.com", "second", now - 1000 + i, "lead"))
+        self.assertFalse(index.seen("lead49@x.com", "second", now - 1000 + 49, "lead"))
+
+    def test_retry_after_many_newer_messages(self):
+        LEAD_DB.clear()
+        client = app.test_client()
+        now = time.time()
+        client.post('/webhook/reply', json={
+            "email": "retry@example.com", "body": "What's the price?", "timestamp": now, "sender": "lead"})
+        for i in range(6):
+            client.post('/webhook/reply', json={
+                "email": "retry@example.com", "body": f"Follow-up {i}", "timestamp": now + i, "sender": "lead"})
+        res = client.post('/webhook/reply', json={
+            "email": "retry@example.com", "body": "What's the price?", "timestamp": now + 2, "sender": "lead"})
+        self.assertEqual(json.loads(res.data)['status'], "ignored_duplicate")
+        self.assertEqual(len(LEAD_DB["retry@example.com"]['thread']), 7)
+
+    def test_retry_accepted_after_failed_scoring(self):
+        LEAD_DB.clear()
+        client = app.test_client()
+        payload = {"email": "flaky@example.com", "body": "Can we see pricing?",
+                   "timestamp": time.time(), "sender": "lead"}
+        with mock.patch.object(server, '_rescore', side_effect=RuntimeError("scoring failed")):
+            res = client.post('/webhook/reply', json=payload)
+        self.assertEqual(res.status_code, 500)
+        self.assertNotIn("flaky@example.com", LEAD_DB)
+
+        res = client.post('/webhook/reply', json=payload)
+        self.assertNotEqual(json.loads(res.data).get('status'), "ignored_duplicate")
+        self.assertEqual(len(LEAD_DB["flaky@example.com"]['thread']), 1)
+        res = client.post('/webhook/reply', json=payload)
+        self.assertEqual(json.loads(res.data)['status'], "ignored_duplicate")
+
+if __name__ == '__main__':
+    unittest.main()
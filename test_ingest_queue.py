@@ -0,0 +1,65 @@
+import unittest
+import json
+import threading
+import time
+import server
+from ingest_queue import IngestQueue
+from server import app, LEAD_DB
+
+class TestIngestQueue(unittest.TestCase):
+    def test_per_lead_ordering(self):
+        seen = {}
+        lock = threading.Lock()
+
+        def handler(email, event):
+            time.sleep(0.0005)
+            with lock:
+                seen.setdefault(email, []).append(event)
+
+        q = IngestQueue(handler, num_workers=4)
+        for i in range(200):
+            q.submit(f"lead{i % 10}@example.com", i)
+        q.join()
+
+        self.assertEqual(sum(len(v) for v in seen.values()), 200)
+        for events in seen.values():
+            self.assertEqual(events, sorted(events))
+        self.assertEqual(q.metrics()['processed'], 200)
+        self.assertEqual(q.metrics()['depth'], 0)
+
+    def test_full_queue_rejects(self):
+        q = IngestQueue(lambda email, event: None, num_workers=1, max_depth=0)
+        self.assertFalse(q.submit("a@example.com", {}))
+
+    def test_async_webhook_returns_202(self):
+        LEAD_DB.clear()
+        client = app.test_client()
+        server.INGEST_MODE = "async"
+        try:
+            now = time.time()
+            for i in range(5):
+                res = client.post('/webhook/reply', json={
+                    "email": "async@example.com", "body": f"What about pricing, take {i}?",
+                    "timestamp": now + i, "sender": "lead"
+                })
+                self.assertEqual(res.status_code, 202)
+            server.INGEST_QUEUE.join()
+
+            # A retry of an applied message is dropped before queueing
+            res = client.post('/webhook/reply', json={
+                "email": "async@example.com", "body": "What about pricing, take 4?",
+                "timestamp": now + 4, "sender": "lead"
+            })
+            self.assertEqual(json.loads(res.data)['status'], "ignored_duplicate")
+        finally:
+            server.INGEST_MODE = "sync"
+
+        lead = LEAD_DB["async@example.com"]
+        self.assertEqual([m['body'] for m in lead['thread']],
+                         [f"What about pricing, take {i}?" for i in range(5)])
+        metrics = json.loads(client.get('/api/ingest/metrics').data)
+        self.assertEqual(metrics['depth'], 0)
+        self.assertGreaterEqual(metrics['processed'], 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import random
+import time
+import server
+from server import app, LEAD_DB, LEAD_COUNTERS
+from lead_counters import LeadCounters
+
+BODIES = [
+    "What is the pricing? We need to launch this month and compare vendors.",
+    "Budget approved. Can your API integrate with our CRM? Who else uses it?",
+    "Looks interesting, keep me posted.",
+    "ok",
+    "Not interested, please remove me.",
+]
+
+def full_scan():
+    """The dashboard aggregates computed the old way, by scanning every lead."""
+    counters = LeadCounters(server._band_of)
+    counters.rebuild(LEAD_DB.items())
+    return counters.snapshot()
+
+class TestLeadCounters(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        LEAD_DB.clear()
+
+    def test_counters_match_full_scan(self):
+        rng = random.Random(3)
+        now = time.time() - 3600
+        for i in range(200):
+            email = f"lead{rng.randrange(25)}@example.com"
+            sender = "agent" if rng.random() < 0.3 else "lead"
+            self.app.post('/webhook/reply', json={
+                "email": email, "body": rng.choice(BODIES) + f" #{i}",
+                "timestamp": now + i * 30, "sender": sender
+            })
+        self.app.post('/api/lead/lead1@example.com/set_outcome', json={"outcome": "meeting"})
+
+        self.assertEqual(LEAD_COUNTERS.snapshot(), full_scan())
+        stats = self.app.get('/api/stats').get_json()
+        self.assertEqual(stats['total_leads'], len(LEAD_DB))
+        self.assertEqual(stats['stats']['total_analyzed'],
+                         sum(len([m for m in d['thread'] if m['sender'] == 'lead']) for d in LEAD_DB.values()))
+        self.assertIn('response_time_min', stats['sla'])
+
+    def test_delete_and_clear(self):
+        self.app.post('/webhook/reply', json={"email": "x@example.com", "body": "What is the pricing?"})
+        self.assertEqual(LEAD_COUNTERS.snapshot()['total_leads'], 1)
+        del LEAD_DB["x@example.com"]
+        self.assertEqual(LEAD_COUNTERS.snapshot(), full_scan())
+        self.app.post('/webhook/reply', json={"email": "y@example.com", "body": "ok"})
+        LEAD_DB.clear()
+        self.assertEqual(LEAD_COUNTERS.snapshot()['total_leads'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import os
+import glob
+import shutil
+import tempfile
+import threading
+from unittest import mock
+from lead_store import LeadStore
+from lead_journal import LeadJournal
+
+class TestLeadJournal(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def open_store(self, **kwargs):
+        return LeadStore(journal=LeadJournal(self.dir, **kwargs))
+
+    def write_some(self, store):
+        for i in range(3):
+            with store.transaction("a@example.com", create=lambda: {"thread": [], "score": 0}, op="reply") as lead:
+                lead['thread'].append({"body": f"msg {i}", "timestamp": i, "sender": "lead"})
+                lead['score'] = 10 * (i + 1)
+        with store.transaction("a@example.com", op="outcome") as lead:
+            lead['outcome'] = "meeting"
+        store["b@example.com"] = {"thread": [], "score": 5}
+        del store["b@example.com"]
+        store["c@example.com"] = {"thread": [], "score": 7}
+
+    def test_restart_replays_log(self):
+        store = self.open_store()
+        self.write_some(store)
+        expected = dict(store.items())
+        store._journal.close()
+
+        restarted = self.open_store()
+        self.assertEqual(dict(restarted.items()), expected)
+        self.assertEqual(len(restarted["a@example.com"]['thread']), 3)
+        self.assertNotIn("b@example.com", restarted)
+
+    def test_snapshot_plus_tail(self):
+        store = self.open_store()
+        self.write_some(store)
+        store.compact()
+        with store.transaction("c@example.com", op="reply") as lead:
+            lead['score'] = 70
+        expected = dict(store.items())
+        store._journal.close()
+
+        self.assertTrue(os.path.exists(os.path.join(self.dir, "snapshot.jsonl")))
+        self.assertEqual(len(glob.glob(os.path.join(self.dir, "wal-*.log"))), 1)
+        restarted = self.open_store()
+        self.assertEqual(dict(restarted.items()), expected)
+
+    def test_same_length_list_replacement_survives_restart(self):
+        store = self.open_store()
+        store["a@example.com"] = {"signals": ["Mentioned pricing", "Asked integration", "Timeline"]}
+        with store.transaction("a@example.com") as lead:
+            lead['signals'] = ["Mentioned pricing", "Competitor", "Timeline"]
+        store._journal.close()
+
+        restarted = self.open_store()
+        self.assertEqual(restarted["a@example.com"]['signals'],
+                         ["Mentioned pricing", "Competitor", "Timeline"])
+        restarted._journal.close()
+
+    def test_failed_append_publishes_nothing(self):
+        store = self.open_store()
+        self.write_some(store)
+        version, seq = store.version, store._journal.seq
+        notified = []
+        store.subscribe(lambda *args: notified.append(args))
+
+        def failing_write(payload):
+            raise OSError("disk full")
+        store._journal.write = failing_write
+        with self.assertRaises(OSError):
+            with store.transaction("c@example.com", op="reply") as lead:
+                lead['score'] = 99
+
+        self.assertEqual(store["c@example.com"]['score'], 7)
+        self.assertEqual((store.version, store._journal.seq), (version, seq))
+        self.assertEqual(notified, [])
+        store._journal.close()
+
+    def test_compact_async_starts_one_thread(self):
+        store = self.open_store()
+        self.write_some(store)
+        journal = store._journal
+        release = threading.Event()
+        write_snapshot = journal._write_snapshot
+
+        def slow_write(records, seq):
+            release.wait(5)
+            write_snapshot(records, seq)
+        journal._write_snapshot = slow_write
+
+        with mock.patch('lead_journal.threading.Thread', wraps=threading.Thread) as spawn:
+            for _ in range(20):
+                journal.compact_async(store.snapshot)
+            self.assertEqual(spawn.call_count, 1)
+            release.set()
+        for _ in range(500):
+            if not journal._compacting:
+                break
+            threading.Event().wait(0.01)
+        self.assertFalse(journal._compacting)
+        self.assertTrue(os.path.exists(os.path.join(self.dir, "snapshot.jsonl")))
+        journal.close()
+
+    def test_torn_tail_is_dropped(self):
+        store = self.open_store()
+        self.write_some(store)
+        store._journal.close()
+        segment = sorted(glob.glob(os.path.join(self.dir, "wal-*.log")))[-1]
+        with open(segment, "a") as f:
+            f.write('{"seq":999,"op":"upd')
+
+        restarted = self.open_store()
+        restarted["d@example.com"] = {"score": 1}
+        restarted._journal.close()
+        again = self.open_store()
+        self.assertIn("d@example.com", again)
+        self.assertEqual(again["c@example.com"]['score'], 7)
+
+if __name__ == '__main__':
+    unittest.main()
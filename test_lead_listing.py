@@ -0,0 +1,64 @@
+import unittest
+import json
+import time
+import server
+from server import app, LEAD_DB
+
+class TestLeadListing(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        LEAD_DB.clear()
+        now = time.time()
+        for i, body in enumerate(["ok", "nah", "lol", "k", "nope"]):
+            self.app.post('/webhook/reply', json={
+                "email": f"noise{i}@example.com", "body": body,
+                "timestamp": now, "sender": "lead"
+            })
+
+    def test_pagination_walks_every_lead_once(self):
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/leads/noise?limit=2'
+            if cursor:
+                url += f'&cursor={cursor}'
+            data = json.loads(self.app.get(url).data)
+            self.assertLessEqual(len(data['items']), 2)
+            self.assertEqual(data['total'], 5)
+            seen.extend(item['email'] for item in data['items'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), sorted(LEAD_DB.keys()))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_listing_is_lean(self):
+        data = json.loads(self.app.get('/api/leads/noise').data)
+        item = data['items'][0]
+        self.assertEqual(set(item), {"email", "score", "state", "momentum", "last_reply"})
+
+    def test_lead_detail(self):
+        res = self.app.get('/api/lead/noise0@example.com')
+        self.assertEqual(res.status_code, 200)
+        data = json.loads(res.data)
+        self.assertIn('full_explanation', data)
+        self.assertIn('score_history', data)
+        self.assertEqual(self.app.get('/api/lead/missing@example.com').status_code, 404)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.app.get('/api/leads/unknown').status_code, 404)
+        self.assertEqual(self.app.get('/api/leads/noise?cursor=!!!').status_code, 400)
+        self.assertEqual(self.app.get('/api/leads/noise?limit=abc').status_code, 400)
+
+    def test_cursor_from_other_band_rejected(self):
+        LEAD_DB["x@example.com"] = {"email": "x@example.com", "thread": [], "score": 5, "state": "Noise"}
+        ready_now_cursor = server._encode_cursor([-2, -1, 0, 12.5, "a@example.com"])
+        for cursor in (ready_now_cursor, server._encode_cursor(["a@example.com", 5]),
+                       server._encode_cursor([True, "a@example.com"])):
+            res = self.app.get(f'/api/leads/noise?cursor={cursor}')
+            self.assertEqual(res.status_code, 400)
+        res = self.app.get(f"/api/leads/noise?cursor={server._encode_cursor([1, 'a@example.com'])}")
+        self.assertEqual(res.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
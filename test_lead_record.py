@@ -0,0 +1,82 @@
+import unittest
+import json
+import shutil
+import tempfile
+from array import array
+from lead_record import LeadRecord, Message, to_json
+from lead_store import LeadStore
+from lead_journal import LeadJournal
+
+class TestLeadRecord(unittest.TestCase):
+    def make_record(self):
+        record = LeadRecord("a@example.com", 100)
+        record['thread'].append(Message("What is the pricing?", 100, "lead"))
+        record['thread'].append(Message("Here you go", 160, "agent", "k-1"))
+        record['score_history'].append(42)
+        record['response_count'] = 1
+        record['response_mean_sec'] = 60.0
+        record['momentum'] = "Stable"
+        return record
+
+    def test_dict_interface(self):
+        record = self.make_record()
+        self.assertEqual(record['email'], "a@example.com")
+        self.assertEqual(record['thread'][0]['body'], "What is the pricing?")
+        self.assertEqual(record['thread'][0].get('idempotency_key'), None)
+        self.assertEqual(record['profile'], {"name": "Unknown", "email": "a@example.com"})
+        self.assertIn('momentum', record)
+        self.assertNotIn('thread_summary', record)
+        self.assertEqual(record.get('thread_summary', {}), {})
+        with self.assertRaises(KeyError):
+            record['thread_summary']
+        record['custom'] = 1
+        self.assertEqual(record.pop('custom'), 1)
+        self.assertNotIn('custom', record)
+
+    def test_compact_fields(self):
+        record = self.make_record()
+        self.assertIsInstance(record['score_history'], array)
+        self.assertIsNone(record.profile)
+        self.assertFalse(hasattr(record, '__dict__'))
+        record['profile'] = {"name": "Ana", "email": "a@example.com"}
+        self.assertEqual(record['profile']['name'], "Ana")
+
+    def test_copy_is_independent(self):
+        record = self.make_record()
+        clone = record.copy()
+        clone['thread'].append(Message("Thanks", 200, "lead"))
+        clone['score_history'].append(80)
+        self.assertEqual(len(record['thread']), 2)
+        self.assertEqual(list(record['score_history']), [42])
+        self.assertIs(clone['thread'][0], record['thread'][0])
+
+    def test_json_round_trip(self):
+        record = self.make_record()
+        data = json.loads(json.dumps(record, default=to_json))
+        self.assertEqual(data['score_history'], [42])
+        self.assertEqual(data['thread'][1]['idempotency_key'], "k-1")
+        self.assertNotIn('idempotency_key', data['thread'][0])
+        self.assertEqual(LeadRecord.from_dict(data), record)
+
+    def test_journal_restart(self):
+        data_dir = tempfile.mkdtemp()
+        try:
+            store = LeadStore(journal=LeadJournal(data_dir), record_factory=LeadRecord.from_dict)
+            store["a@example.com"] = self.make_record()
+            with store.transaction("a@example.com", op="reply") as lead:
+                lead['thread'].append(Message("Can we book a call?", 300, "lead"))
+                lead['score_history'].append(77)
+            expected = store["a@example.com"].to_dict()
+            store._journal.close()
+
+            restarted = LeadStore(journal=LeadJournal(data_dir), record_factory=LeadRecord.from_dict)
+            lead = restarted["a@example.com"]
+            self.assertIsInstance(lead, LeadRecord)
+            self.assertIsInstance(lead['thread'][0], Message)
+            self.assertEqual(lead.to_dict(), expected)
+            restarted._journal.close()
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
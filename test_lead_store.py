@@ -0,0 +1,110 @@
+import unittest
+import threading
+import time
+from lead_store import LeadStore
+from server import app, LEAD_DB
+
+class TestLeadStore(unittest.TestCase):
+    def test_no_lost_updates_under_contention(self):
+        store = LeadStore(num_stripes=8)
+        keys = [f"lead{i}@example.com" for i in range(4)]
+        per_thread = 2000
+
+        def bump(record):
+            # Deliberately non-atomic read-modify-write
+            current = record['count']
+            time.sleep(0)
+            record['count'] = current + 1
+            record['history'].append(current + 1)
+
+        def worker():
+            for i in range(per_thread):
+                store.update(keys[i % len(keys)], bump,
+                             create=lambda: {"count": 0, "history": []})
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        total = sum(store[k]['count'] for k in keys)
+        self.assertEqual(total, 8 * per_thread)
+        for k in keys:
+            self.assertEqual(store[k]['history'], list(range(1, store[k]['count'] + 1)))
+
+    def test_missing_lead_without_factory(self):
+        store = LeadStore()
+        with store.transaction("nobody@example.com") as record:
+            self.assertIsNone(record)
+        self.assertNotIn("nobody@example.com", store)
+
+    def test_snapshot_is_point_in_time(self):
+        store = LeadStore()
+        store["a@example.com"] = {"score": 10, "thread": []}
+        snap = store.snapshot()
+        with store.transaction("a@example.com") as record:
+            record['score'] = 90
+            record['thread'].append({"body": "hi"})
+        store["b@example.com"] = {"score": 5, "thread": []}
+
+        self.assertEqual(snap["a@example.com"]['score'], 10)
+        self.assertEqual(snap["a@example.com"]['thread'], [])
+        self.assertNotIn("b@example.com", snap)
+        self.assertEqual(store["a@example.com"]['score'], 90)
+        self.assertEqual(len(store.snapshot()), 2)
+
+    def test_snapshot_shares_unchanged_shards(self):
+        store = LeadStore(num_stripes=4, num_shards=16)
+        for i in range(100):
+            store[f"lead{i}@example.com"] = {"score": i}
+        before = store.snapshot()
+        self.assertIs(store.snapshot(), before)
+        store["lead7@example.com"] = {"score": 70}
+        after = store.snapshot()
+
+        changed = [a is not b for a, b in zip(before._shards, after._shards)]
+        self.assertEqual(sum(changed), 1)
+        self.assertEqual(before["lead7@example.com"]['score'], 7)
+        self.assertEqual(after["lead7@example.com"]['score'], 70)
+        self.assertEqual(len(after), 100)
+        self.assertEqual(dict(after.items())["lead3@example.com"], {"score": 3})
+
+    def test_failed_transaction_publishes_nothing(self):
+        store = LeadStore()
+        store["a@example.com"] = {"score": 10}
+        with self.assertRaises(RuntimeError):
+            with store.transaction("a@example.com") as record:
+                record['score'] = 99
+                raise RuntimeError("scoring failed")
+        self.assertEqual(store["a@example.com"]['score'], 10)
+
+    def test_concurrent_webhooks_same_lead(self):
+        LEAD_DB.clear()
+        now = time.time()
+        errors = []
+
+        def worker(n):
+            client = app.test_client()
+            for i in range(10):
+                res = client.post('/webhook/reply', json={
+                    "email": "race@example.com",
+                    "body": f"Question {n}-{i}: what does the API cost?",
+                    "timestamp": now + n * 100 + i, "sender": "lead"
+                })
+                if res.status_code != 200:
+                    errors.append(res.status_code)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        lead = LEAD_DB["race@example.com"]
+        self.assertEqual(len(lead['thread']), 60)
+        self.assertEqual(len(lead['score_history']), 60)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import threading
+import metrics
+from server import app, LEAD_DB
+from reply_intelligence import decide_lead
+
+class TestMetricsPrimitives(unittest.TestCase):
+    def test_counter_sums_thread_shards(self):
+        counter = metrics.Counter("t_total", "test", ("kind",))
+        threads = [threading.Thread(target=lambda: [counter.inc("a") for _ in range(1000)])
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        counter.inc("b", amount=5)
+        self.assertEqual(counter.value("a"), 8000)
+        self.assertEqual(counter.value("b"), 5)
+
+    def test_histogram_exposition(self):
+        registry = metrics.Registry()
+        hist = registry.histogram("t_seconds", "test", ("route",), buckets=(0.1, 1.0))
+        for v in (0.05, 0.5, 5.0):
+            hist.observe(v, "/x")
+        registry.gauge("t_size", "test", lambda: 3)
+        text = registry.render()
+        self.assertIn('t_seconds_bucket{route="/x",le="0.1"} 1', text)
+        self.assertIn('t_seconds_bucket{route="/x",le="1"} 2', text)
+        self.assertIn('t_seconds_bucket{route="/x",le="+Inf"} 3', text)
+        self.assertIn('t_seconds_count{route="/x"} 3', text)
+        self.assertIn("# TYPE t_size gauge\nt_size 3", text)
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        LEAD_DB.clear()
+
+    def test_server_metrics(self):
+        self.app.post('/webhook/reply', json={
+            "email": "m@example.com", "body": "What is the pricing?",
+            "timestamp": 1000, "sender": "lead"})
+        before = metrics.HTTP_REQUESTS.value("server", "/webhook/reply", "POST", "200")
+        self.assertGreaterEqual(before, 1)
+
+        response = self.app.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        text = response.get_data(as_text=True)
+        self.assertIn('http_requests_total{app="server",route="/webhook/reply",method="POST",status="200"}', text)
+        self.assertIn("lead_store_leads 1", text)
+        self.assertIn("ingest_queue_depth", text)
+
+    def test_decisions_by_tier_and_action(self):
+        decision = decide_lead("Please unsubscribe me.")
+        key = (decision['tier'], decision['action'])
+        before = metrics.DECISIONS.value(*key)
+        decide_lead("Please unsubscribe me.")
+        self.assertEqual(metrics.DECISIONS.value(*key), before + 1)
+
+if __name__ == '__main__':
+    unittest.main()
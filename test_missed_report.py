@@ -0,0 +1,96 @@
+import unittest
+import random
+import time
+from missed_report import MissedReport
+from server import app, LEAD_DB
+
+HIGH_INTENT = ("What is the pricing? Budget is approved and we need to launch this month. "
+               "Can your API integrate with our CRM? How does it compare to your competitor?")
+
+class TestMissedReportBuckets(unittest.TestCase):
+    def test_retention_and_windows(self):
+        clock = [1700000000.0]
+        report = MissedReport(clock=lambda: clock[0], hourly_retention=48, daily_retention=3)
+        for day in range(5):
+            report.on_publish(f"l{day}@example.com", None,
+                              {"score": 80, "last_lead_reply_at": clock[0]})
+            clock[0] += 86400
+        clock[0] -= 86400
+        self.assertEqual(report.stats()['daily_buckets'], 3)
+        self.assertLessEqual(report.stats()['hourly_buckets'], 48)
+        self.assertEqual(report.report(window_hours=24)['revenue_snapshot']['high_intent_threads'], 1)
+        self.assertEqual(report.report()['revenue_snapshot']['high_intent_threads'], 3)
+
+    def test_one_response_per_thread(self):
+        clock = [1700000000.0]
+        report = MissedReport(clock=lambda: clock[0])
+        old = None
+        # Lead waits, agent answers, lead waits again, agent answers again
+        for waiting_since, agent_at in ((clock[0], clock[0] + 600), (clock[0] + 7200, clock[0] + 9000)):
+            new = {"score": 80, "last_lead_reply_at": waiting_since, "thread": []}
+            report.on_publish("a@example.com", old, new)
+            old, new = new, {"score": 80, "last_lead_reply_at": None,
+                             "thread": [{"timestamp": agent_at}]}
+            report.on_publish("a@example.com", old, new)
+            old = new
+        snap = report.report()['revenue_snapshot']
+        self.assertEqual((snap['high_intent_threads'], snap['responded_under_30m'],
+                          snap['responded_over_30m'], snap['unanswered']), (1, 1, 0, 0))
+
+class TestMissedReportEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        LEAD_DB.clear()
+
+    def post(self, email, body, ts, sender="lead"):
+        self.app.post('/webhook/reply', json={
+            "email": email, "body": body, "timestamp": ts, "sender": sender
+        })
+
+    def test_report(self):
+        start = time.time() - 7200
+        self.post("fast@example.com", HIGH_INTENT, start)
+        self.post("fast@example.com", "Here is our pricing sheet.", start + 300, sender="agent")
+        self.post("slow@example.com", HIGH_INTENT, start)
+        self.post("slow@example.com", "Sorry for the delay, pricing attached.", start + 3600, sender="agent")
+        self.post("waiting@example.com", HIGH_INTENT, start)
+        self.post("cold@example.com", "ok", start)
+        self.app.post('/api/lead/fast@example.com/set_outcome', json={"outcome": "meeting"})
+
+        data = self.app.get('/api/missed-report').get_json()
+        snap = data['revenue_snapshot']
+        self.assertEqual(snap['high_intent_threads'], 3)
+        self.assertEqual(snap['responded_under_30m'], 1)
+        self.assertEqual(snap['responded_over_30m'], 1)
+        self.assertEqual(snap['unanswered'], 1)
+        self.assertEqual(snap['meetings_booked'], 1)
+        self.assertEqual(snap['pending_outcome'], 2)
+
+        statuses = {d['email']: d['status'] for d in data['details']}
+        self.assertEqual(statuses, {
+            "fast@example.com": "Responded",
+            "slow@example.com": "Late Response",
+            "waiting@example.com": "No Response Yet",
+        })
+        self.assertEqual(self.app.get('/api/missed-report?window_hours=0').status_code, 400)
+
+    def test_buckets_add_up_to_threads(self):
+        rng = random.Random(38)
+        bodies = [HIGH_INTENT, "ok", "Thanks, will check.", "Not interested.",
+                  "Can we book a demo this week? Budget is approved."]
+        start = time.time() - 5 * 86400
+        for n in range(60):
+            email, ts = f"lead{n}@example.com", start + n * 600
+            for _ in range(rng.randint(1, 8)):
+                ts += rng.choice([120, 900, 3600, 4 * 3600])
+                sender = "agent" if rng.random() < 0.4 else "lead"
+                self.post(email, rng.choice(bodies) if sender == "lead" else "Here you go.", ts, sender)
+
+        for window_hours in (6, 24, 24 * 7):
+            snap = self.app.get(f'/api/missed-report?window_hours={window_hours}').get_json()['revenue_snapshot']
+            self.assertEqual(snap['responded_under_30m'] + snap['responded_over_30m'] + snap['unanswered'],
+                             snap['high_intent_threads'])
+        self.assertGreater(snap['high_intent_threads'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
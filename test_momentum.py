@@ -0,0 +1,101 @@
+import unittest
+import random
+import time
+import server
+from reply_intelligence import ReplyIntelligence
+from server import app, LEAD_DB
+
+class TestMomentumState(unittest.TestCase):
+    def setUp(self):
+        self.engine = ReplyIntelligence()
+
+    def test_labels_follow_score_deltas(self):
+        state = self.engine.new_momentum_state()
+        labels = []
+        for score in (20, 40, 60, 60, 60, 30, 10):
+            state = self.engine.advance_momentum(state, score)
+            labels.append(self.engine.momentum_label(state))
+        self.assertEqual(labels[0], "Stable")
+        self.assertEqual(labels[2], "Rising")
+        self.assertEqual(labels[4], "Stable")
+        self.assertEqual(labels[-1], "Cooling")
+
+    def test_velocity_matches_thread_scan(self):
+        now = 1700000000
+        thread = [
+            {"body": "What is the pricing?", "timestamp": now + 7200, "sender": "lead"},
+            {"body": "Here you go", "timestamp": now + 7300, "sender": "agent"},
+            {"body": "Budget approved.", "timestamp": now, "sender": "lead"},
+            {"body": "Can we start next week?", "timestamp": now + 3600 * 5, "sender": "lead"},
+        ]
+        state = self.engine.seed_momentum_state(thread)
+        self.assertEqual(state["lead_messages"], 3)
+        with_state = self.engine.analyze_thread(thread, momentum_state=state)
+        without = self.engine.analyze_thread(thread)
+        self.assertEqual(with_state['metrics']['velocity_hours'], without['metrics']['velocity_hours'])
+        self.assertEqual(with_state['score'], without['score'])
+        self.assertIn('momentum_state', with_state)
+        self.assertNotIn('momentum_state', without)
+
+class TestWebhookMomentum(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        LEAD_DB.clear()
+
+    def test_running_state_on_webhook(self):
+        start = time.time() - 10000
+        bodies = ["ok", "What is the pricing?", "Can we get a demo with our team this week?"]
+        for i, body in enumerate(bodies):
+            result = self.app.post('/webhook/reply', json={
+                "email": "m@example.com", "body": body, "timestamp": start + i * 3600, "sender": "lead"
+            }).get_json()
+            self.assertNotIn('momentum_state', result['analysis'])
+
+        lead = LEAD_DB["m@example.com"]
+        state = lead['momentum_state']
+        self.assertEqual(state['lead_messages'], 3)
+        self.assertEqual(state['last_score'], lead['score'])
+        self.assertEqual(result['analysis']['metrics']['velocity_hours'], 1.0)
+        self.assertEqual(lead['momentum'], "Rising")
+
+    def test_live_state_matches_seed_from_score_history(self):
+        rng = random.Random(40)
+        bodies = ["ok", "What is the pricing?", "Budget approved, need this by Friday.",
+                  "Not interested.", "Can we get a demo with our team this week?"]
+        start = time.time() - 30 * 86400
+        emails = []
+        for n in range(40):
+            email, ts = f"seed{n}@example.com", start + n * 60
+            emails.append(email)
+            for _ in range(rng.randint(1, 8)):
+                ts += rng.choice([300, 3600, 6 * 3600])
+                sender = "agent" if rng.random() < 0.4 else "lead"
+                self.app.post('/webhook/reply', json={
+                    "email": email, "body": rng.choice(bodies) if sender == "lead" else "Here you go.",
+                    "timestamp": ts, "sender": sender})
+        # Lazy decay re-scores every active lead once more
+        for email in emails:
+            server._apply_lazy_decay(email, LEAD_DB[email], time.time())
+
+        engine = server.reply_engine
+        for email in emails:
+            lead = LEAD_DB[email]
+            seeded = engine.seed_momentum_state(lead['thread'], None, lead['score_history'])
+            live = lead['momentum_state']
+            self.assertEqual((live['score_ewma'], live['last_score']),
+                             (seeded['score_ewma'], seeded['last_score']), email)
+            self.assertEqual(lead['momentum'], engine.momentum_label(seeded))
+
+    def test_agent_reply_keeps_momentum(self):
+        now = time.time()
+        for i, (sender, body) in enumerate([
+                ("lead", "ok"), ("lead", "What is the pricing? Can your API integrate with our CRM?"),
+                ("agent", "Here you go.")]):
+            self.app.post('/webhook/reply', json={
+                "email": "agent@example.com", "body": body, "timestamp": now + i * 600, "sender": sender})
+        lead = LEAD_DB["agent@example.com"]
+        first, second = lead['score_history']
+        self.assertEqual(lead['momentum_state']['score_ewma'], 0.5 * (second - first))
+
+if __name__ == '__main__':
+    unittest.main()
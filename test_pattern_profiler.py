@@ -0,0 +1,45 @@
+import unittest
+import re
+import pattern_profiler
+from reply_intelligence import decide_lead, _searcher
+
+TEXTS = [
+    "Not interested, please remove me.",
+    "I passed this to our head of sales.",
+    "What is the pricing? We are comparing vendors and need to launch this month.",
+]
+
+class TestPatternProfiler(unittest.TestCase):
+    def setUp(self):
+        pattern_profiler.PROFILER.reset()
+
+    def tearDown(self):
+        pattern_profiler.disable()
+        pattern_profiler.PROFILER.reset()
+
+    def test_disabled_records_nothing(self):
+        decide_lead(TEXTS[2])
+        self.assertEqual(pattern_profiler.PROFILER.report(), [])
+        # Off means the loops call re.search directly, no wrapper
+        self.assertIs(_searcher("TERMINAL_READY_PATTERNS"), re.search)
+
+    def test_counts_evaluations_and_hits(self):
+        baseline = [decide_lead(t) for t in TEXTS]
+        pattern_profiler.enable()
+        profiled = [decide_lead(t) for t in TEXTS]
+        self.assertEqual(baseline, profiled)
+
+        profiler = pattern_profiler.PROFILER
+        rows = {(r['list'], r['pattern']): r for r in profiler.report()}
+        pricing = rows[("PATTERNS.pricing", "pricing")]
+        self.assertEqual(pricing['hits'], 1)
+        self.assertGreaterEqual(pricing['evaluations'], 1)
+        self.assertIn(("TERMINAL_REFERRED_PATTERNS", r"passed.*to.*(?:head of|director|vp|cto|ceo|sales)"), rows)
+
+        by_time = profiler.report(sort_by="total_us")
+        self.assertEqual(by_time, sorted(by_time, key=lambda r: r['total_us'], reverse=True))
+        self.assertTrue(all(r['hits'] == 0 for r in profiler.never_hit()))
+        self.assertIn("PATTERNS.pricing", profiler.dump())
+
+if __name__ == '__main__':
+    unittest.main()
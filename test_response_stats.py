@@ -0,0 +1,75 @@
+import unittest
+import random
+import time
+from unittest import mock
+import server
+from quantile_sketch import DDSketch
+from server import app, LEAD_DB, RESPONSE_SKETCH
+
+class TestQuantileSketch(unittest.TestCase):
+    def test_relative_accuracy(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(6, 1.2) for _ in range(20000)]
+        sketch = DDSketch(relative_accuracy=0.01)
+        for v in values:
+            sketch.add(v)
+        values.sort()
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q) / exact, 1, delta=0.02)
+
+    def test_bounded_buckets_and_merge(self):
+        a, b = DDSketch(max_buckets=64), DDSketch(max_buckets=64)
+        for i in range(1, 5001):
+            (a if i % 2 else b).add(float(i))
+        self.assertLessEqual(len(a), 64)
+        a.merge(b)
+        self.assertEqual(a.count, 5000)
+        self.assertAlmostEqual(a.quantile(0.99) / 4950, 1, delta=0.03)
+        self.assertIsNone(DDSketch().quantile(0.5))
+
+class TestResponseStats(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        LEAD_DB.clear()
+
+    def post(self, body, ts, sender):
+        self.app.post('/webhook/reply', json={
+            "email": "sla@example.com", "body": body, "timestamp": ts, "sender": sender
+        })
+
+    def test_running_aggregates(self):
+        now = time.time() - 7200
+        self.post("What is the pricing?", now, "lead")
+        self.post("Sending it over.", now + 600, "agent")
+        self.post("Can we talk to your team next week?", now + 1200, "lead")
+        self.post("Sure, booking it.", now + 1500, "agent")
+
+        lead = LEAD_DB["sla@example.com"]
+        self.assertNotIn('response_times', lead)
+        self.assertEqual(lead['response_count'], 2)
+        self.assertAlmostEqual(lead['response_mean_sec'], 450)
+        self.assertAlmostEqual(lead['response_ewma_sec'], 600 + 0.3 * (300 - 600))
+        self.assertEqual(lead['avg_response_time_min'], 7.5)
+        self.assertEqual(RESPONSE_SKETCH.count, 2)
+
+        sla = self.app.get('/api/dashboard').get_json()['sla']
+        pct = sla['response_time_min']
+        self.assertEqual(pct['responses'], 2)
+        self.assertAlmostEqual(pct['p50'], 5.0, delta=0.1)
+        self.assertLessEqual(pct['p50'], pct['p90'])
+        self.assertLessEqual(pct['p99'], 10.0)
+
+    def test_failed_scoring_records_no_sample(self):
+        now = time.time() - 7200
+        self.post("What is the pricing?", now, "lead")
+        with mock.patch.object(server, '_rescore', side_effect=RuntimeError("scoring failed")):
+            self.post("Sending it over.", now + 600, "agent")
+        self.assertEqual(RESPONSE_SKETCH.count, 0)
+
+        self.post("Sending it over.", now + 600, "agent")
+        self.assertEqual(RESPONSE_SKETCH.count, 1)
+        self.assertAlmostEqual(RESPONSE_SKETCH.quantile(0.5) / 600, 1, delta=0.02)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import time
+import threading
+from sampling_profiler import SamplingProfiler, PROFILER
+from server import app, LEAD_DB
+
+def busy_view(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_attributes_samples_to_route(self):
+        profiler = SamplingProfiler()
+        profiler.register_route(busy_view, "/busy")
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_view, args=(stop,))
+        worker.start()
+        profiler.start(interval=0.001, duration=5)
+        time.sleep(0.2)
+        profiler.stop()
+        stop.set()
+        worker.join()
+
+        status = profiler.status()
+        self.assertFalse(status['running'])
+        self.assertGreater(status['samples_by_route'].get("/busy", 0), 0)
+        self.assertNotIn("(no route)", status['samples_by_route'])
+        lines = profiler.collapsed(route="/busy").splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("/busy;"))
+            self.assertIn("test_sampling_profiler.py:busy_view", stack)
+            self.assertGreater(int(count), 0)
+
+class TestProfilerAdminRoutes(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        LEAD_DB.clear()
+
+    def tearDown(self):
+        PROFILER.stop()
+
+    def test_start_stop_and_download(self):
+        started = self.app.post('/admin/profiler/start', json={"interval": 0.001, "duration": 5})
+        self.assertEqual(started.status_code, 200)
+        self.assertTrue(started.get_json()['running'])
+        self.assertEqual(self.app.post('/admin/profiler/start', json={}).status_code, 409)
+
+        body = " ".join(["What is the pricing? We need to launch this month."] * 50)
+        deadline = time.time() + 0.3
+        ts = 1000
+        while time.time() < deadline:
+            self.app.post('/webhook/reply', json={
+                "email": "p@example.com", "body": body, "timestamp": ts, "sender": "lead"})
+            ts += 60
+
+        stopped = self.app.post('/admin/profiler/stop').get_json()
+        self.assertFalse(stopped['running'])
+        self.assertGreater(stopped['samples_by_route'].get('/webhook/reply', 0), 0)
+
+        download = self.app.get('/admin/profiler/collapsed?route=/webhook/reply')
+        self.assertEqual(download.status_code, 200)
+        self.assertIn("attachment", download.headers['Content-Disposition'])
+        self.assertTrue(download.get_data(as_text=True).startswith("/webhook/reply;"))
+
+if __name__ == '__main__':
+    unittest.main()
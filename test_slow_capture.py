@@ -0,0 +1,88 @@
+import unittest
+import os
+import tempfile
+import slow_capture
+from slow_capture import SlowReplyLog
+from reply_intelligence import ReplyIntelligence, decide_lead
+from server import app
+
+TEXT = "Pricing for 250 seats? Reach me at jane.doe@acme.io, we need to launch this month."
+
+class TestSlowCapture(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "slow.jsonl")
+        self.saved_log = slow_capture.LOG
+        slow_capture.LOG = SlowReplyLog(self.path, keep=3)
+
+    def tearDown(self):
+        slow_capture.disable()
+        slow_capture.LOG = self.saved_log
+        self.tmp.cleanup()
+
+    def test_off_by_default(self):
+        decide_lead(TEXT)
+        self.assertEqual(slow_capture.LOG.recent(), [])
+
+    def test_captures_decide_lead_once_without_changing_decision(self):
+        baseline = decide_lead(TEXT)
+        slow_capture.enable(0.000001)
+        captured = decide_lead(TEXT)
+        self.assertEqual(baseline, captured)
+        self.assertNotIn('timings', captured)
+
+        cases = slow_capture.LOG.recent()
+        self.assertEqual(len(cases), 1)   # nested analyze_thread is not a second case
+        case = cases[0]
+        self.assertEqual(case['source'], "decide_lead")
+        self.assertEqual(case['length'], len(TEXT))
+        self.assertIn("user@example.com", case['text'])
+        self.assertIn("000 seats", case['text'])
+        self.assertNotIn("acme", case['text'])
+        self.assertIn("prepare", case['timings_us'])
+        self.assertEqual(case['decided_by'], f"analyze_thread: {baseline['analysis']['state']}")
+        self.assertIn("pricing", " ".join(case['matched_rules'].get("PATTERNS.pricing", [])))
+        self.assertIn(baseline['tier'], case['outcome'])
+
+    def test_captures_analyze_thread(self):
+        slow_capture.enable(0.000001)
+        result = ReplyIntelligence().analyze_thread([{"sender": "lead", "body": TEXT, "timestamp": 1000}])
+        self.assertNotIn('timings', result)
+        case = slow_capture.LOG.recent()[0]
+        self.assertEqual(case['source'], "analyze_thread")
+        self.assertEqual(case['messages'], 1)
+        self.assertIn("extract_signals", " ".join(case['timings_us']))
+        self.assertNotIn('matched_rules', result)
+        matched = case['matched_rules']
+        self.assertEqual(sorted(matched),
+                         sorted("PATTERNS." + k for k, v in result['signals'].items()
+                                if v and k not in ('word_count', 'question_count', 'is_keyword_spam',
+                                                   'is_disengaging', 'has_positive_intent'))
+                         + (["POSITIVE_INTEREST_PATTERNS"] if result['signals']['has_positive_intent'] else []))
+
+    def test_records_terminal_rule(self):
+        slow_capture.enable(0.000001)
+        decision = decide_lead("We have moved on with another vendor this year, so please take me off this list.")
+        case = slow_capture.LOG.recent()[0]
+        self.assertEqual(decision['tier'], "Noise")
+        self.assertTrue(case['decided_by'].startswith("TERMINAL_NOISE_PATTERNS: "))
+        self.assertEqual(list(case['matched_rules']), ["TERMINAL_NOISE_PATTERNS"])
+        self.assertNotIn('decided_by', decision)
+
+    def test_ring_file_stays_bounded(self):
+        log = slow_capture.LOG
+        for i in range(10):
+            log.record({"n": i})
+        with open(self.path) as f:
+            self.assertLessEqual(len(f.readlines()), 6)
+        self.assertEqual([c['n'] for c in SlowReplyLog(self.path, keep=3).recent()], [9, 8, 7])
+
+    def test_endpoint(self):
+        slow_capture.enable(0.000001)
+        decide_lead(TEXT)
+        data = app.test_client().get('/api/slow-replies?limit=5').get_json()
+        self.assertTrue(data['enabled'])
+        self.assertEqual(len(data['cases']), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import stage_timer
+from reply_intelligence import decide_lead
+
+TEXTS = [
+    "Let's talk",
+    "Budget approved, please send the contract.",
+    "I'm forwarding this to our VP who handles vendors.",
+    "Please unsubscribe me.",
+    "What is the pricing? We are comparing vendors and need to launch this month. "
+    "Can your API integrate with our CRM and who else on our team should join?",
+]
+
+class TestStageTimer(unittest.TestCase):
+    def tearDown(self):
+        stage_timer.disable()
+        stage_timer.HISTOGRAMS.reset()
+
+    def test_off_by_default(self):
+        stage_timer.HISTOGRAMS.reset()
+        decision = decide_lead(TEXTS[-1])
+        self.assertNotIn('timings', decision)
+        self.assertEqual(stage_timer.HISTOGRAMS.snapshot(), {})
+
+    def test_timings_do_not_change_decisions(self):
+        baseline = [decide_lead(t) for t in TEXTS]
+        stage_timer.enable(attach=True)
+        timed = [decide_lead(t) for t in TEXTS]
+        for before, after in zip(baseline, timed):
+            timings = after.pop('timings')
+            self.assertIn('prepare', timings)
+            self.assertIn('inbox_reality.persistence', timings)
+            self.assertEqual(before, after)
+
+        stages = stage_timer.HISTOGRAMS.snapshot()
+        for stage in ("prepare", "short_reply_override", "referred_patterns",
+                      "analyze_thread", "analyze_thread.extract_signals", "inbox_reality.recency"):
+            self.assertIn(stage, stages)
+        self.assertEqual(stages["prepare"]["count"], len(TEXTS))
+        self.assertLessEqual(stages["prepare"]["p50_us"], stages["prepare"]["p99_us"])
+
+    def test_histograms_only(self):
+        stage_timer.enable()
+        decision = decide_lead(TEXTS[-1])
+        self.assertNotIn('timings', decision)
+        self.assertEqual(stage_timer.HISTOGRAMS.snapshot()["analyze_thread"]["count"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
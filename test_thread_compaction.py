@@ -0,0 +1,58 @@
+import unittest
+import random
+import time
+import server
+from reply_intelligence import ReplyIntelligence
+from server import app, LEAD_DB
+
+BODIES = [
+    "What is the pricing? We are comparing vendors.",
+    "Budget approved, our CTO wants the API docs.",
+    "We're scaling fast and drowning in manual work. When can we launch?",
+    "Looks interesting, maybe later.",
+    "Can you share your win rate metrics?",
+    "ok",
+]
+
+class TestThreadCompaction(unittest.TestCase):
+    def setUp(self):
+        self.engine = ReplyIntelligence()
+        rng = random.Random(11)
+        self.thread = [{
+            "body": rng.choice(BODIES),
+            "timestamp": 1000 + i * 3600,
+            "sender": "lead" if i % 3 else "agent"
+        } for i in range(200)]
+
+    def test_summary_matches_full_analysis(self):
+        full = self.engine.analyze_thread(self.thread)
+        summary = self.engine.summarize_messages(self.thread[:120])
+        summary = self.engine.summarize_messages(self.thread[120:180], summary)
+        compacted = self.engine.analyze_thread(self.thread[180:], summary)
+
+        self.assertEqual(compacted['score'], full['score'])
+        self.assertEqual(compacted['state'], full['state'])
+        self.assertEqual(compacted['signals'], full['signals'])
+        self.assertEqual(compacted['metrics']['depth'], full['metrics']['depth'])
+        self.assertAlmostEqual(compacted['metrics']['velocity_hours'], full['metrics']['velocity_hours'])
+
+    def test_webhook_keeps_window(self):
+        LEAD_DB.clear()
+        client = app.test_client()
+        server.THREAD_WINDOW = 10
+        try:
+            now = time.time()
+            for i in range(40):
+                client.post('/webhook/reply', json={
+                    "email": "long@example.com", "body": f"Reply {i}: any update on pricing?",
+                    "timestamp": now + i * 60, "sender": "lead"
+                })
+        finally:
+            server.THREAD_WINDOW = 0
+        lead = LEAD_DB["long@example.com"]
+        self.assertLessEqual(len(lead['thread']), 15)
+        self.assertEqual(len(lead['thread']) + lead['thread_summary']['messages'], 40)
+        self.assertEqual(lead['raw_metrics']['depth'], 40)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,9 +3,13 @@
 Rule: NO tweaks during run. Observe only.
 """
 
-import json, time, urllib.request
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Live server by default; HARNESS_TRANSPORT=client|direct runs in-process
+from harness_transport import TRANSPORT
 
-BASE = "http://localhost:8081"
 RUN_ID = str(int(time.time()))  # unique per run to avoid reply accumulation
 
 def post(email, body, sender="lead", mins_ago=0):
@@ -15,14 +19,7 @@ def post(email, body, sender="lead", mins_ago=0):
         "sender": sender,
         "timestamp": time.time() - (mins_ago * 60),
     }
-    req = urllib.request.Request(
-        f"{BASE}/webhook/reply",
-        data=json.dumps(payload).encode(),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req) as res:
-        return json.loads(res.read()).get("analysis", {})
+    return TRANSPORT.post_json("/webhook/reply", payload).get("analysis", {})
 
 def log(num, title, expected, r):
     score = r.get("score", 0)